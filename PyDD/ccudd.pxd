@@ -11,11 +11,24 @@ ctypedef enum Cudd_ResidueType:
 
 cdef extern from "mtr.h":
     ctypedef struct MtrNode:
-        pass
+        unsigned int flags
+        unsigned int low
+        unsigned int size
+        unsigned int index
+        MtrNode * parent
+        MtrNode * child
+        MtrNode * elder
+        MtrNode * younger
 
     cdef extern int MTR_DEFAULT
     cdef extern int MTR_FIXED
 
+# The fields of MtrNode are only defined in the internal header, and
+# mtr.h has no accessors for them, so the extension is built against the
+# CUDD sources (see setup.py).
+cdef extern from "mtrInt.h":
+    pass
+
 cdef extern from "cudd.h":
     ctypedef struct DdManager:
         pass
@@ -55,6 +68,13 @@ cdef extern from "cudd.h":
         CUDD_INVALID_ARG, CUDD_INTERNAL_ERROR,
         CUDD_WRONG_PRECONDITIONS
 
+    ctypedef enum Cudd_HookType:
+        CUDD_PRE_GC_HOOK, CUDD_POST_GC_HOOK,
+        CUDD_PRE_REORDERING_HOOK, CUDD_POST_REORDERING_HOOK
+
+    ctypedef int (*DD_HFP)(DdManager *, const char *, void *)
+    ctypedef int (*DD_THFP)(const void *) noexcept nogil
+
 
     DdManager * Cudd_Init(unsigned int numVars, unsigned int numVarsZ,
                           size_t numSlots, size_t cacheSize,
@@ -63,14 +83,14 @@ cdef extern from "cudd.h":
     bint Cudd_PrintInfo(DdManager * manager, FILE *fp)
     Cudd_ErrorType Cudd_ReadErrorCode(DdManager * manager)
     void Cudd_ClearErrorCode(DdManager * manager)
-    int Cudd_ReadSize(DdManager * manager)
+    int Cudd_ReadSize(DdManager * manager) nogil
     unsigned int Cudd_ReadMaxIndex()
     size_t Cudd_ReadMemoryInUse(DdManager * manager)
     bint Cudd_Reserve(DdManager * manager, int amount)
-    DdNode * Cudd_bddNewVar(DdManager * manager)
-    DdNode * Cudd_bddIthVar(DdManager * manager, int index)
-    DdNode * Cudd_ReadOne(DdManager * manager)
-    DdNode * Cudd_ReadLogicZero(DdManager * manager)
+    DdNode * Cudd_bddNewVar(DdManager * manager) nogil
+    DdNode * Cudd_bddIthVar(DdManager * manager, int index) nogil
+    DdNode * Cudd_ReadOne(DdManager * manager) nogil
+    DdNode * Cudd_ReadLogicZero(DdManager * manager) nogil
     DdNode * Cudd_ReadZero(DdManager * manager)
     DdNode * Cudd_ReadPlusInfinity(DdManager * manager)
     DdNode * Cudd_ReadMinusInfinity(DdManager * manager)
@@ -90,18 +110,43 @@ cdef extern from "cudd.h":
     void Cudd_SetMaxLive(DdManager * manager, size_t maxLive)
     size_t Cudd_ReadMaxMemory(DdManager * manager)
     size_t Cudd_SetMaxMemory(DdManager * manager, size_t maxMemory)
+    size_t Cudd_ReadSlots(DdManager * manager)
+    size_t Cudd_ReadCacheSlots(DdManager * manager)
+    size_t Cudd_ReadMaxCacheHard(DdManager * manager)
+    void Cudd_SetMaxCacheHard(DdManager * manager, size_t mc)
+    unsigned int Cudd_ReadMinHit(DdManager * manager)
+    void Cudd_SetMinHit(DdManager * manager, unsigned int hr)
+    size_t Cudd_ReadLooseUpTo(DdManager * manager)
+    void Cudd_SetLooseUpTo(DdManager * manager, size_t lut)
     void Cudd_Srandom(DdManager * manager, int32_t seed)
     void Cudd_AutodynEnable(DdManager * manager, Cudd_ReorderingType method)
     void Cudd_AutodynDisable(DdManager * manager)
     unsigned int Cudd_ReadReorderings(DdManager * manager)
+    long Cudd_ReadReorderingTime(DdManager * manager)
+    double Cudd_ReadCacheLookUps(DdManager * manager)
+    double Cudd_ReadCacheHits(DdManager * manager)
+    size_t Cudd_ReadNodeCount(DdManager * manager)
+    size_t Cudd_ReadPeakNodeCount(DdManager * manager)
+    size_t Cudd_ReadPeakLiveNodeCount(DdManager * manager)
+    size_t Cudd_ReadDead(DdManager * manager)
+    unsigned int Cudd_ReadKeys(DdManager * manager)
+    long Cudd_zddReadNodeCount(DdManager * manager)
+    void Cudd_RegisterTerminationCallback(DdManager * manager,
+                                          DD_THFP callback, void * arg)
+    void Cudd_UnregisterTerminationCallback(DdManager * manager)
+    bint Cudd_AddHook(DdManager * manager, DD_HFP f, Cudd_HookType where)
+    bint Cudd_RemoveHook(DdManager * manager, DD_HFP f, Cudd_HookType where)
+    int Cudd_ReadGarbageCollections(DdManager * manager)
+    long Cudd_ReadGarbageCollectionTime(DdManager * manager)
+    double Cudd_ReadSwapSteps(DdManager * manager)
     unsigned int Cudd_ReadMaxReorderings(DdManager * manager)
     void Cudd_SetMaxReorderings(DdManager * manager, unsigned int mr)
     bint Cudd_ReorderingStatus(DdManager * manager, Cudd_ReorderingType * method)
     size_t Cudd_ReadNextReordering(DdManager * manager)
     void Cudd_SetNextReordering(DdManager * manager, size_t next)
     int Cudd_ReduceHeap(DdManager * manager, Cudd_ReorderingType heuristic,
-                        int minsize)
-    bint Cudd_ShuffleHeap(DdManager * manager, int * permutation)
+                        int minsize) nogil
+    bint Cudd_ShuffleHeap(DdManager * manager, int * permutation) nogil
     bint Cudd_EnableReorderingReporting(DdManager * manager)
     bint Cudd_DisableReorderingReporting(DdManager * manager)
     bint Cudd_ReorderingReporting(DdManager * manager)
@@ -109,25 +154,27 @@ cdef extern from "cudd.h":
     bint Cudd_DisableOrderingMonitoring(DdManager * manager)
     bint Cudd_OrderingMonitoring(DdManager * manager)
     bint Cudd_PrintGroupedOrder(DdManager * manager, const char * str, void * data)
-    int Cudd_ReadInvPerm(DdManager * manager, int i)
+    int Cudd_ReadPerm(DdManager * manager, int i) nogil
+    int Cudd_ReadInvPerm(DdManager * manager, int i) nogil
     int Cudd_ReadInvPermZdd(DdManager * manager, int i)
     bint Cudd_DumpDot (DdManager * manager, int n, DdNode * * f,
                        const char * const * inames, const char * const * onames,
                        FILE * fp)
     void Cudd_SymmProfile(DdManager * manager, int lower, int upper)
 
-    void Cudd_Ref(DdNode * f)
-    void Cudd_RecursiveDeref(DdManager * manager, DdNode *f)
-    DdNode * Cudd_Not(DdNode * f)
-    DdNode * Cudd_bddAnd(DdManager * manager, DdNode * f, DdNode * g)
+    void Cudd_Ref(DdNode * f) nogil
+    void Cudd_RecursiveDeref(DdManager * manager, DdNode *f) nogil
+    DdNode * Cudd_Not(DdNode * f) nogil
+    DdNode * Cudd_NotCond(DdNode * f, int c) nogil
+    DdNode * Cudd_bddAnd(DdManager * manager, DdNode * f, DdNode * g) nogil
     DdNode * Cudd_bddAndLimit(DdManager * manager, DdNode * f, DdNode * g,
-                              unsigned int limit)
+                              unsigned int limit) nogil
     DdNode * Cudd_bddOr(DdManager * manager, DdNode * f, DdNode * g)
     DdNode * Cudd_bddXor (DdManager * manager, DdNode * f, DdNode * g)
     DdNode * Cudd_bddXnor(DdManager * manager, DdNode * f, DdNode * g);
     DdNode * Cudd_bddXnorLimit(DdManager * manager, DdNode * f, DdNode * g,
                                unsigned int limit)
-    DdNode * Cudd_bddIte(DdManager * manager, DdNode * f, DdNode * g, DdNode * h)
+    DdNode * Cudd_bddIte(DdManager * manager, DdNode * f, DdNode * g, DdNode * h) nogil
     DdNode * Cudd_bddIteLimit(DdManager * manager, DdNode * f, DdNode * g,
                               DdNode * h, unsigned int limit)
     DdNode * Cudd_bddIntersect(DdManager * manager, DdNode * f, DdNode * g)
@@ -143,7 +190,7 @@ cdef extern from "cudd.h":
     bint Cudd_bddLeq (DdManager * manager, DdNode * f, DdNode * g)
     bint Cudd_bddIsVar(DdManager * manager, DdNode * f)
     bint Cudd_addIsVar(DdManager * manager, DdNode * f)
-    bint Cudd_IsConstant(DdNode * f)
+    bint Cudd_IsConstant(DdNode * f) nogil
     bint Cudd_IsNonConstant(DdNode * f)
     DdGen * Cudd_FirstPrime(DdManager * manager, DdNode * l, DdNode * u,
                             int ** cube)
@@ -152,7 +199,7 @@ cdef extern from "cudd.h":
                            CUDD_VALUE_TYPE * value)
     bint Cudd_NextCube(DdGen * gen, int ** cube, CUDD_VALUE_TYPE * value)
     DdNode * Cudd_bddComputeCube(DdManager * manager, DdNode ** vars, int * phase,
-                                 int n)
+                                 int n) nogil
     bint Cudd_IsGenEmpty(DdGen * gen)
     bint Cudd_GenFree(DdGen * gen)
     int Cudd_bddPickOneCube(DdManager * manager, DdNode * node, char * string)
@@ -161,23 +208,25 @@ cdef extern from "cudd.h":
     DdNode * Cudd_bddPickCube(DdManager * manager, DdNode * f)
     DdNode * Cudd_CubeArrayToBdd(DdManager * manager, int * array)
     DdNode * Cudd_bddExistAbstract(DdManager * manager,
-                                   DdNode * f, DdNode * cube)
+                                   DdNode * f, DdNode * cube) nogil
     DdNode * Cudd_bddExistAbstractLimit(DdManager * manager, DdNode * f,
-                                        DdNode * cube, unsigned int limit)
+                                        DdNode * cube, unsigned int limit) nogil
     DdNode * Cudd_bddUnivAbstract(DdManager * manager,
-                                  DdNode * f, DdNode * cube)
+                                  DdNode * f, DdNode * cube) nogil
     DdNode * Cudd_bddAndAbstract(DdManager * manager, DdNode * f,
-                                 DdNode * g, DdNode * cube)
+                                 DdNode * g, DdNode * cube) nogil
     DdNode * Cudd_bddAndAbstractLimit(DdManager * manager, DdNode * f,
                                       DdNode * g, DdNode * cube,
-                                      unsigned int limit)
+                                      unsigned int limit) nogil
     DdNode * Cudd_bddBooleanDiff(DdManager * manager, DdNode * f, int x)
-    DdNode * Cudd_bddCompose(DdManager * manager, DdNode * f, DdNode * g, int v)
+    DdNode * Cudd_bddCompose(DdManager * manager, DdNode * f, DdNode * g, int v) nogil
     DdNode * Cudd_bddVectorCompose(DdManager * manager, DdNode * f,
-                                   DdNode ** vector)
+                                   DdNode ** vector) nogil
     DdNode * Cudd_bddSwapVariables(DdManager * manager, DdNode * f, DdNode ** x,
-                                   DdNode ** y, int n)
-    DdNode * Cudd_bddPermute(DdManager * manager, DdNode * node, int * permut)
+                                   DdNode ** y, int n) nogil
+    DdNode * Cudd_bddPermute(DdManager * manager, DdNode * node, int * permut) nogil
+    DdNode * Cudd_bddVarMap(DdManager * manager, DdNode * f) nogil
+    bint Cudd_SetVarMap(DdManager * manager, DdNode ** x, DdNode ** y, int n)
     DdNode * Cudd_Cofactor(DdManager * manager, DdNode * f, DdNode * g)
     bint Cudd_CheckCube(DdManager * manager, DdNode * g)
     DdNode * Cudd_bddDual(DdManager * manager, DdNode * f)
@@ -192,12 +241,19 @@ cdef extern from "cudd.h":
     DdNode * Cudd_bddSqueeze(DdManager * manager, DdNode * l, DdNode * u)
     DdNode * Cudd_bddMinimize(DdManager *dd, DdNode *f, DdNode *c)
     DdNode * Cudd_Support(DdManager * manager, DdNode * f)
+    int Cudd_SupportIndices(DdManager * manager, DdNode * f, int ** indices)
+    DdNode * Cudd_IndicesToCube(DdManager * manager, int * array, int n)
     bint Cudd_bddVarIsDependent (DdManager * manager, DdNode * f, DdNode * var)
-    int Cudd_DagSize(DdNode * f)
+    int Cudd_DagSize(DdNode * f) nogil
     int Cudd_SharingSize(DdNode ** nodeArray, int n)
     bint Cudd_VarsAreSymmetric(DdManager * manager, DdNode * f,
                                int index1, int index2)
-    unsigned int Cudd_NodeReadIndex(DdNode *node)
+    unsigned int Cudd_NodeReadIndex(DdNode *node) nogil
+    DdNode * Cudd_Regular(DdNode * node) nogil
+    bint Cudd_IsComplement(DdNode * node) nogil
+    DdNode * Cudd_T(DdNode * node) nogil
+    DdNode * Cudd_E(DdNode * node) nogil
+    CUDD_VALUE_TYPE Cudd_V(DdNode * node) nogil
     DdNode * Cudd_Xeqy(DdManager * manager, int N, DdNode ** x, DdNode ** y)
     DdNode * Cudd_Xgty(DdManager * manager, int N, DdNode ** z, DdNode ** x,
                        DdNode ** y)
@@ -294,19 +350,19 @@ cdef extern from "cudd.h":
     DdNode * Cudd_addXor(DdManager * manager, DdNode ** f, DdNode ** g)
     DdNode * Cudd_addXnor(DdManager * manager, DdNode ** f, DdNode ** g)
     DdNode * Cudd_addExistAbstract(DdManager * manager, DdNode * f,
-                                   DdNode * cube)
-    DdNode * Cudd_addUnivAbstract(DdManager * manager, DdNode * f, DdNode * cube)
+                                   DdNode * cube) nogil
+    DdNode * Cudd_addUnivAbstract(DdManager * manager, DdNode * f, DdNode * cube) nogil
     DdNode * Cudd_addMonadicApply(DdManager * manager, DD_MAOP op, DdNode * f)
     DdNode * Cudd_addLog(DdManager * manager, DdNode * f)
     DdNode * Cudd_addFindMax(DdManager * manager, DdNode * f)
     DdNode * Cudd_addFindMin(DdManager * manager, DdNode * f)
     DdNode * Cudd_addIthBit(DdManager * manager, DdNode * f, int bit)
-    DdNode * Cudd_addCompose(DdManager * manager, DdNode * f, DdNode * g, int v)
+    DdNode * Cudd_addCompose(DdManager * manager, DdNode * f, DdNode * g, int v) nogil
     DdNode * Cudd_addVectorCompose(DdManager * manager, DdNode * f,
-                                   DdNode ** vector)
+                                   DdNode ** vector) nogil
     DdNode * Cudd_addSwapVariables(DdManager * manager, DdNode * f,
-                                   DdNode ** x, DdNode ** y, int n)
-    DdNode * Cudd_addPermute(DdManager * manager, DdNode * node, int * permut)
+                                   DdNode ** x, DdNode ** y, int n) nogil
+    DdNode * Cudd_addPermute(DdManager * manager, DdNode * node, int * permut) nogil
     DdNode * Cudd_addConstrain(DdManager * manager, DdNode * f, DdNode * c)
     DdNode * Cudd_addRestrict(DdManager * manager, DdNode * f, DdNode * c)
     DdNode * Cudd_addBddPattern(DdManager * manager, DdNode * f)
@@ -317,9 +373,9 @@ cdef extern from "cudd.h":
     DdNode * Cudd_addBddInterval(DdManager * manager, DdNode * f,
                                  CUDD_VALUE_TYPE lower, CUDD_VALUE_TYPE upper)
     DdNode * Cudd_addMatrixMultiply(DdManager * manager, DdNode * A, DdNode * B,
-                                    DdNode ** z, int nz)
+                                    DdNode ** z, int nz) nogil
     DdNode * Cudd_addTriangle(DdManager * manager, DdNode * f, DdNode * g,
-                              DdNode ** z, int nz)
+                              DdNode ** z, int nz) nogil
     DdNode * Cudd_addWalsh(DdManager * manager, DdNode ** x, DdNode ** y, int n)
     DdNode * Cudd_addXeqy(DdManager * manager, int N, DdNode ** x, DdNode ** y)
     DdNode * Cudd_addHamming(DdManager * manager, DdNode ** xVars,
@@ -357,14 +413,14 @@ cdef extern from "cudd.h":
     DdNode * Cudd_bddIsop(DdManager * manager, DdNode * L, DdNode * U)
     DdNode * Cudd_MakeBddFromZddCover(DdManager * manager, DdNode * node)
     int Cudd_zddDagSize(DdNode * p_node)
-    double Cudd_zddCountMinterm(DdManager * manager, DdNode * node, int path)
+    double Cudd_zddCountMinterm(DdManager * manager, DdNode * node, int path) nogil
     DdNode * Cudd_zddPortFromBdd(DdManager * manager, DdNode * B)
     DdNode * Cudd_zddPortFromBddNegCof(DdManager * manager, DdNode * B, DdNode * cube)
     DdNode * Cudd_zddPortToBdd(DdManager * manager, DdNode * f)
     DdNode * Cudd_zddPortToBddNegCof(DdManager * manager, DdNode * f, DdNode * cube)
     int Cudd_zddReduceHeap(DdManager * manager, Cudd_ReorderingType heuristic,
-                            int minsize)
-    bint Cudd_zddShuffleHeap(DdManager * manager, int * permutation)
+                            int minsize) nogil
+    bint Cudd_zddShuffleHeap(DdManager * manager, int * permutation) nogil
     DdNode * Cudd_zddIte(DdManager * manager, DdNode * f, DdNode * g, DdNode * h)
     DdNode * Cudd_zddUnion(DdManager * manager, DdNode * P, DdNode * Q)
     DdNode * Cudd_zddIntersect(DdManager * manager, DdNode * P, DdNode * Q)
@@ -386,8 +442,137 @@ cdef extern from "cudd.h":
                                 unsigned int size, unsigned int type)
     MtrNode * Cudd_MakeZddTreeNode(DdManager * manager, unsigned int low,
                                    unsigned int size, unsigned int type)
-    double Cudd_CountMinterm(DdManager * manager, DdNode * node, int nvars)
+    MtrNode * Cudd_ReadTree(DdManager * manager)
+    void Cudd_FreeTree(DdManager * manager)
+    MtrNode * Cudd_ReadZddTree(DdManager * manager)
+    void Cudd_FreeZddTree(DdManager * manager)
+    double Cudd_CountMinterm(DdManager * manager, DdNode * node, int nvars) nogil
+    long double Cudd_LdblCountMinterm(const DdManager * manager, DdNode * node,
+                                      int nvars) nogil
     DdApaNumber Cudd_ApaCountMinterm(const DdManager * manager, DdNode * node,
-                                     int nvars, int * digits)
+                                     int nvars, int * digits) nogil
     void Cudd_FreeApaNumber(DdApaNumber number)
-    double Cudd_zddCountMinterm(DdManager * manager, DdNode * node, int path)
\ No newline at end of file
+    double Cudd_zddCountMinterm(DdManager * manager, DdNode * node, int path) nogil
+cdef extern from "dddmp.h":
+    cdef extern int DDDMP_FAILURE
+    cdef extern int DDDMP_SUCCESS
+    cdef extern int DDDMP_MODE_TEXT
+    cdef extern int DDDMP_MODE_BINARY
+    cdef extern int DDDMP_MODE_DEFAULT
+
+    ctypedef enum Dddmp_DecompType:
+        DDDMP_BDD, DDDMP_ADD, DDDMP_CNF, DDDMP_NONE
+
+    ctypedef enum Dddmp_VarInfoType:
+        DDDMP_VARIDS, DDDMP_VARPERMIDS, DDDMP_VARAUXIDS, DDDMP_VARNAMES,
+        DDDMP_VARDEFAULT
+
+    ctypedef enum Dddmp_VarMatchType:
+        DDDMP_VAR_MATCHIDS, DDDMP_VAR_MATCHPERMIDS, DDDMP_VAR_MATCHAUXIDS,
+        DDDMP_VAR_MATCHNAMES, DDDMP_VAR_COMPOSEIDS
+
+    ctypedef enum Dddmp_RootMatchType:
+        DDDMP_ROOT_MATCHNAMES, DDDMP_ROOT_MATCHLIST
+
+    ctypedef enum Dddmp_DecompCnfStoreType:
+        DDDMP_CNF_MODE_NODE, DDDMP_CNF_MODE_MAXTERM, DDDMP_CNF_MODE_BEST
+
+    ctypedef enum Dddmp_DecompCnfLoadType:
+        DDDMP_CNF_MODE_NO_CONJ, DDDMP_CNF_MODE_NO_QUANT,
+        DDDMP_CNF_MODE_CONJ_QUANT
+
+    int Dddmp_cuddHeaderLoad(Dddmp_DecompType * ddType, int * nVars,
+                             int * nsuppvars, char *** suppVarNames,
+                             char *** orderedVarNames, int ** varIds,
+                             int ** composeIds, int ** auxIds, int * nRoots,
+                             char * file, FILE * fp)
+    int Dddmp_cuddBddArrayLoad(DdManager * ddMgr,
+                               Dddmp_RootMatchType rootMatchMode,
+                               char ** rootmatchnames,
+                               Dddmp_VarMatchType varMatchMode,
+                               char ** varmatchnames, int * varmatchauxids,
+                               int * varcomposeids, int mode, char * file,
+                               FILE * fp, DdNode *** pproots)
+    int Dddmp_cuddAddArrayLoad(DdManager * ddMgr,
+                               Dddmp_RootMatchType rootMatchMode,
+                               char ** rootmatchnames,
+                               Dddmp_VarMatchType varMatchMode,
+                               char ** varmatchnames, int * varmatchauxids,
+                               int * varcomposeids, int mode, char * file,
+                               FILE * fp, DdNode *** pproots)
+    int Dddmp_cuddBddArrayStore(DdManager * ddMgr, char * ddname, int nRoots,
+                                DdNode ** f, char ** rootnames,
+                                char ** varnames, int * auxids, int mode,
+                                Dddmp_VarInfoType varinfo, char * fname,
+                                FILE * fp)
+    int Dddmp_cuddAddArrayStore(DdManager * ddMgr, char * ddname, int nRoots,
+                                DdNode ** f, char ** rootnames,
+                                char ** varnames, int * auxids, int mode,
+                                Dddmp_VarInfoType varinfo, char * fname,
+                                FILE * fp)
+    int Dddmp_cuddBddStoreCnf(DdManager * ddMgr, DdNode * f,
+                              Dddmp_DecompCnfStoreType mode, int noHeader,
+                              char ** varNames, int * bddIds,
+                              int * bddAuxIds, int * cnfIds, int idInitial,
+                              int edgeInTh, int pathLengthTh, char * fname,
+                              FILE * fp, int * clauseNPtr,
+                              int * varNewNPtr) nogil
+    int Dddmp_cuddBddArrayLoadCnf(DdManager * ddMgr,
+                                  Dddmp_RootMatchType rootmatchmode,
+                                  char ** rootmatchnames,
+                                  Dddmp_VarMatchType varmatchmode,
+                                  char ** varmatchnames,
+                                  int * varmatchauxids, int * varcomposeids,
+                                  int mode, char * file, FILE * fp,
+                                  DdNode *** rootsPtrPtr, int * nRoots) nogil
+
+cdef extern from "st.h":
+    ctypedef struct st_table:
+        pass
+
+    cdef extern int ST_OUT_OF_MEM
+
+    cdef enum st_retval:
+        ST_CONTINUE
+        ST_STOP
+        ST_DELETE
+
+    ctypedef int (*st_compare_t)(const void *, const void *) noexcept nogil
+    ctypedef int (*st_hash_t)(const void *, int) noexcept nogil
+    ctypedef st_retval (*st_foreach_t)(void *, void *, void *) noexcept nogil
+
+    st_table * st_init_table(st_compare_t compare, st_hash_t hash) nogil
+    void st_free_table(st_table * table) nogil
+    int st_lookup(st_table * table, const void * key, void ** value) nogil
+    int st_insert(st_table * table, void * key, void * value) nogil
+    int st_foreach(st_table * table, st_foreach_t func, void * arg) nogil
+    int st_ptrcmp(const void * x, const void * y) noexcept nogil
+    int st_ptrhash(const void * x, int size) noexcept nogil
+
+cdef extern from "bnet.h":
+    cdef extern int BNET_GLOBAL_DD
+
+    cdef struct BnetNode:
+        char * name
+        int type
+        int var
+        int active
+        DdNode * dd
+        BnetNode * next
+
+    cdef struct BnetNetwork:
+        char * name
+        int npis
+        char ** inputs
+        int npos
+        char ** outputs
+        int nlatches
+        char *** latches
+        BnetNode * nodes
+        st_table * hash
+
+    BnetNetwork * Bnet_ReadNetwork(FILE * fp, int pr) nogil
+    void Bnet_FreeNetwork(BnetNetwork * net) nogil
+    int Bnet_BuildNodeBDD(DdManager * dd, BnetNode * nd, st_table * hash,
+                          int params, int nodrop) nogil
+    int Bnet_DfsVariableOrder(DdManager * dd, BnetNetwork * net) nogil
@@ -1,17 +1,41 @@
 # file: cudd.pyx
 
 from __future__ import print_function, unicode_literals
-from libc.stdlib cimport malloc, free
-from libc.stdio cimport FILE, stdout, fopen, fclose, fflush
-from libc.string cimport strcpy
+from libc.stdlib cimport malloc, realloc, free, qsort
+from libc.stdio cimport FILE, stdout, fopen, fclose, fflush, fread, ferror
+from libc.string cimport strcpy, memset, memmove
+from libc.limits cimport LLONG_MIN, LLONG_MAX
+from libc.math cimport frexpl, ldexpl, HUGE_VALL
 from libc.stdint cimport intptr_t, int32_t
+from cpython.exc cimport PyErr_CheckSignals
+from cpython.pythread cimport (PyThread_type_lock, PyThread_allocate_lock,
+                               PyThread_free_lock, PyThread_acquire_lock,
+                               PyThread_release_lock, PyThread_get_thread_ident,
+                               NOWAIT_LOCK, WAIT_LOCK)
+cimport cython
 cimport ccudd
 
+import io
+import json
+import multiprocessing
+import pickle
 import sys
+import time
+import weakref
+from array import array
+from collections import namedtuple
 
 UNIQUE_SLOTS = ccudd.CUDD_UNIQUE_SLOTS
 CACHE_SLOTS = ccudd.CUDD_CACHE_SLOTS
 
+# Approximate sizes in bytes of a node and of a cache entry (64-bit hosts).
+NODE_BYTES = 32
+CACHE_ENTRY_BYTES = 32
+
+# Smallest tables chosen by Cudd.autotune.
+MIN_UNIQUE_SLOTS = 8
+MIN_CACHE_SLOTS = 1024
+
 REORDER_SAME = ccudd.CUDD_REORDER_SAME
 REORDER_NONE = ccudd.CUDD_REORDER_NONE
 REORDER_RANDOM = ccudd.CUDD_REORDER_RANDOM
@@ -52,31 +76,814 @@ RESIDUE_DEFAULT = ccudd.CUDD_RESIDUE_DEFAULT
 RESIDUE_MSB = ccudd.CUDD_RESIDUE_MSB
 RESIDUE_TC = ccudd.CUDD_RESIDUE_TC
 
+PRE_GC_HOOK = ccudd.CUDD_PRE_GC_HOOK
+POST_GC_HOOK = ccudd.CUDD_POST_GC_HOOK
+PRE_REORDERING_HOOK = ccudd.CUDD_PRE_REORDERING_HOOK
+POST_REORDERING_HOOK = ccudd.CUDD_POST_REORDERING_HOOK
+
 cdef class BDD
 cdef class ADD
 cdef class ZDD
+cdef class NodeTable
+cdef class CubeArrays
+cdef class VariableMap
+cdef class NameArray
+cdef class CancellationToken
+cdef class CompiledBDD
+
+class FixpointAborted(RuntimeError):
+    """Raised when a fixpoint computation exceeds a limit.
+
+    reason is 'nodes' or 'timeout'; reached holds the states found in
+    the first iterations.
+    """
+
+    def __init__(self, reason, reached, iterations):
+        RuntimeError.__init__(self, "fixpoint aborted after {0} iterations "
+                              "({1})".format(iterations, reason))
+        self.reason = reason
+        self.reached = reached
+        self.iterations = iterations
+
+class Cancelled(RuntimeError):
+    """Raised when an operation is cancelled through a CancellationToken."""
+
+class ReorderingVetoed(RuntimeError):
+    """Raised when a pre-reordering hook vetoes a reordering."""
+
+class Stats(namedtuple('Stats', [
+        'cache_lookups', 'cache_hits', 'node_count', 'peak_node_count',
+        'peak_live_node_count', 'dead', 'garbage_collections', 'gc_time',
+        'reorderings', 'reordering_time', 'swap_steps', 'memory_in_use'])):
+    """Snapshot of the performance counters of a CUDD manager.
+
+    Times are in milliseconds.  swap_steps is -1 unless CUDD was
+    compiled with DD_COUNT.
+    """
+    __slots__ = ()
+
+    @property
+    def cache_hit_rate(self):
+        """Return the fraction of cache lookups that were hits."""
+        return self.cache_hits / self.cache_lookups if self.cache_lookups else 0.0
+
+Netlist = namedtuple('Netlist', ['name', 'inputs', 'present_states', 'outputs',
+                                 'next_states', 'latches'])
+Netlist.__doc__ = """BDDs of a circuit read by read_blif.
+
+inputs and present_states map signal names to BDD variables; outputs
+and next_states map signal names to their functions.  latches lists
+(present state, next state, initial value) name triples.
+"""
+
+HookInfo = namedtuple('HookInfo', ['kind', 'dd', 'method', 'nodes_before',
+                                   'nodes', 'elapsed'])
+HookInfo.__doc__ = """Data passed to the callbacks installed by Cudd.add_hook.
+
+dd is 'BDD' or 'ZDD' for reordering and 'DD' for garbage collection.
+method is the reordering method, or None for garbage collection.
+nodes_before is the node count when the operation started and nodes
+the current one; elapsed is the time in seconds since the start of
+the operation (0.0 in pre hooks).
+"""
+
+cdef enum:
+    MAP_SWAP
+    MAP_PERMUTE
+    MAP_COMPOSE
+
+cdef enum:
+    CONJOIN_BALANCED
+    CONJOIN_SMALLEST_FIRST
+    CONJOIN_SUPPORT_AFFINITY
+
+ctypedef struct CancelState:
+    int cancelled
+    bint signals
+    void * token
+
+ctypedef struct HeapEntry:
+    long long key
+    ccudd.DdNode * node
+
+cdef enum:
+    DIMACS_OK
+    DIMACS_SYNTAX
+    DIMACS_BDD
+    DIMACS_NOMEM
+
+# Number of bytes read from a DIMACS file at a time.
+cdef int DIMACS_CHUNK = 1 << 20
+
+# Seconds allowed to portfolio_reorder workers to return their results.
+cdef double PORTFOLIO_GRACE = 1.0
+
+# Default seconds of reordering for each portfolio_reorder method.
+cdef double PORTFOLIO_TIMEOUT = 60.0
+
+ctypedef struct DimacsReader:
+    ccudd.DdManager * dd
+    bint appearance
+    int strategy
+    bint limited
+    unsigned int limit
+    int * index
+    long nmapped
+    ccudd.DdNode * * lits
+    int * phase
+    int nlits
+    int litcap
+    HeapEntry * window
+    int nwindow
+    int windowSize
+    ccudd.DdNode * levels[64]
+    ccudd.DdNode * acc
+    long value
+    bint negative
+    bint innumber
+    bint skipline
+    bint linestart
+    bint done
+    long line
+    int error
+
+ctypedef struct LinearTerm:
+    ccudd.DdNode * var
+    long long weight
+    bint negated
+
+ctypedef struct LinearInterval:
+    long long lo
+    long long hi
+    ccudd.DdNode * node
+
+ctypedef struct LinearLevel:
+    LinearInterval * items
+    int n
+    int cap
+
+ctypedef struct Hypergraph:
+    int nv
+    int ne
+    int * eptr
+    int * epin
+    int * vptr
+    int * vedge
+
+# Number of FORCE iterations without improvement before giving up.
+cdef int FORCE_PATIENCE = 5
+
+ctypedef struct SortKey:
+    double key
+    int tie
+    int item
+
+ctypedef struct Bisection:
+    Hypergraph * h
+    signed char * side
+    char * locked
+    int * cnt
+    int * gain
+    int * moves
+    int * buffer
+    HeapEntry * heap[2]
+    int hsize[2]
+    int hcap[2]
+    double tolerance
+    int passes
+    bint failed
+
+# A BDD linearized for weighted counting.  Node 0 is the constant one, at
+# level nvars; the other nodes follow by decreasing level, so children
+# come before their parents.  Edges are (position << 1) | complement.
+ctypedef struct WeightedDag:
+    int n
+    int nvars
+    int root
+    int * variables
+    int * levels
+    int * thens
+    int * elses
+    int * invperm
+
+cdef enum:
+    CUBE_GEN
+    PRIME_GEN
+    PATH_GEN
+
+cdef enum:
+    BDD_TABLE
+    ADD_TABLE
+    ZDD_TABLE
+
+# Node references in a table are encoded as
+# (table index << TABLE_SHIFT) | (position << 1) | complement.
+cdef int TABLE_SHIFT = 40
 
 @staticmethod
 cdef MakeBDD(manager, ccudd.DdNode * node):
-    bdd = BDD(manager)
+    cdef BDD bdd = BDD.__new__(BDD)
+    bdd._mgr = manager
     bdd._node = node
     ccudd.Cudd_Ref(node)
     return bdd
 
 @staticmethod
 cdef MakeADD(manager, ccudd.DdNode * node):
-    add = ADD(manager)
+    cdef ADD add = ADD.__new__(ADD)
+    add._mgr = manager
     add._node = node
     ccudd.Cudd_Ref(node)
     return add
 
 @staticmethod
 cdef MakeZDD(manager, ccudd.DdNode * node):
-    zdd = ZDD(manager)
+    cdef ZDD zdd = ZDD.__new__(ZDD)
+    zdd._mgr = manager
     zdd._node = node
     ccudd.Cudd_Ref(node)
     return zdd
 
+cdef char * * MakeStringArray(list strings) except NULL:
+    """Return a malloc'ed array of UTF-8 encoded copies of strings."""
+    cdef int i
+    cdef int n = len(strings)
+    cdef char * * array = <char * *> malloc((n+1) * sizeof(char *))
+    if array is NULL:
+        raise MemoryError("memory allocation failed")
+    for i in range(n):
+        utfname = strings[i].encode('utf-8')
+        array[i] = <char *> malloc((len(utfname)+1) * sizeof(char))
+        if array[i] is NULL:
+            FreeStringArray(array, i)
+            raise MemoryError("memory allocation failed")
+        strcpy(array[i], utfname)
+    return array
+
+cdef void FreeStringArray(char * * array, int n):
+    """Free an array of strings and the strings it points to."""
+    cdef int i
+    if array is NULL:
+        return
+    for i in range(n):
+        free(array[i])
+    free(array)
+
+cdef ApaToInt(ccudd.DdApaNumber number, int digits):
+    """Return an arbitrary precision number as an int and free it."""
+    cdef int size = sizeof(ccudd.DdApaDigit)
+    cdef unsigned char * buf = <unsigned char *> malloc(digits * size)
+    cdef ccudd.DdApaDigit d
+    cdef int i
+    cdef int j
+    if buf is NULL:
+        ccudd.Cudd_FreeApaNumber(number)
+        raise MemoryError("memory allocation failed")
+    # The digits are most significant first.
+    for i in range(digits):
+        d = number[i]
+        for j in range(size-1, -1, -1):
+            buf[i*size + j] = d & 0xff
+            d >>= 8
+    ccudd.Cudd_FreeApaNumber(number)
+    try:
+        return int.from_bytes(buf[:digits*size], 'big')
+    finally:
+        free(buf)
+
+cdef FloatToInt(long double value):
+    """Return a long double truncated to an int."""
+    cdef int e
+    cdef long double m = frexpl(value, &e)
+    # The mantissa of a long double has at most 64 bits.
+    mantissa = <unsigned long long> ldexpl(m, 64)
+    e -= 64
+    if e >= 0:
+        return mantissa << e
+    return mantissa >> -e
+
+cdef class CancellationToken:
+    """Flag that stops the operations of the managers that poll it.
+
+    Once registered with Cudd.setCancellationToken, the token is polled
+    by CUDD while it builds decision diagrams and reorders variables.
+    After cancel is called, from another thread or a signal handler,
+    the current operation raises Cancelled and leaves the manager in a
+    consistent state; so do later operations until reset is called.
+    With signals=True, the Python signal handlers are also run while
+    CUDD polls the token, so that, for instance, KeyboardInterrupt
+    stops a long operation in the main thread.
+    """
+
+    cdef CancelState _state
+    cdef object _interrupt
+
+    def __cinit__(self, signals=False):
+        """Create a token that is not cancelled."""
+        self._state.cancelled = False
+        self._state.signals = signals
+        self._state.token = <void *> self
+        self._interrupt = None
+
+    def cancel(self):
+        """Request the cancellation of the current operations."""
+        self._state.cancelled = True
+
+    def reset(self):
+        """Allow operations to run again."""
+        self._state.cancelled = False
+        self._interrupt = None
+
+    @property
+    def cancelled(self):
+        """Whether cancellation has been requested."""
+        return bool(self._state.cancelled)
+
+
+cdef class NameArray:
+    """C array of UTF-8 variable names kept up to date incrementally.
+
+    Only the entries of variables whose names changed since the last
+    call of update are encoded again.  Unnamed variables of a partially
+    named manager get a default name made of a prefix and the index.
+    """
+
+    cdef char * * _array
+    cdef int _size
+    cdef str _prefix
+    cdef set _stale
+
+    def __cinit__(self, prefix):
+        """Create an empty array."""
+        self._array = NULL
+        self._size = 0
+        self._prefix = prefix
+        self._stale = set()
+
+    def __dealloc__(self):
+        """Free the array and the names."""
+        FreeStringArray(self._array, self._size)
+
+    cdef void invalidate(self, int index):
+        """Mark the name of one variable as changed."""
+        if index < self._size:
+            self._stale.add(index)
+
+    cdef void clear(self):
+        """Mark all names as changed."""
+        self._stale.update(range(self._size))
+
+    cdef int _set(self, int index, dict names) except -1:
+        """Encode the name of one variable into the array."""
+        name = names.get(index)
+        utfname = (self._prefix + str(index) if name is None else name).encode('utf-8')
+        cdef char * one_name = <char *> malloc((len(utfname)+1) * sizeof(char))
+        if one_name is NULL:
+            raise MemoryError("memory allocation failed")
+        strcpy(one_name, utfname)
+        free(self._array[index])
+        self._array[index] = one_name
+        return 0
+
+    cdef char * * update(self, dict names, int size) except? NULL:
+        """Return the names of size variables, or NULL if none is named."""
+        if not names:
+            return NULL
+        cdef int i
+        cdef char * * array
+        if size > self._size:
+            array = <char * *> realloc(self._array, (size+1) * sizeof(char *))
+            if array is NULL:
+                raise MemoryError("memory allocation failed")
+            self._array = array
+            for i in range(self._size, size):
+                self._array[i] = NULL
+            self._stale.update(range(self._size, size))
+            self._size = size
+        while self._stale:
+            i = self._stale.pop()
+            try:
+                self._set(i, names)
+            except MemoryError:
+                self._stale.add(i)
+                raise
+        return self._array
+
+cdef BatchInputs(inputs, int nvars, packed):
+    """Return batch inputs as a contiguous 2-D array of uint8.
+
+    Rows hold one value per variable, or, if packed is true, the bits
+    of the values in numpy.packbits order.
+    """
+    import numpy
+    rows = numpy.ascontiguousarray(inputs, dtype=numpy.uint8)
+    if rows.ndim != 2:
+        raise TypeError("inputs must be a 2-dimensional array")
+    width = (nvars + 7) // 8 if packed else nvars
+    if rows.shape[1] != width:
+        raise TypeError("row length ({0}) different ".format(rows.shape[1]) +
+                        "from expected length ({0})".format(width))
+    if not packed and rows.size > 0 and rows.max() > 1:
+        raise TypeError("non-binary value in inputs")
+    return rows
+
+cdef inline bint InputBit(const unsigned char * row, unsigned int index,
+                          bint packed) nogil:
+    """Return the value of a variable in an input row."""
+    if packed:
+        return (row[index >> 3] >> (7 - (index & 7))) & 1
+    return row[index]
+
+cdef bint EvalBddRow(ccudd.DdNode * f, const unsigned char * row,
+                     bint packed) nogil:
+    """Return the value of a BDD for one input row."""
+    cdef bint compl = ccudd.Cudd_IsComplement(f)
+    cdef ccudd.DdNode * node = ccudd.Cudd_Regular(f)
+    cdef ccudd.DdNode * child
+    while not ccudd.Cudd_IsConstant(node):
+        if InputBit(row, ccudd.Cudd_NodeReadIndex(node), packed):
+            child = ccudd.Cudd_T(node)
+        else:
+            child = ccudd.Cudd_E(node)
+        compl ^= ccudd.Cudd_IsComplement(child)
+        node = ccudd.Cudd_Regular(child)
+    return not compl
+
+cdef double EvalAddRow(ccudd.DdNode * f, const unsigned char * row,
+                       bint packed) nogil:
+    """Return the value of an ADD for one input row."""
+    cdef ccudd.DdNode * node = f
+    while not ccudd.Cudd_IsConstant(node):
+        if InputBit(row, ccudd.Cudd_NodeReadIndex(node), packed):
+            node = ccudd.Cudd_T(node)
+        else:
+            node = ccudd.Cudd_E(node)
+    return ccudd.Cudd_V(node)
+
+# Kinds of the releases deferred until a manager is unlocked.
+cdef enum:
+    DEFER_BDD = 0
+    DEFER_ZDD = 1
+    DEFER_GEN = 2
+
+cdef inline int AcquireManager(Cudd mgr) except -1:
+    """Lock a manager before calling CUDD.
+
+    The lock is reentrant, so that methods, hooks and signal handlers
+    that run while a thread holds it may lock the manager again.  Its
+    owner and depth only change while the GIL is held; the mutex only
+    puts the threads that wait for the manager to sleep, without the GIL.
+    """
+    cdef unsigned long thread = PyThread_get_thread_ident()
+    if mgr._active and mgr._owner == thread:
+        mgr._active += 1
+        return 0
+    if mgr._active or mgr._handoff:
+        mgr._waiting += 1
+        with nogil:
+            PyThread_acquire_lock(mgr._mutex, WAIT_LOCK)
+        mgr._waiting -= 1
+        mgr._handoff = False
+    mgr._owner = thread
+    mgr._active = 1
+    return 0
+
+cdef inline bint TryAcquireManager(Cudd mgr):
+    """Lock a manager if no other thread holds it; return success."""
+    cdef unsigned long thread = PyThread_get_thread_ident()
+    if mgr._handoff or (mgr._active and mgr._owner != thread):
+        return False
+    mgr._owner = thread
+    mgr._active += 1
+    return True
+
+cdef inline int ReleaseManager(Cudd mgr) except -1:
+    """Unlock a manager and dereference the nodes freed meanwhile."""
+    cdef int kind
+    cdef intptr_t addr
+    if mgr._active == 1:
+        while mgr._deferred:
+            kind, addr = mgr._deferred.pop()
+            if kind == DEFER_GEN:
+                ccudd.Cudd_GenFree(<ccudd.DdGen *>addr)
+            elif kind == DEFER_ZDD:
+                ccudd.Cudd_RecursiveDerefZdd(mgr._manager, <ccudd.DdNode *>addr)
+            else:
+                ccudd.Cudd_RecursiveDeref(mgr._manager, <ccudd.DdNode *>addr)
+    mgr._active -= 1
+    if mgr._active == 0 and mgr._waiting:
+        # Hand the manager over to a waiting thread, so that a thread
+        # that locks the manager in a loop does not starve the others.
+        mgr._handoff = True
+        PyThread_release_lock(mgr._mutex)
+    return 0
+
+cdef int AcquireManagers(Cudd mgr1, Cudd mgr2) except -1:
+    """Lock two managers.
+
+    The managers are locked in a fixed order, so that threads that work
+    on the same two managers in opposite directions do not deadlock.
+    """
+    if <intptr_t>mgr1._manager > <intptr_t>mgr2._manager:
+        mgr1, mgr2 = mgr2, mgr1
+    AcquireManager(mgr1)
+    try:
+        AcquireManager(mgr2)
+    except:
+        ReleaseManager(mgr1)
+        raise
+    return 0
+
+cdef int ReleaseManagers(Cudd mgr1, Cudd mgr2) except -1:
+    """Unlock two managers locked by AcquireManagers."""
+    ReleaseManager(mgr1)
+    ReleaseManager(mgr2)
+    return 0
+
+cdef class ManagerLock:
+    """Reentrant lock of a manager, returned by Cudd.lock."""
+
+    cdef Cudd _mgr
+
+    def __cinit__(self, Cudd mgr):
+        """Create a handle on the lock of a manager."""
+        self._mgr = mgr
+
+    def acquire(self, blocking=True):
+        """Lock the manager; return whether it was locked."""
+        if not blocking:
+            return TryAcquireManager(self._mgr)
+        AcquireManager(self._mgr)
+        return True
+
+    def release(self):
+        """Unlock the manager."""
+        if not (self._mgr._active and
+                self._mgr._owner == PyThread_get_thread_ident()):
+            raise RuntimeError("cannot release un-acquired lock")
+        ReleaseManager(self._mgr)
+
+    def __enter__(self):
+        """Lock the manager."""
+        AcquireManager(self._mgr)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Unlock the manager."""
+        ReleaseManager(self._mgr)
+
+# Number of Python callbacks (hooks and signal handlers) running inside
+# CUDD operations.
+cdef int CALLBACKS = 0
+
+cdef void DerefNode(Cudd mgr, ccudd.DdNode * node, bint zdd):
+    """Dereference a node, or defer it while CUDD may be running.
+
+    Nodes freed while another thread holds the manager, or by Python
+    code that CUDD calls back, are dereferenced when the manager is
+    unlocked.
+    """
+    if CALLBACKS or not TryAcquireManager(mgr):
+        mgr._deferred.append((DEFER_ZDD if zdd else DEFER_BDD,
+                              <intptr_t>node))
+        return
+    if zdd:
+        ccudd.Cudd_RecursiveDerefZdd(mgr._manager, node)
+    else:
+        ccudd.Cudd_RecursiveDeref(mgr._manager, node)
+    ReleaseManager(mgr)
+
+cdef void FreeGenerator(Cudd mgr, ccudd.DdGen * gen):
+    """Free a generator, or defer it like DerefNode."""
+    if CALLBACKS or not TryAcquireManager(mgr):
+        mgr._deferred.append((DEFER_GEN, <intptr_t>gen))
+        return
+    ccudd.Cudd_GenFree(gen)
+    ReleaseManager(mgr)
+
+cdef ManagerError(Cudd mgr):
+    """Return the exception for the error code of a failed operation.
+
+    Timeouts and cancellations clear the error code, so that the
+    manager can be used again once the cause has been removed.
+    """
+    cdef int code = ccudd.Cudd_ReadErrorCode(mgr._manager)
+    vetoed = mgr._hooks is not None and mgr._hooks.pop('vetoed', False)
+    if code == TIMEOUT_EXPIRED:
+        ccudd.Cudd_ClearErrorCode(mgr._manager)
+        return TimeoutError("timeout expired")
+    elif code == TERMINATION:
+        ccudd.Cudd_ClearErrorCode(mgr._manager)
+        return CancellationError(mgr)
+    elif vetoed:
+        return ReorderingVetoed("reordering vetoed by a hook")
+    return MemoryError(mgr.readErrorCode())
+
+cdef CancellationError(Cudd mgr):
+    """Return the exception for an operation stopped by the token."""
+    cdef CancellationToken token = mgr._token
+    if token is not None and token._interrupt is not None:
+        error, token._interrupt = token._interrupt, None
+        return error
+    return Cancelled("operation cancelled")
+
+cdef bint ReorderingCancelled(Cudd mgr):
+    """Tell whether the token stopped a reordering.
+
+    Reordering stops early, with a valid order, without failing.
+    """
+    return mgr._token is not None and mgr._token._state.cancelled
+
+cdef int PollCancellation(const void * arg) noexcept nogil:
+    """Termination callback: tell CUDD whether to stop."""
+    cdef CancelState * state = <CancelState *> arg
+    if state.cancelled:
+        return 1
+    if state.signals:
+        with gil:
+            global CALLBACKS
+            CALLBACKS += 1
+            try:
+                PyErr_CheckSignals()
+            except BaseException as e:
+                # Typically KeyboardInterrupt; re-raised by the operation.
+                (<CancellationToken> state.token)._interrupt = e
+                state.cancelled = True
+            finally:
+                CALLBACKS -= 1
+    return state.cancelled
+
+# Hook callbacks of the managers, keyed by the address of their DdManager.
+cdef dict HOOKS = {}
+
+cdef int RunHooks(ccudd.DdManager * dd, int kind, const char * what,
+                  void * data) noexcept with gil:
+    """Call the Python callbacks of a hook; return 0 if one vetoes."""
+    hooks = HOOKS.get(<intptr_t> dd)
+    if hooks is None or not hooks[kind]:
+        return 1
+    name = what.decode('ascii')
+    if name == 'ZDD':
+        nodes = ccudd.Cudd_zddReadNodeCount(dd)
+    else:
+        nodes = ccudd.Cudd_ReadKeys(dd) - ccudd.Cudd_ReadDead(dd)
+    now = time.time()
+    if kind == PRE_REORDERING_HOOK or kind == PRE_GC_HOOK:
+        method = <int> <intptr_t> data if kind == PRE_REORDERING_HOOK else None
+        hooks['start'][name] = (method, nodes, now)
+        info = HookInfo(kind, name, method, nodes, nodes, 0.0)
+    else:
+        method, before, start = hooks['start'].pop(name, (None, nodes, now))
+        info = HookInfo(kind, name, method, before, nodes, now - start)
+    global CALLBACKS
+    CALLBACKS += 1
+    try:
+        for callback in list(hooks[kind]):
+            try:
+                if callback(info) is False:
+                    if kind == PRE_REORDERING_HOOK:
+                        # Reported by ManagerError.
+                        hooks['vetoed'] = True
+                    return 0
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+    finally:
+        CALLBACKS -= 1
+    return 1
+
+cdef int PreGCHook(ccudd.DdManager * dd, const char * what, void * data) noexcept:
+    return RunHooks(dd, PRE_GC_HOOK, what, data)
+
+cdef int PostGCHook(ccudd.DdManager * dd, const char * what, void * data) noexcept:
+    return RunHooks(dd, POST_GC_HOOK, what, data)
+
+cdef int PreReorderingHook(ccudd.DdManager * dd, const char * what,
+                           void * data) noexcept:
+    return RunHooks(dd, PRE_REORDERING_HOOK, what, data)
+
+cdef int PostReorderingHook(ccudd.DdManager * dd, const char * what,
+                            void * data) noexcept:
+    return RunHooks(dd, POST_REORDERING_HOOK, what, data)
+
+cdef ccudd.DD_HFP HookFunction(int kind):
+    """Return the C function that dispatches a kind of hook to Python."""
+    if kind == PRE_GC_HOOK:
+        return PreGCHook
+    elif kind == POST_GC_HOOK:
+        return PostGCHook
+    elif kind == PRE_REORDERING_HOOK:
+        return PreReorderingHook
+    return PostReorderingHook
+
+cdef list TreeGroups(ccudd.MtrNode * node, list groups):
+    """Append the groups of a variable group tree in preorder."""
+    while node is not NULL:
+        groups.append([node.low, node.size, node.flags])
+        TreeGroups(node.child, groups)
+        node = node.younger
+    return groups
+
+cdef dict SaveOrder(Cudd mgr, bint zdd):
+    """Return the variable order and group tree of a manager."""
+    cdef ccudd.DdManager * dd = mgr._manager
+    cdef ccudd.MtrNode * tree
+    cdef dict names
+    if zdd:
+        nvars = ccudd.Cudd_ReadZddSize(dd)
+        inv = [ccudd.Cudd_ReadInvPermZdd(dd, i) for i in range(nvars)]
+        names = mgr._zvarnames
+        tree = ccudd.Cudd_ReadZddTree(dd)
+    else:
+        nvars = ccudd.Cudd_ReadSize(dd)
+        inv = [ccudd.Cudd_ReadInvPerm(dd, i) for i in range(nvars)]
+        names = mgr._varnames
+        tree = ccudd.Cudd_ReadTree(dd)
+    # The root of the tree spans all variables and is not a group.
+    groups = TreeGroups(tree.child, []) if tree is not NULL else []
+    return {'variables': [[index, names.get(index)] for index in inv],
+            'groups': groups}
+
+cdef list MatchVariables(Cudd mgr, dict record, bint byname, bint zdd):
+    """Return the indices of the variables of a saved order in a manager.
+
+    Variables saved without a name are matched by index.  Unmatched
+    variables are None.
+    """
+    if zdd:
+        nvars = ccudd.Cudd_ReadZddSize(mgr._manager)
+        names = mgr._zvarnames
+    else:
+        nvars = ccudd.Cudd_ReadSize(mgr._manager)
+        names = mgr._varnames
+    indices = {name: index for index, name in names.items()}
+    return [indices.get(name) if byname and name is not None else
+            index if 0 <= index < nvars else None
+            for index, name in record['variables']]
+
+cdef RestoreOrder(Cudd mgr, dict record, bint byname, bint zdd):
+    """Apply a saved variable order and group tree to a manager."""
+    cdef ccudd.DdManager * dd = mgr._manager
+    cdef ccudd.MtrNode * res
+    if zdd:
+        nvars = ccudd.Cudd_ReadZddSize(dd)
+        inv = [ccudd.Cudd_ReadInvPermZdd(dd, i) for i in range(nvars)]
+    else:
+        nvars = ccudd.Cudd_ReadSize(dd)
+        inv = [ccudd.Cudd_ReadInvPerm(dd, i) for i in range(nvars)]
+    saved = MatchVariables(mgr, record, byname, zdd)
+    placed = [index for index in dict.fromkeys(saved) if index is not None]
+    # Matched variables take the levels that they occupy now in the
+    # saved order; the other variables do not move.
+    level = {index: i for i, index in enumerate(inv)}
+    for i, index in zip(sorted(level[index] for index in placed), placed):
+        inv[i] = index
+    level = {index: i for i, index in enumerate(inv)}
+    if zdd:
+        ccudd.Cudd_FreeZddTree(dd)
+        if nvars > 1:
+            mgr.zddShuffleHeap(inv)
+    else:
+        ccudd.Cudd_FreeTree(dd)
+        if nvars > 1:
+            mgr.shuffleHeap(inv)
+    # Recreate the groups whose variables are still contiguous.
+    for low, size, flags in record['groups']:
+        levels = [level[saved[i]] if saved[i] is not None else None
+                  for i in range(low, min(low + size, len(saved)))]
+        if None in levels:
+            continue
+        if levels:
+            first = min(levels)
+            if max(levels) - first + 1 != len(levels):
+                continue
+            first = inv[first]
+        else:
+            first = low
+        if zdd:
+            res = ccudd.Cudd_MakeZddTreeNode(dd, first, size, flags)
+        else:
+            res = ccudd.Cudd_MakeTreeNode(dd, first, size, flags)
+        if res is NULL:
+            raise ManagerError(mgr)
+
+cdef tuple CnfHeader(file_path):
+    """Return the numbers of variables and clauses of a CNF file."""
+    with open(file_path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0] == 'c':
+                continue
+            if fields[0] != 'p':
+                break
+            try:
+                nvars, nclauses = int(fields[2]), int(fields[3])
+            except (IndexError, ValueError):
+                break
+            if fields[1] != 'cnf' or nvars < 0 or nclauses < 0:
+                break
+            return nvars, nclauses
+    raise IOError("invalid CNF header in {0}".format(file_path))
+
 cdef class Cudd:
     """A class for decision diagrams.
 
@@ -89,21 +896,90 @@ cdef class Cudd:
     cdef ccudd.DdManager * _manager
     cdef dict _varnames
     cdef dict _zvarnames
-
-    def __cinit__(self, bddVars=0, zddVars=0, maxMem=0):
+    cdef NameArray _cnames
+    cdef NameArray _zcnames
+    cdef dict _tables
+    cdef PyThread_type_lock _mutex
+    cdef unsigned long _owner
+    cdef int _active
+    cdef int _waiting
+    cdef bint _handoff
+    cdef list _deferred
+    cdef dict _hooks
+    cdef CancellationToken _token
+
+    def __cinit__(self, bddVars=0, zddVars=0, maxMem=0,
+                  uniqueSlots=UNIQUE_SLOTS, cacheSlots=CACHE_SLOTS,
+                  maxCacheHard=None, minHit=None, looseUpTo=None):
         """Create a CUDD manager."""
+        self._mutex = PyThread_allocate_lock()
+        if self._mutex is NULL:
+            raise MemoryError("memory allocation failed")
+        # Waiting threads block on the mutex until ReleaseManager wakes one.
+        PyThread_acquire_lock(self._mutex, NOWAIT_LOCK)
         self._manager = ccudd.Cudd_Init(bddVars,zddVars,
-                                        ccudd.CUDD_UNIQUE_SLOTS,
-                                        ccudd.CUDD_CACHE_SLOTS,
+                                        uniqueSlots,
+                                        cacheSlots,
                                         maxMem)
         if self._manager is NULL:
-            raise MemoryError(self.readErrorCode())
+            raise ManagerError(self)
+        if maxCacheHard is not None:
+            ccudd.Cudd_SetMaxCacheHard(self._manager, maxCacheHard)
+        if minHit is not None:
+            ccudd.Cudd_SetMinHit(self._manager, minHit)
+        if looseUpTo is not None:
+            ccudd.Cudd_SetLooseUpTo(self._manager, looseUpTo)
         self._varnames = {}
         self._zvarnames = {}
+        self._cnames = NameArray('x')
+        self._zcnames = NameArray('z')
+        self._tables = {}
+        self._active = 0
+        self._deferred = []
 
     def __dealloc__(self):
         """Destroy a CUDD manager."""
+        if self._hooks is not None:
+            del HOOKS[<intptr_t> self._manager]
         ccudd.Cudd_Quit(self._manager)
+        if self._mutex is not NULL:
+            PyThread_free_lock(self._mutex)
+
+    def __reduce__(self):
+        """Pickle a manager with its variables, their order and names."""
+        AcquireManager(self)
+        try:
+            nvars = ccudd.Cudd_ReadSize(self._manager)
+            nzvars = ccudd.Cudd_ReadZddSize(self._manager)
+            perm = [ccudd.Cudd_ReadInvPerm(self._manager, i) for i in range(nvars)]
+            zperm = [ccudd.Cudd_ReadInvPermZdd(self._manager, i) for i in range(nzvars)]
+            return (Cudd, (nvars, nzvars),
+                    (perm, self._varnames, zperm, self._zvarnames))
+        finally:
+            ReleaseManager(self)
+
+    def __setstate__(self, state):
+        """Restore variable order and names of an unpickled manager."""
+        perm, varnames, zperm, zvarnames = state
+        if len(perm) > 1:
+            self.shuffleHeap(perm)
+        if len(zperm) > 1:
+            self.zddShuffleHeap(zperm)
+        self._varnames = dict(varnames)
+        self._zvarnames = dict(zvarnames)
+        self._cnames.clear()
+        self._zcnames.clear()
+
+    def lock(self):
+        """Return the reentrant lock of this manager.
+
+        Every operation that calls CUDD holds this lock; long operations
+        such as reordering, quantification, composition and minterm
+        counting release the GIL meanwhile, so that other threads and
+        other managers can run.  Hold the lock to make a sequence of
+        operations atomic.
+        """
+        return ManagerLock(self)
 
     def size(self):
         """Return number of variables in manager."""
@@ -119,33 +995,76 @@ cdef class Cudd:
 
     def reserve(self, amount):
         """Expand manager without creating variables."""
-        if not ccudd.Cudd_Reserve(self._manager, amount):
-            raise MemoryError(self.readErrorCode())
+        AcquireManager(self)
+        try:
+            if not ccudd.Cudd_Reserve(self._manager, amount):
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
 
     def printInfo(self):
         """Print out statistics and settings for the CUDD manager."""
-        sys.stdout.flush()
-        ccudd.Cudd_PrintInfo(self._manager, stdout)
-        fflush(stdout)
+        AcquireManager(self)
+        try:
+            sys.stdout.flush()
+            ccudd.Cudd_PrintInfo(self._manager, stdout)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self)
+
+    def stats(self):
+        """Return a Stats snapshot of the performance counters."""
+        cdef ccudd.DdManager * dd = self._manager
+        AcquireManager(self)
+        try:
+            return Stats(cache_lookups=ccudd.Cudd_ReadCacheLookUps(dd),
+                         cache_hits=ccudd.Cudd_ReadCacheHits(dd),
+                         node_count=ccudd.Cudd_ReadNodeCount(dd),
+                         peak_node_count=ccudd.Cudd_ReadPeakNodeCount(dd),
+                         peak_live_node_count=ccudd.Cudd_ReadPeakLiveNodeCount(dd),
+                         dead=ccudd.Cudd_ReadDead(dd),
+                         garbage_collections=ccudd.Cudd_ReadGarbageCollections(dd),
+                         gc_time=ccudd.Cudd_ReadGarbageCollectionTime(dd),
+                         reorderings=ccudd.Cudd_ReadReorderings(dd),
+                         reordering_time=ccudd.Cudd_ReadReorderingTime(dd),
+                         swap_steps=ccudd.Cudd_ReadSwapSteps(dd),
+                         memory_in_use=ccudd.Cudd_ReadMemoryInUse(dd))
+        finally:
+            ReleaseManager(self)
+
+    def stats_delta(self, since):
+        """Return the change of the performance counters since a snapshot."""
+        if not isinstance(since, Stats):
+            raise TypeError("expected a Stats snapshot")
+        return Stats._make(a - b for a, b in zip(self.stats(), since))
 
     def bddVar(self, index=None, name=None):
         """Return a BDD variable."""
         cdef ccudd.DdNode * var
-        if index is None:
-            var = ccudd.Cudd_bddNewVar(self._manager)
-        else:
-            var = ccudd.Cudd_bddIthVar(self._manager, index)
-        if var is NULL:
-            raise MemoryError(self.readErrorCode())
-        if name is not None:
-            self._varnames[ccudd.Cudd_NodeReadIndex(var)] = name
-        return MakeBDD(self, var)
+        AcquireManager(self)
+        try:
+            if index is None:
+                var = ccudd.Cudd_bddNewVar(self._manager)
+            else:
+                var = ccudd.Cudd_bddIthVar(self._manager, index)
+            if var is NULL:
+                raise ManagerError(self)
+            if name is not None:
+                self._varnames[ccudd.Cudd_NodeReadIndex(var)] = name
+                self._cnames.invalidate(ccudd.Cudd_NodeReadIndex(var))
+            return MakeBDD(self, var)
+        finally:
+            ReleaseManager(self)
 
     def bddVariables(self):
         """Return list of BDD variables."""
-        nvars = ccudd.Cudd_ReadSize(self._manager)
-        return [MakeBDD(self, ccudd.Cudd_bddIthVar(self._manager, index))
-                for index in range(nvars)]
+        AcquireManager(self)
+        try:
+            nvars = ccudd.Cudd_ReadSize(self._manager)
+            return [MakeBDD(self, ccudd.Cudd_bddIthVar(self._manager, index))
+                    for index in range(nvars)]
+        finally:
+            ReleaseManager(self)
 
     def getVariableName(self, index):
         """Return the name of a variable."""
@@ -157,47 +1076,72 @@ cdef class Cudd:
     def clearVariableNames(self):
         """Clear variable names."""
         self._varnames = {}
+        self._cnames.clear()
 
     def addVar(self, index=None, name=None):
         """Return an ADD variable."""
         cdef ccudd.DdNode * var
-        if index is None:
-            var = ccudd.Cudd_addNewVar(self._manager)
-        else:
-            var = ccudd.Cudd_addIthVar(self._manager, index)
-        if var is NULL:
-            raise MemoryError(self.readErrorCode())
-        if name is not None:
-            self._varnames[ccudd.Cudd_NodeReadIndex(var)] = name
-        return MakeADD(self, var)
+        AcquireManager(self)
+        try:
+            if index is None:
+                var = ccudd.Cudd_addNewVar(self._manager)
+            else:
+                var = ccudd.Cudd_addIthVar(self._manager, index)
+            if var is NULL:
+                raise ManagerError(self)
+            if name is not None:
+                self._varnames[ccudd.Cudd_NodeReadIndex(var)] = name
+                self._cnames.invalidate(ccudd.Cudd_NodeReadIndex(var))
+            return MakeADD(self, var)
+        finally:
+            ReleaseManager(self)
 
     def addVariables(self):
         """Return list of ADD variables."""
-        nvars = ccudd.Cudd_ReadSize(self._manager)
-        return [MakeADD(self, ccudd.Cudd_addIthVar(self._manager, index))
-                for index in range(nvars)]
+        AcquireManager(self)
+        try:
+            nvars = ccudd.Cudd_ReadSize(self._manager)
+            return [MakeADD(self, ccudd.Cudd_addIthVar(self._manager, index))
+                    for index in range(nvars)]
+        finally:
+            ReleaseManager(self)
 
     def addConst(self, value):
         """Return an ADD constant."""
-        cdef ccudd.DdNode * cnst = ccudd.Cudd_addConst(self._manager, value)
-        return MakeADD(self, cnst)
+        cdef ccudd.DdNode * cnst
+        AcquireManager(self)
+        try:
+            cnst = ccudd.Cudd_addConst(self._manager, value)
+            return MakeADD(self, cnst)
+        finally:
+            ReleaseManager(self)
 
     def zddVar(self, index=None, name=None):
         """Return a ZDD variable."""
-        if index is None:
-            index = ccudd.Cudd_ReadZddSize(self._manager)
-        cdef ccudd.DdNode * var = ccudd.Cudd_zddIthVar(self._manager, index)
-        if var is NULL:
-            raise MemoryError(self.readErrorCode())
-        if name is not None:
-            self._zvarnames[index] = name
-        return MakeZDD(self, var)
+        cdef ccudd.DdNode * var
+        AcquireManager(self)
+        try:
+            if index is None:
+                index = ccudd.Cudd_ReadZddSize(self._manager)
+            var = ccudd.Cudd_zddIthVar(self._manager, index)
+            if var is NULL:
+                raise ManagerError(self)
+            if name is not None:
+                self._zvarnames[index] = name
+                self._zcnames.invalidate(index)
+            return MakeZDD(self, var)
+        finally:
+            ReleaseManager(self)
 
     def zddVariables(self):
         """Return list of ZDD variables."""
-        nvars = ccudd.Cudd_ReadZddSize(self._manager)
-        return [MakeZDD(self, ccudd.Cudd_zddIthVar(self._manager, index))
-                for index in range(nvars)]
+        AcquireManager(self)
+        try:
+            nvars = ccudd.Cudd_ReadZddSize(self._manager)
+            return [MakeZDD(self, ccudd.Cudd_zddIthVar(self._manager, index))
+                    for index in range(nvars)]
+        finally:
+            ReleaseManager(self)
 
     def getZVariableName(self, index):
         """Return the name of a ZDD variable."""
@@ -209,84 +1153,143 @@ cdef class Cudd:
     def clearZVariableNames(self):
         """Clear ZDD variable names."""
         self._zvarnames = {}
+        self._zcnames.clear()
 
     def zddVarsFromBddVars(self, multiplicity=1):
-        if not ccudd.Cudd_zddVarsFromBddVars(self._manager, multiplicity):
-            raise MemoryError(self.readErrorCode())
+        AcquireManager(self)
+        try:
+            if not ccudd.Cudd_zddVarsFromBddVars(self._manager, multiplicity):
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
 
     def bddOne(self):
         """Return the true function."""
-        cdef ccudd.DdNode * one = ccudd.Cudd_ReadOne(self._manager)
-        if one is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, one)
+        cdef ccudd.DdNode * one
+        AcquireManager(self)
+        try:
+            one = ccudd.Cudd_ReadOne(self._manager)
+            if one is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, one)
+        finally:
+            ReleaseManager(self)
 
     def bddZero(self):
         """Return the false function."""
-        cdef ccudd.DdNode * zero = ccudd.Cudd_ReadLogicZero(self._manager)
-        if zero is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, zero)
+        cdef ccudd.DdNode * zero
+        AcquireManager(self)
+        try:
+            zero = ccudd.Cudd_ReadLogicZero(self._manager)
+            if zero is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, zero)
+        finally:
+            ReleaseManager(self)
 
     def addOne(self):
         """Return the ADD function that is identically 1."""
-        cdef ccudd.DdNode * one = ccudd.Cudd_ReadOne(self._manager)
-        if one is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeADD(self, one)
+        cdef ccudd.DdNode * one
+        AcquireManager(self)
+        try:
+            one = ccudd.Cudd_ReadOne(self._manager)
+            if one is NULL:
+                raise ManagerError(self)
+            return MakeADD(self, one)
+        finally:
+            ReleaseManager(self)
 
     def addZero(self):
         """Return the ADD function that is identically 0."""
-        cdef ccudd.DdNode * zero = ccudd.Cudd_ReadZero(self._manager)
-        if zero is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeADD(self, zero)
+        cdef ccudd.DdNode * zero
+        AcquireManager(self)
+        try:
+            zero = ccudd.Cudd_ReadZero(self._manager)
+            if zero is NULL:
+                raise ManagerError(self)
+            return MakeADD(self, zero)
+        finally:
+            ReleaseManager(self)
 
     def plusInfinity(self):
         """Return the ADD function that is identically plus infinity."""
-        cdef ccudd.DdNode * zero = ccudd.Cudd_ReadPlusInfinity(self._manager)
-        if zero is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeADD(self, zero)
+        cdef ccudd.DdNode * zero
+        AcquireManager(self)
+        try:
+            zero = ccudd.Cudd_ReadPlusInfinity(self._manager)
+            if zero is NULL:
+                raise ManagerError(self)
+            return MakeADD(self, zero)
+        finally:
+            ReleaseManager(self)
 
     def minusInfinity(self):
         """Return the ADD function that is identically minus infinity."""
-        cdef ccudd.DdNode * zero = ccudd.Cudd_ReadMinusInfinity(self._manager)
-        if zero is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeADD(self, zero)
+        cdef ccudd.DdNode * zero
+        AcquireManager(self)
+        try:
+            zero = ccudd.Cudd_ReadMinusInfinity(self._manager)
+            if zero is NULL:
+                raise ManagerError(self)
+            return MakeADD(self, zero)
+        finally:
+            ReleaseManager(self)
 
     def background(self):
         """Return the ADD function that is the current background value."""
-        cdef ccudd.DdNode * zero = ccudd.Cudd_ReadBackground(self._manager)
-        if zero is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeADD(self, zero)
+        cdef ccudd.DdNode * zero
+        AcquireManager(self)
+        try:
+            zero = ccudd.Cudd_ReadBackground(self._manager)
+            if zero is NULL:
+                raise ManagerError(self)
+            return MakeADD(self, zero)
+        finally:
+            ReleaseManager(self)
 
     def setBackground(self, ADD bck):
         """Set the manager's background value."""
-        ccudd.Cudd_SetBackground(self._manager, bck._node)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_SetBackground(self._manager, bck._node)
+        finally:
+            ReleaseManager(self)
 
     def zddOne(self, topIndex=0):
         """Return the ZDD function that is identically 1."""
-        cdef ccudd.DdNode * one = ccudd.Cudd_ReadZddOne(self._manager, topIndex)
-        if one is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeZDD(self, one)
+        cdef ccudd.DdNode * one
+        AcquireManager(self)
+        try:
+            one = ccudd.Cudd_ReadZddOne(self._manager, topIndex)
+            if one is NULL:
+                raise ManagerError(self)
+            return MakeZDD(self, one)
+        finally:
+            ReleaseManager(self)
 
     def zddBase(self):
         """Return the ZDD base (negation of all variables)."""
-        cdef ccudd.DdNode * base = ccudd.Cudd_ReadOne(self._manager)
-        if base is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeZDD(self, base)
+        cdef ccudd.DdNode * base
+        AcquireManager(self)
+        try:
+            base = ccudd.Cudd_ReadOne(self._manager)
+            if base is NULL:
+                raise ManagerError(self)
+            return MakeZDD(self, base)
+        finally:
+            ReleaseManager(self)
 
     def zddEmpty(self):
         """Return the ZDD empty."""
-        cdef ccudd.DdNode * empty = ccudd.Cudd_ReadZero(self._manager)
-        if empty is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeZDD(self, empty)
+        cdef ccudd.DdNode * empty
+        AcquireManager(self)
+        try:
+            empty = ccudd.Cudd_ReadZero(self._manager)
+            if empty is NULL:
+                raise ManagerError(self)
+            return MakeZDD(self, empty)
+        finally:
+            ReleaseManager(self)
 
     def readStartTime(self):
         """Return the manager's start time."""
@@ -298,11 +1301,37 @@ cdef class Cudd:
 
     def setStartTime(self, st):
         """Set the manager's start time."""
-        ccudd.Cudd_SetStartTime(self._manager, st)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_SetStartTime(self._manager, st)
+        finally:
+            ReleaseManager(self)
 
     def resetStartTime(self):
         """Reset the manager's start time."""
-        ccudd.Cudd_ResetStartTime(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_ResetStartTime(self._manager)
+        finally:
+            ReleaseManager(self)
+
+    def setCancellationToken(self, CancellationToken token=None):
+        """Poll a cancellation token during operations; None removes it."""
+        AcquireManager(self)
+        try:
+            if token is None:
+                ccudd.Cudd_UnregisterTerminationCallback(self._manager)
+            else:
+                ccudd.Cudd_RegisterTerminationCallback(self._manager,
+                                                       PollCancellation,
+                                                       &token._state)
+            self._token = token
+        finally:
+            ReleaseManager(self)
+
+    def readCancellationToken(self):
+        """Return the cancellation token polled by the manager."""
+        return self._token
 
     def readTimeLimit(self):
         """Return the manager's time limit."""
@@ -310,19 +1339,35 @@ cdef class Cudd:
 
     def setTimeLimit(self, lt):
         """Set the manager's time limit."""
-        return ccudd.Cudd_SetTimeLimit(self._manager, lt)
+        AcquireManager(self)
+        try:
+            return ccudd.Cudd_SetTimeLimit(self._manager, lt)
+        finally:
+            ReleaseManager(self)
 
     def updateTimeLimit(self):
         """Update the manager's time limit."""
-        ccudd.Cudd_UpdateTimeLimit(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_UpdateTimeLimit(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def increaseTimeLimit(self, increase):
         """Increase the manager's time limit."""
-        ccudd.Cudd_IncreaseTimeLimit(self._manager, increase)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_IncreaseTimeLimit(self._manager, increase)
+        finally:
+            ReleaseManager(self)
 
     def unsetTimeLimit(self):
         """Unset the manager's time limit."""
-        ccudd.Cudd_UnsetTimeLimit(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_UnsetTimeLimit(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def timeLimited(self):
         """Test whether the manager is time-limited."""
@@ -334,7 +1379,11 @@ cdef class Cudd:
 
     def setMaxLive(self, maxLive):
         """Set the manager's maximum number of live nodes."""
-        ccudd.Cudd_SetMaxLive(self._manager, maxLive)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_SetMaxLive(self._manager, maxLive)
+        finally:
+            ReleaseManager(self)
 
     def readMaxMemory(self):
         """Return the manager's target maximum memory."""
@@ -342,81 +1391,377 @@ cdef class Cudd:
 
     def setMaxMemory(self, maxMemory):
         """Set the manager's target maximum memory."""
-        ccudd.Cudd_SetMaxMemory(self._manager, maxMemory)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_SetMaxMemory(self._manager, maxMemory)
+        finally:
+            ReleaseManager(self)
+
+    def readUniqueSlots(self):
+        """Return the total number of slots of the unique tables."""
+        return ccudd.Cudd_ReadSlots(self._manager)
+
+    def readCacheSlots(self):
+        """Return the number of slots of the computed table."""
+        return ccudd.Cudd_ReadCacheSlots(self._manager)
+
+    def readMaxCacheHard(self):
+        """Return the maximum number of slots of the computed table."""
+        return ccudd.Cudd_ReadMaxCacheHard(self._manager)
+
+    def setMaxCacheHard(self, maxCacheHard):
+        """Set the maximum number of slots of the computed table."""
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_SetMaxCacheHard(self._manager, maxCacheHard)
+        finally:
+            ReleaseManager(self)
+
+    def readMinHit(self):
+        """Return the hit rate (percent) that causes the cache to grow."""
+        return ccudd.Cudd_ReadMinHit(self._manager)
+
+    def setMinHit(self, minHit):
+        """Set the hit rate (percent) that causes the cache to grow."""
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_SetMinHit(self._manager, minHit)
+        finally:
+            ReleaseManager(self)
+
+    def readLooseUpTo(self):
+        """Return the table size up to which the unique tables grow fast."""
+        return ccudd.Cudd_ReadLooseUpTo(self._manager)
+
+    def setLooseUpTo(self, looseUpTo):
+        """Set the table size up to which the unique tables grow fast."""
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_SetLooseUpTo(self._manager, looseUpTo)
+        finally:
+            ReleaseManager(self)
+
+    @staticmethod
+    def autotune(maxMem):
+        """Return constructor arguments that size the tables for maxMem bytes.
+
+        The computed table starts at about 1/16 of maxMem and may grow
+        up to 1/3 of it; the unique tables grow fast up to 1/5.  The
+        initial subtables keep the proportion of UNIQUE_SLOTS to
+        CACHE_SLOTS.  Both are powers of two, and budgets too small for
+        MIN_CACHE_SLOTS are rejected.
+
+        >>> mgr = Cudd(**Cudd.autotune(8 * 2**30))
+        """
+        minMem = 16 * MIN_CACHE_SLOTS * CACHE_ENTRY_BYTES
+        if maxMem < minMem:
+            raise ValueError("maxMem must be at least {0} bytes".format(minMem))
+        cacheSlots = 1 << ((maxMem // (16 * CACHE_ENTRY_BYTES)).bit_length() - 1)
+        uniqueSlots = max(MIN_UNIQUE_SLOTS,
+                          cacheSlots * UNIQUE_SLOTS // CACHE_SLOTS)
+        return dict(maxMem=maxMem, uniqueSlots=uniqueSlots,
+                    cacheSlots=cacheSlots,
+                    maxCacheHard=max(cacheSlots,
+                                     maxMem // (3 * CACHE_ENTRY_BYTES)),
+                    looseUpTo=maxMem // (5 * NODE_BYTES))
 
     def srandom(self, seed=1):
         """Set the seed of the package's random number generator."""
         cdef int32_t s = seed
-        ccudd.Cudd_Srandom(self._manager, s)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_Srandom(self._manager, s)
+        finally:
+            ReleaseManager(self)
 
     def autodynEnable(self, method = ccudd.CUDD_REORDER_SIFT):
         """Enable dynamic variable reordering."""
-        ccudd.Cudd_AutodynEnable(self._manager, method)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_AutodynEnable(self._manager, method)
+        finally:
+            ReleaseManager(self)
 
     def autodynDisable(self):
         """Disable dynamic variable reordering."""
-        ccudd.Cudd_AutodynDisable(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_AutodynDisable(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def reorderingStatus(self):
         """Return the current reodering status and default method."""
         cdef ccudd.Cudd_ReorderingType method
-        cdef bint status = ccudd.Cudd_ReorderingStatus(self._manager, &method)
-        return (status, method)
+        cdef bint status
+        AcquireManager(self)
+        try:
+            status = ccudd.Cudd_ReorderingStatus(self._manager, &method)
+            return (status, method)
+        finally:
+            ReleaseManager(self)
 
     def reduceHeap(self, method = ccudd.CUDD_REORDER_SIFT, minsize = 0):
         """Invoke variable reordering."""
-        cdef int res = ccudd.Cudd_ReduceHeap(self._manager, method, minsize)
-        if res == 0:
-            raise MemoryError(self.readErrorCode())
-        return res
+        cdef ccudd.Cudd_ReorderingType heuristic = method
+        cdef int minimum = minsize
+        cdef int res
+        AcquireManager(self)
+        try:
+            with nogil:
+                res = ccudd.Cudd_ReduceHeap(self._manager, heuristic, minimum)
+            if res == 0:
+                raise ManagerError(self)
+            if ReorderingCancelled(self):
+                raise CancellationError(self)
+            return res
+        finally:
+            ReleaseManager(self)
+
+    def portfolio_reorder(self, roots, methods=None, workers=None,
+                          timeout=None):
+        """Try several reordering methods in parallel and keep the best.
+
+        The manager and the roots are pickled, with the variable group
+        tree, and each method is run on a copy in a separate process.
+        The order that gives the roots the smallest shared size is then
+        applied with shuffleHeap; until then the manager keeps its
+        current order.  Each method is given timeout seconds of CUDD
+        time (one minute by default), after which it stops with the
+        order reached so far; methods that do not return within that
+        time (and a short grace period) are abandoned.  REORDER_EXACT,
+        which is not in the default methods, requires an explicit
+        timeout.  Return the winning method and the new size of the
+        roots; the method is None if no method improved on the current
+        order.
+        """
+        if methods is None:
+            methods = [REORDER_SIFT_CONVERGE, REORDER_GROUP_SIFT_CONV,
+                       REORDER_ANNEALING, REORDER_GENETIC]
+        roots = list(roots)
+        if not roots:
+            raise ValueError("no roots to reorder for")
+        methods = list(methods)
+        if timeout is None:
+            if REORDER_EXACT in methods:
+                raise ValueError("REORDER_EXACT requires a timeout")
+            timeout = PORTFOLIO_TIMEOUT
+        if workers is None:
+            workers = min(len(methods), multiprocessing.cpu_count())
+        # The manager is not locked while the workers reorder.
+        AcquireManager(self)
+        try:
+            data = pickle.dumps((self, roots, SaveOrder(self, False)),
+                                pickle.HIGHEST_PROTOCOL)
+        finally:
+            ReleaseManager(self)
+        best_method = None
+        best_size = self.sharingSize(roots)
+        best_order = None
+        rounds = (len(methods) + workers - 1) // workers
+        deadline = time.time() + rounds * timeout + PORTFOLIO_GRACE
+        pool = multiprocessing.Pool(workers)
+        try:
+            pending = [(method, pool.apply_async(_portfolioWorker,
+                                                 (data, method, timeout)))
+                       for method in methods]
+            for method, result in pending:
+                wait = max(0.0, deadline - time.time())
+                try:
+                    size, order = result.get(wait)
+                except Exception:
+                    # Timed out or failed: this method does not compete.
+                    continue
+                if size < best_size:
+                    best_method, best_size, best_order = method, size, order
+        finally:
+            pool.terminate()
+            pool.join()
+        if best_order is not None:
+            self.shuffleHeap(best_order)
+        return best_method, best_size
+
+    def transfer_many(self, bdds, Cudd other):
+        """Transfer BDDs of this manager to another manager.
+
+        Unlike transferring the BDDs one by one, the nodes they share are
+        translated only once, so the work is proportional to their shared
+        size.  Variables are matched by index and created in the other
+        manager when missing; its variable order may differ.  Return the
+        list of transferred BDDs.
+        """
+        cdef BDD f
+        cdef list sources = []
+        for f in bdds:
+            if f._mgr is not self:
+                raise ValueError("BDD does not belong to this manager")
+            sources.append(f)
+        if other is self:
+            return sources
+        cdef int n = len(sources)
+        cdef int i
+        cdef bint res
+        cdef ccudd.DdNode * * nodes = <ccudd.DdNode * *> malloc(
+            (n+1) * sizeof(ccudd.DdNode *))
+        if nodes is NULL:
+            raise MemoryError("memory allocation failed")
+        for i in range(n):
+            nodes[i] = (<BDD>sources[i])._node
+        AcquireManagers(self, other)
+        try:
+            with nogil:
+                res = TransferMany(self._manager, other._manager, nodes, n)
+            if not res:
+                raise ManagerError(other)
+            results = []
+            for i in range(n):
+                results.append(MakeBDD(other, nodes[i]))
+                ccudd.Cudd_RecursiveDeref(other._manager, nodes[i])
+            return results
+        finally:
+            free(nodes)
+            ReleaseManagers(self, other)
 
     def shuffleHeap(self, list permutation):
         """Permute variable order."""
-        cdef int size = ccudd.Cudd_ReadSize(self._manager)
-        if len(permutation) != size:
-            raise TypeError("length of permutation ({0}) different ".format(len(permutation))
-                            + "from number of variables ({0})".format(size))
-        cdef int * p = <int *> malloc(size * sizeof(int))
-        if p is NULL:
-            raise MemoryError(self.readErrorCode())
-        for i in range(size):
-            v = permutation[i]
-            if not 0 <= v < size:
-                raise TypeError("{0} is not a valid variable index (not between 0 and {1})".format(v,size))
-            p[i] = v
-        cdef bint res = ccudd.Cudd_ShuffleHeap(self._manager, p)
-        free(p)
-        if not res:
-            raise MemoryError(self.readErrorCode())
+        cdef int size
+        cdef int * p
+        cdef bint res
+        AcquireManager(self)
+        try:
+            size = ccudd.Cudd_ReadSize(self._manager)
+            if len(permutation) != size:
+                raise TypeError("length of permutation ({0}) different ".format(len(permutation))
+                                + "from number of variables ({0})".format(size))
+            p = <int *> malloc(size * sizeof(int))
+            if p is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(size):
+                v = permutation[i]
+                if not 0 <= v < size:
+                    raise TypeError("{0} is not a valid variable index (not between 0 and {1})".format(v,size))
+                p[i] = v
+            with nogil:
+                res = ccudd.Cudd_ShuffleHeap(self._manager, p)
+            free(p)
+            if not res:
+                raise ManagerError(self)
+            if ReorderingCancelled(self):
+                raise CancellationError(self)
+        finally:
+            ReleaseManager(self)
 
     def zddShuffleHeap(self, list permutation):
         """Permute ZDD variable order."""
-        cdef int size = ccudd.Cudd_ReadZddSize(self._manager)
-        if len(permutation) != size:
-            raise TypeError("length of permutation ({0}) different ".format(len(permutation))
-                            + "from number of variables ({0})".format(size))
-        cdef int * p = <int *> malloc(size * sizeof(int))
-        if p is NULL:
-            raise MemoryError(self.readErrorCode())
-        for i in range(size):
-            v = permutation[i]
-            if not 0 <= v < size:
-                raise TypeError("{0} is not a valid variable index (not between 0 and {1})".format(v,size))
-            p[i] = v
-        cdef bint res = ccudd.Cudd_zddShuffleHeap(self._manager, p)
-        free(p)
-        if not res:
-            raise MemoryError(self.readErrorCode())
+        cdef int size
+        cdef int * p
+        cdef bint res
+        AcquireManager(self)
+        try:
+            size = ccudd.Cudd_ReadZddSize(self._manager)
+            if len(permutation) != size:
+                raise TypeError("length of permutation ({0}) different ".format(len(permutation))
+                                + "from number of variables ({0})".format(size))
+            p = <int *> malloc(size * sizeof(int))
+            if p is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(size):
+                v = permutation[i]
+                if not 0 <= v < size:
+                    raise TypeError("{0} is not a valid variable index (not between 0 and {1})".format(v,size))
+                p[i] = v
+            with nogil:
+                res = ccudd.Cudd_zddShuffleHeap(self._manager, p)
+            free(p)
+            if not res:
+                raise ManagerError(self)
+            if ReorderingCancelled(self):
+                raise CancellationError(self)
+        finally:
+            ReleaseManager(self)
+
+    def setVarMap(self, x, list y=None):
+        """Set the variable map that BDD.varMap applies.
+
+        The map swaps the variables in x with those in y; x may also be a
+        VariableMap.  Renamings with the same map share the computed
+        table across calls.
+        """
+        cdef VariableMap vmap
+        AcquireManager(self)
+        try:
+            vmap = x if isinstance(x, VariableMap) else VariableMap(self, x, y)
+            if vmap._mgr is not self:
+                raise ValueError("variable map of a different manager")
+            if not ccudd.Cudd_SetVarMap(self._manager, vmap._x, vmap._y, vmap._n):
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
+
+    def add_hook(self, kind, callback):
+        """Call a function before or after reordering or garbage collection.
+
+        kind is one of PRE_REORDERING_HOOK, POST_REORDERING_HOOK,
+        PRE_GC_HOOK and POST_GC_HOOK.  The callback receives a HookInfo.
+        If a pre hook returns False, the operation is not carried out.
+        A vetoed reordering raises ReorderingVetoed from reduceHeap or
+        from the operation that triggered it.  With dynamic reordering
+        enabled, every later node creation past the threshold retries
+        the vetoed reordering, until the maximum number of reorderings
+        is used up; to stop reordering for good, call autodynDisable,
+        for instance from a hook, instead of vetoing.  The callbacks run
+        while the decision diagrams are being reorganized and must not
+        create or free any of them.  Exceptions raised by a callback are
+        reported and otherwise ignored.
+        """
+        AcquireManager(self)
+        try:
+            if kind not in (PRE_GC_HOOK, POST_GC_HOOK,
+                            PRE_REORDERING_HOOK, POST_REORDERING_HOOK):
+                raise ValueError("unknown hook kind ({0})".format(kind))
+            if not callable(callback):
+                raise TypeError("hook callback is not callable")
+            if self._hooks is None:
+                self._hooks = {PRE_GC_HOOK: [], POST_GC_HOOK: [],
+                               PRE_REORDERING_HOOK: [], POST_REORDERING_HOOK: [],
+                               'start': {}}
+                HOOKS[<intptr_t> self._manager] = self._hooks
+            if not self._hooks[kind]:
+                if not ccudd.Cudd_AddHook(self._manager, HookFunction(kind), kind):
+                    raise ManagerError(self)
+            self._hooks[kind].append(callback)
+        finally:
+            ReleaseManager(self)
+
+    def remove_hook(self, kind, callback):
+        """Remove a callback installed by add_hook."""
+        AcquireManager(self)
+        try:
+            if self._hooks is None or callback not in self._hooks.get(kind, ()):
+                raise ValueError("callback not in hook")
+            self._hooks[kind].remove(callback)
+            if not self._hooks[kind]:
+                ccudd.Cudd_RemoveHook(self._manager, HookFunction(kind), kind)
+        finally:
+            ReleaseManager(self)
 
     def enableReorderingReporting(self):
         """Enable reporting of variable reordering."""
-        if not ccudd.Cudd_EnableReorderingReporting(self._manager):
-            raise MemoryError(self.readErrorCode())
+        AcquireManager(self)
+        try:
+            if not ccudd.Cudd_EnableReorderingReporting(self._manager):
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
 
     def disableReorderingReporting(self):
         """Disable reporting of variable reordering."""
-        if not ccudd.Cudd_DisableReorderingReporting(self._manager):
-            raise MemoryError(self.readErrorCode())
+        AcquireManager(self)
+        try:
+            if not ccudd.Cudd_DisableReorderingReporting(self._manager):
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
 
     def reorderingReporting(self):
         """Test whether reordering reporting in enabled."""
@@ -424,13 +1769,21 @@ cdef class Cudd:
 
     def enableOrderingMonitoring(self):
         """Enable monitoring of variable order."""
-        if not ccudd.Cudd_EnableOrderingMonitoring(self._manager):
-            raise MemoryError(self.readErrorCode())
+        AcquireManager(self)
+        try:
+            if not ccudd.Cudd_EnableOrderingMonitoring(self._manager):
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
 
     def disableOrderingMonitoring(self):
         """Disable monitoring of variable order."""
-        if not ccudd.Cudd_DisableOrderingMonitoring(self._manager):
-            raise MemoryError(self.readErrorCode())
+        AcquireManager(self)
+        try:
+            if not ccudd.Cudd_DisableOrderingMonitoring(self._manager):
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
 
     def orderingMonitoring(self):
         """Test whether order monitoring is enabled."""
@@ -438,25 +1791,38 @@ cdef class Cudd:
 
     def printBddOrder(self):
         """Print BDD variable order."""
-        sys.stdout.flush()
-        cdef char * tstr = "BDD"
-        if not ccudd.Cudd_PrintGroupedOrder(self._manager, tstr, NULL):
-            raise MemoryError(self.readErrorCode())
-        fflush(stdout)
+        cdef char * tstr
+        AcquireManager(self)
+        try:
+            sys.stdout.flush()
+            tstr = "BDD"
+            if not ccudd.Cudd_PrintGroupedOrder(self._manager, tstr, NULL):
+                raise ManagerError(self)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self)
 
     def bddOrder(self):
         """Get BDD variable order."""
-        nvars = ccudd.Cudd_ReadSize(self._manager)
-        if len(self._varnames) == nvars:
-            return [self._varnames[ccudd.Cudd_ReadInvPerm(self._manager, i)]
-                    for i in range(nvars)]
-        else:
-            return [str(ccudd.Cudd_ReadInvPerm(self._manager, i))
-                    for i in range(nvars)]
+        AcquireManager(self)
+        try:
+            nvars = ccudd.Cudd_ReadSize(self._manager)
+            if len(self._varnames) == nvars:
+                return [self._varnames[ccudd.Cudd_ReadInvPerm(self._manager, i)]
+                        for i in range(nvars)]
+            else:
+                return [str(ccudd.Cudd_ReadInvPerm(self._manager, i))
+                        for i in range(nvars)]
+        finally:
+            ReleaseManager(self)
 
     def autodynEnableZdd(self, method = ccudd.CUDD_REORDER_SIFT):
         """Enable dynamic ZDD variable reordering."""
-        ccudd.Cudd_AutodynEnableZdd(self._manager, method)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_AutodynEnableZdd(self._manager, method)
+        finally:
+            ReleaseManager(self)
 
     def readReorderings(self):
         """Read the number of reorderings so far."""
@@ -464,60 +1830,158 @@ cdef class Cudd:
 
     def maxReorderings(self, number = None):
         """Read and set maximum number of variable reorderings."""
-        oldnumber = ccudd.Cudd_ReadMaxReorderings(self._manager)
-        if number is not None:
-            ccudd.Cudd_SetMaxReorderings(self._manager, number)
-        return oldnumber
+        AcquireManager(self)
+        try:
+            oldnumber = ccudd.Cudd_ReadMaxReorderings(self._manager)
+            if number is not None:
+                ccudd.Cudd_SetMaxReorderings(self._manager, number)
+            return oldnumber
+        finally:
+            ReleaseManager(self)
 
     def nextReordering(self, number = None):
         """Read and set threshold for next variable reordering."""
-        oldnumber = ccudd.Cudd_ReadNextReordering(self._manager)
-        if number is not None:
-            ccudd.Cudd_SetNextReordering(self._manager, number)
-        return oldnumber
+        AcquireManager(self)
+        try:
+            oldnumber = ccudd.Cudd_ReadNextReordering(self._manager)
+            if number is not None:
+                ccudd.Cudd_SetNextReordering(self._manager, number)
+            return oldnumber
+        finally:
+            ReleaseManager(self)
 
     def autodynDisableZdd(self):
         """Disable dynamic ZDD variable reordering."""
-        ccudd.Cudd_AutodynDisableZdd(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_AutodynDisableZdd(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def reorderingStatusZdd(self):
         """Return the current ZDD reodering status and default method."""
         cdef ccudd.Cudd_ReorderingType method
-        cdef bint status = ccudd.Cudd_ReorderingStatusZdd(self._manager, &method)
-        return (status, method)
+        cdef bint status
+        AcquireManager(self)
+        try:
+            status = ccudd.Cudd_ReorderingStatusZdd(self._manager, &method)
+            return (status, method)
+        finally:
+            ReleaseManager(self)
 
     def printZddOrder(self):
         """Print ZDD variable order."""
-        sys.stdout.flush()
-        cdef char * tstr = "ZDD"
-        if not ccudd.Cudd_PrintGroupedOrder(self._manager, tstr, NULL):
-            raise MemoryError(self.readErrorCode())
-        fflush(stdout)
+        cdef char * tstr
+        AcquireManager(self)
+        try:
+            sys.stdout.flush()
+            tstr = "ZDD"
+            if not ccudd.Cudd_PrintGroupedOrder(self._manager, tstr, NULL):
+                raise ManagerError(self)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self)
 
     def zddOrder(self):
         """Get ZDD variable order."""
-        nvars = ccudd.Cudd_ReadZddSize(self._manager)
-        if len(self._zvarnames) == nvars:
-            return [self._zvarnames[ccudd.Cudd_ReadInvPermZdd(self._manager, i)]
-                    for i in range(nvars)]
-        else:
-            return [str(ccudd.Cudd_ReadInvPermZdd(self._manager, i))
-                    for i in range(nvars)]
+        AcquireManager(self)
+        try:
+            nvars = ccudd.Cudd_ReadZddSize(self._manager)
+            if len(self._zvarnames) == nvars:
+                return [self._zvarnames[ccudd.Cudd_ReadInvPermZdd(self._manager, i)]
+                        for i in range(nvars)]
+            else:
+                return [str(ccudd.Cudd_ReadInvPermZdd(self._manager, i))
+                        for i in range(nvars)]
+        finally:
+            ReleaseManager(self)
+
+    def save_order(self, file_path):
+        """Save the BDD and ZDD variable orders and group trees to a file.
+
+        The file is in JSON format and lists the variables, by index
+        and name, from the top level down, together with the groups
+        created by makeTreeNode and makeZddTreeNode or by reordering.
+        """
+        AcquireManager(self)
+        try:
+            record = {'format': 'cudd-order', 'version': 1,
+                      'bdd': SaveOrder(self, False),
+                      'zdd': SaveOrder(self, True)}
+            try:
+                with open(file_path, 'w') as f:
+                    json.dump(record, f, indent=1)
+            except (IOError, OSError):
+                raise IOError("cannot write {0}".format(file_path))
+        finally:
+            ReleaseManager(self)
+
+    def load_order(self, file_path, match='name'):
+        """Restore variable orders and group trees saved by save_order.
+
+        With match 'name', saved variables are matched by name to the
+        variables of this manager; with match 'index', by index.  The
+        matched variables are brought into the saved order, while the
+        other variables keep their levels.  Variables saved without a
+        name are matched by index.  Saved variables without a match are
+        ignored, and so are the groups that they break; ValueError is
+        raised if none of them matches.  The existing group trees are
+        replaced.
+        """
+        AcquireManager(self)
+        try:
+            if match not in ('name', 'index'):
+                raise ValueError("unknown matching ({0})".format(match))
+            try:
+                with open(file_path) as f:
+                    record = json.load(f)
+            except (IOError, OSError):
+                raise IOError("cannot read {0}".format(file_path))
+            except ValueError:
+                raise ValueError("invalid order file {0}".format(file_path))
+            if not isinstance(record, dict) or record.get('format') != 'cudd-order':
+                raise ValueError("invalid order file {0}".format(file_path))
+            saved = (MatchVariables(self, record['bdd'], match == 'name', False) +
+                     MatchVariables(self, record['zdd'], match == 'name', True))
+            if saved and saved.count(None) == len(saved):
+                raise ValueError("no variable of {0} matches".format(file_path))
+            RestoreOrder(self, record['bdd'], match == 'name', False)
+            RestoreOrder(self, record['zdd'], match == 'name', True)
+        finally:
+            ReleaseManager(self)
 
     def zddReduceHeap(self, method = ccudd.CUDD_REORDER_SIFT, minsize = 0):
         """Invoke variable reordering."""
-        cdef int res = ccudd.Cudd_zddReduceHeap(self._manager, method, minsize)
-        if res == 0:
-            raise MemoryError(self.readErrorCode())
-        return res
+        cdef ccudd.Cudd_ReorderingType heuristic = method
+        cdef int minimum = minsize
+        cdef int res
+        AcquireManager(self)
+        try:
+            with nogil:
+                res = ccudd.Cudd_zddReduceHeap(self._manager, heuristic, minimum)
+            if res == 0:
+                raise ManagerError(self)
+            if ReorderingCancelled(self):
+                raise CancellationError(self)
+            return res
+        finally:
+            ReleaseManager(self)
 
     def zddRealignEnable(self):
         """Enable realignment of ZDD variable order to BDD order."""
-        ccudd.Cudd_zddRealignEnable(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_zddRealignEnable(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def zddRealignDisable(self):
         """Disable realignment of ZDD variable order to BDD order."""
-        ccudd.Cudd_zddRealignDisable(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_zddRealignDisable(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def zddRealignmentEnabled(self):
         """Test whether the realignment of ZDD order to BDD order is enabled."""
@@ -525,11 +1989,19 @@ cdef class Cudd:
 
     def bddRealignEnable(self):
         """Enable realignment of BDD variable order to ZDD order."""
-        ccudd.Cudd_bddRealignEnable(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_bddRealignEnable(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def bddRealignDisable(self):
         """Disable realignment of BDD variable order to ZDD order."""
-        ccudd.Cudd_bddRealignDisable(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_bddRealignDisable(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def bddRealignmentEnabled(self):
         """Test whether the realignment of BDD order to ZDD order is enabled."""
@@ -537,49 +2009,63 @@ cdef class Cudd:
 
     def readErrorCode(self):
         """Return the CUDD error code."""
-        cdef int code = ccudd.Cudd_ReadErrorCode(self._manager)
-        if code == NO_ERROR:
-            return "no error"
-        elif code == MEMORY_OUT:
-            return "memory out"
-        elif code == TOO_MANY_NODES:
-            return "too many nodes"
-        elif code == MAX_MEM_EXCEEDED:
-            return "maximum memory exceeded"
-        elif code == TIMEOUT_EXPIRED:
-            return "timeout expired"
-        elif code == TERMINATION:
-            return "termination"
-        elif code == INVALID_ARG:
-            return "invalid argument"
-        elif code == INTERNAL_ERROR:
-            return "internal error"
-        elif code == WRONG_PRECONDITIONS:
-            return "preconditions violated"
-        else:
-            return "unknown error"
+        cdef int code
+        AcquireManager(self)
+        try:
+            code = ccudd.Cudd_ReadErrorCode(self._manager)
+            if code == NO_ERROR:
+                return "no error"
+            elif code == MEMORY_OUT:
+                return "memory out"
+            elif code == TOO_MANY_NODES:
+                return "too many nodes"
+            elif code == MAX_MEM_EXCEEDED:
+                return "maximum memory exceeded"
+            elif code == TIMEOUT_EXPIRED:
+                return "timeout expired"
+            elif code == TERMINATION:
+                return "termination"
+            elif code == INVALID_ARG:
+                return "invalid argument"
+            elif code == INTERNAL_ERROR:
+                return "internal error"
+            elif code == WRONG_PRECONDITIONS:
+                return "preconditions violated"
+            else:
+                return "unknown error"
+        finally:
+            ReleaseManager(self)
 
     def clearErrorCode(self):
         """Clear the manager's error code."""
-        ccudd.Cudd_ClearErrorCode(self._manager)
+        AcquireManager(self)
+        try:
+            ccudd.Cudd_ClearErrorCode(self._manager)
+        finally:
+            ReleaseManager(self)
 
     def sharingSize(self, list nodes):
         cdef int res
         cdef int n = len(nodes)
-        cdef ccudd.DdNode * * f = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if f is NULL:
-            raise MemoryError(self.readErrorCode())
-        if type(nodes[0]) is BDD:
-            for i in range(n):
-                f[i] = (<BDD>nodes[i])._node
-        elif type(nodes[0]) is ADD:
-            for i in range(n):
-                f[i] = (<ADD>nodes[i])._node
-        else:
-            for i in range(n):
-                f[i] = (<ZDD>nodes[i])._node
-        res = ccudd.Cudd_SharingSize(f, n)
-        return res
+        cdef ccudd.DdNode * * f
+        AcquireManager(self)
+        try:
+            f = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if f is NULL:
+                raise MemoryError("memory allocation failed")
+            if type(nodes[0]) is BDD:
+                for i in range(n):
+                    f[i] = (<BDD>nodes[i])._node
+            elif type(nodes[0]) is ADD:
+                for i in range(n):
+                    f[i] = (<ADD>nodes[i])._node
+            else:
+                for i in range(n):
+                    f[i] = (<ZDD>nodes[i])._node
+            res = ccudd.Cudd_SharingSize(f, n)
+            return res
+        finally:
+            ReleaseManager(self)
 
     def dumpDot(self, list nodes, list node_names=None, file_path=None):
         """Write decision diagrams in dot format to standard output."""
@@ -587,109 +2073,331 @@ cdef class Cudd:
         cdef char * * onames
         cdef int n = len(nodes)
         cdef FILE *fp
-        if file_path is None:
-            fp = stdout
-            sys.stdout.flush()
-        else:
-            fp = fopen(file_path.encode('utf-8'), b'w')
-        if n < 1:
-            raise TypeError("number of nodes should be greater than 0")
-        cdef ccudd.DdNode * * f = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if f is NULL:
-            raise MemoryError("memory allocation failed")
-        if type(nodes[0]) is BDD:
-            for i in range(n):
-                f[i] = (<BDD>nodes[i])._node
-        elif type(nodes[0]) is ADD:
-            for i in range(n):
-                f[i] = (<ADD>nodes[i])._node
-        else:
-            for i in range(n):
-                f[i] = (<ZDD>nodes[i])._node
-        if node_names is None:
-            onames = NULL
-        else:
-            if n != len(node_names):
+        cdef ccudd.DdNode * * f
+        cdef char * * variable_names
+        AcquireManager(self)
+        try:
+            if file_path is None:
+                fp = stdout
+                sys.stdout.flush()
+            else:
+                fp = fopen(file_path.encode('utf-8'), b'w')
+            if n < 1:
+                raise TypeError("number of nodes should be greater than 0")
+            f = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if f is NULL:
+                raise MemoryError("memory allocation failed")
+            if type(nodes[0]) is BDD:
+                for i in range(n):
+                    f[i] = (<BDD>nodes[i])._node
+            elif type(nodes[0]) is ADD:
+                for i in range(n):
+                    f[i] = (<ADD>nodes[i])._node
+            else:
+                for i in range(n):
+                    f[i] = (<ZDD>nodes[i])._node
+            if node_names is None:
+                onames = NULL
+            else:
+                if n != len(node_names):
+                    raise TypeError("Each node should be given a name")
+                onames = MakeStringArray(node_names)
+            try:
+                if type(nodes[0]) is ZDD:
+                    variable_names = self._zcnames.update(
+                        self._zvarnames, ccudd.Cudd_ReadZddSize(self._manager))
+                else:
+                    variable_names = self._cnames.update(
+                        self._varnames, ccudd.Cudd_ReadSize(self._manager))
+            except MemoryError:
+                if file_path is not None:
+                    fclose(fp)
+                FreeStringArray(onames, n)
+                free(f)
+                raise
+            if type(nodes[0]) is ZDD:
+                res = ccudd.Cudd_zddDumpDot(self._manager, n, f,
+                                            <const char * const *>variable_names,
+                                            <const char * const *>onames, fp)
+            else:
+                res = ccudd.Cudd_DumpDot(self._manager, n, f,
+                                         <const char * const *>variable_names,
+                                         <const char * const *>onames, fp)
+            if file_path is not None:
+                fclose(fp)
+            FreeStringArray(onames, n)
+            free(f)
+            if not res:
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
+
+    def store(self, list nodes, file_path, mode=None, list names=None):
+        """Store a list of BDDs or ADDs to a file in DDDMP format.
+
+        Nodes shared by the decision diagrams are written only once.
+        The mode is either 'binary' or 'text'.  By default, BDDs are
+        stored in binary mode and ADDs in text mode, because DDDMP does
+        not support binary mode for ADDs.  The optional names are
+        stored as the names of the roots.  Variable names are stored if
+        the manager has any, with the indices of the unnamed variables
+        as their names.
+        """
+        cdef int n = len(nodes)
+        cdef int cmode
+        cdef ccudd.DdNode * * f
+        cdef int size
+        cdef char * * variable_names
+        cdef char * * onames
+        cdef int res
+        AcquireManager(self)
+        try:
+            if n < 1:
+                raise TypeError("number of nodes should be greater than 0")
+            isbdd = type(nodes[0]) is BDD
+            if not isbdd and type(nodes[0]) is not ADD:
+                raise TypeError("only BDDs and ADDs can be stored")
+            if mode is None:
+                mode = 'binary' if isbdd else 'text'
+            if mode == 'binary':
+                if not isbdd:
+                    raise ValueError("ADDs cannot be stored in binary mode")
+                cmode = ccudd.DDDMP_MODE_BINARY
+            elif mode == 'text':
+                cmode = ccudd.DDDMP_MODE_TEXT
+            else:
+                raise ValueError("unknown mode ({0})".format(mode))
+            if names is not None and len(names) != n:
                 raise TypeError("Each node should be given a name")
-            onames = <char * *> malloc(n * sizeof(char *))
-            if onames is NULL:
+            f = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if f is NULL:
                 raise MemoryError("memory allocation failed")
             for i in range(n):
-                utfname = node_names[i].encode('utf-8')
-                one_name = <char *> malloc((len(utfname)+1) * sizeof(char))
-                strcpy(one_name, utfname)
-                onames[i] = one_name
+                if type(nodes[i]) is not type(nodes[0]):
+                    free(f)
+                    raise TypeError("BDDs and ADDs cannot be stored together")
+                if isbdd:
+                    f[i] = (<BDD>nodes[i])._node
+                else:
+                    f[i] = (<ADD>nodes[i])._node
+            size = ccudd.Cudd_ReadSize(self._manager)
+            variable_names = NULL
+            onames = NULL
+            try:
+                if self._varnames:
+                    variable_names = MakeStringArray([self.getVariableName(i)
+                                                      for i in range(size)])
+                if names is not None:
+                    onames = MakeStringArray(names)
+            except MemoryError:
+                FreeStringArray(variable_names, size)
+                free(f)
+                raise
+            utfpath = file_path.encode('utf-8')
+            if isbdd:
+                res = ccudd.Dddmp_cuddBddArrayStore(self._manager, NULL, n, f,
+                                                    onames, variable_names, NULL,
+                                                    cmode, ccudd.DDDMP_VARIDS,
+                                                    utfpath, NULL)
+            else:
+                res = ccudd.Dddmp_cuddAddArrayStore(self._manager, NULL, n, f,
+                                                    onames, variable_names, NULL,
+                                                    cmode, ccudd.DDDMP_VARIDS,
+                                                    utfpath, NULL)
+            FreeStringArray(variable_names, size)
+            FreeStringArray(onames, n)
+            free(f)
+            if res != ccudd.DDDMP_SUCCESS:
+                raise IOError("cannot store decision diagrams to {0}".format(file_path))
+        finally:
+            ReleaseManager(self)
+
+    def load(self, file_path, var_match='ids'):
+        """Load a list of BDDs or ADDs from a file in DDDMP format.
+
+        The variables in the file are matched to the variables of this
+        manager by index ('ids'), by name ('names'), or by position in
+        the variable order ('perm').  Missing variables are created.
+        """
+        cdef ccudd.Dddmp_DecompType ddtype
+        cdef int nvars
+        cdef int nsupp
+        cdef int nroots
+        cdef char * * suppnames
+        cdef char * * orderednames
+        cdef int * varids
+        cdef int * composeids
+        cdef int * auxids
+        cdef int ret
+        cdef ccudd.Dddmp_VarMatchType cmatch
         cdef int size
         cdef char * * variable_names
-        if type(nodes[0]) is ZDD:
-            size = ccudd.Cudd_ReadZddSize(self._manager)
-            if len(self._zvarnames) == size:
-                variable_names = <char * *> malloc(size * sizeof(char *))
-                if variable_names is NULL:
-                    raise MemoryError("memory allocation failed")
-                for i in range(size):
-                    utfname = self._zvarnames[i].encode('utf-8')
-                    one_name = <char *> malloc((len(utfname)+1) * sizeof(char))
-                    strcpy(one_name, utfname)
-                    variable_names[i] = one_name
+        cdef ccudd.DdNode * * roots
+        AcquireManager(self)
+        try:
+            utfpath = file_path.encode('utf-8')
+            suppnames = NULL
+            orderednames = NULL
+            varids = NULL
+            composeids = NULL
+            auxids = NULL
+            ret = ccudd.Dddmp_cuddHeaderLoad(&ddtype, &nvars, &nsupp,
+                                             &suppnames, &orderednames,
+                                             &varids, &composeids,
+                                             &auxids, &nroots,
+                                             utfpath, NULL)
+            if ret != ccudd.DDDMP_SUCCESS:
+                raise IOError("cannot read DDDMP header from {0}".format(file_path))
+            free(varids)
+            free(composeids)
+            free(auxids)
+            if suppnames is not NULL:
+                filenames = [(<bytes>suppnames[i]).decode('utf-8') for i in range(nsupp)]
             else:
-                variable_names = NULL
-            res = ccudd.Cudd_zddDumpDot(self._manager, n, f,
-                                        <const char * const *>variable_names,
-                                        <const char * const *>onames, fp)
-        else:
+                filenames = None
+            FreeStringArray(suppnames, nsupp)
+            FreeStringArray(orderednames, nvars)
+            if ddtype != ccudd.DDDMP_BDD and ddtype != ccudd.DDDMP_ADD:
+                raise TypeError("file does not contain BDDs or ADDs")
+            if var_match == 'ids':
+                cmatch = ccudd.DDDMP_VAR_MATCHIDS
+            elif var_match == 'perm':
+                cmatch = ccudd.DDDMP_VAR_MATCHPERMIDS
+                while ccudd.Cudd_ReadSize(self._manager) < nvars:
+                    if ccudd.Cudd_bddNewVar(self._manager) is NULL:
+                        raise ManagerError(self)
+            elif var_match == 'names':
+                if filenames is None:
+                    raise ValueError("{0} contains no variable names".format(file_path))
+                cmatch = ccudd.DDDMP_VAR_MATCHNAMES
+                known = set(self.getVariableName(i)
+                            for i in range(ccudd.Cudd_ReadSize(self._manager)))
+                for name in filenames:
+                    if name not in known:
+                        self.bddVar(name=name)
+            else:
+                raise ValueError("unknown variable matching ({0})".format(var_match))
             size = ccudd.Cudd_ReadSize(self._manager)
-            if len(self._varnames) == size:
-                variable_names = <char * *> malloc(size * sizeof(char *))
-                if variable_names is NULL:
-                    raise MemoryError("memory allocation failed")
-                for i in range(size):
-                    utfname = self._varnames[i].encode('utf-8')
-                    one_name = <char *> malloc((len(utfname)+1) * sizeof(char))
-                    strcpy(one_name, utfname)
-                    variable_names[i] = one_name
+            variable_names = NULL
+            if cmatch == ccudd.DDDMP_VAR_MATCHNAMES:
+                variable_names = MakeStringArray([self.getVariableName(i)
+                                                  for i in range(size)])
+            roots = NULL
+            if ddtype == ccudd.DDDMP_BDD:
+                nroots = ccudd.Dddmp_cuddBddArrayLoad(self._manager,
+                                                      ccudd.DDDMP_ROOT_MATCHLIST,
+                                                      NULL, cmatch, variable_names,
+                                                      NULL, NULL,
+                                                      ccudd.DDDMP_MODE_DEFAULT,
+                                                      utfpath, NULL, &roots)
             else:
-                variable_names = NULL
-            res = ccudd.Cudd_DumpDot(self._manager, n, f,
-                                     <const char * const *>variable_names,
-                                     <const char * const *>onames, fp)
-        if file_path is not None:
-            fclose(fp)
-        if variable_names is not NULL:
-            for i in range(size):
-                free(variable_names[i])
-            free(variable_names)
-        if onames is not NULL:
-            for i in range(n):
-                free(onames[i])
-            free(onames)
-        free(f)
-        if not res:
-            raise MemoryError(self.readErrorCode())
+                nroots = ccudd.Dddmp_cuddAddArrayLoad(self._manager,
+                                                      ccudd.DDDMP_ROOT_MATCHLIST,
+                                                      NULL, cmatch, variable_names,
+                                                      NULL, NULL,
+                                                      ccudd.DDDMP_MODE_DEFAULT,
+                                                      utfpath, NULL, &roots)
+            FreeStringArray(variable_names, size)
+            if roots is NULL:
+                raise IOError("cannot load decision diagrams from {0}".format(file_path))
+            # The loaded roots are referenced.  The wrappers add their own
+            # reference, which allows us to release the one from DDDMP.
+            if ddtype == ccudd.DDDMP_BDD:
+                res = [MakeBDD(self, roots[i]) for i in range(nroots)]
+            else:
+                res = [MakeADD(self, roots[i]) for i in range(nroots)]
+            for i in range(nroots):
+                ccudd.Cudd_RecursiveDeref(self._manager, roots[i])
+            free(roots)
+            return res
+        finally:
+            ReleaseManager(self)
+
+    def load_cnf(self, file_path, quantify=True):
+        """Load a list of BDDs from a CNF file written by BDD.to_cnf.
+
+        The CNF variables of the BDD variables are mapped back to their
+        indices.  The auxiliary variables introduced by the encoding
+        become BDD variables with their CNF numbers as indices; if
+        quantify is true they are existentially quantified from the
+        result.  Use a manager that has no more variables than the one
+        that stored the file, or auxiliary and ordinary variables may
+        clash.
+        """
+        cdef char * cpath
+        cdef int cmode
+        cdef ccudd.DdNode * * roots
+        cdef int nroots
+        cdef int ret
+        AcquireManager(self)
+        try:
+            nvars, nclauses = CnfHeader(file_path)
+            if nvars == 0:
+                # Constants, which DDDMP cannot read back.
+                return [self.bddOne() if nclauses == 0 else self.bddZero()]
+            utfpath = file_path.encode('utf-8')
+            cpath = utfpath
+            cmode = (ccudd.DDDMP_CNF_MODE_CONJ_QUANT if quantify else
+                     ccudd.DDDMP_CNF_MODE_NO_QUANT)
+            roots = NULL
+            nroots = 0
+            with nogil:
+                ret = ccudd.Dddmp_cuddBddArrayLoadCnf(self._manager,
+                                                      ccudd.DDDMP_ROOT_MATCHLIST,
+                                                      NULL, ccudd.DDDMP_VAR_MATCHIDS,
+                                                      NULL, NULL, NULL, cmode,
+                                                      cpath, NULL, &roots, &nroots)
+            if ret != ccudd.DDDMP_SUCCESS or roots is NULL:
+                raise IOError("cannot load CNF from {0}".format(file_path))
+            res = [MakeBDD(self, roots[i]) for i in range(nroots)]
+            for i in range(nroots):
+                ccudd.Cudd_RecursiveDeref(self._manager, roots[i])
+            free(roots)
+            return res
+        finally:
+            ReleaseManager(self)
 
     def symmProfile(self, lower=0, upper=None):
         """Report on symmetric variables."""
-        if upper is None:
-            upper = ccudd.Cudd_ReadSize(self._manager) - 1
-        ccudd.Cudd_SymmProfile(self._manager, lower, upper)
+        AcquireManager(self)
+        try:
+            if upper is None:
+                upper = ccudd.Cudd_ReadSize(self._manager) - 1
+            ccudd.Cudd_SymmProfile(self._manager, lower, upper)
+        finally:
+            ReleaseManager(self)
 
     def zddSymmProfile(self, lower=0, upper=None):
         """Report on ZDD symmetric variables."""
-        if upper is None:
-            upper = ccudd.Cudd_ReadZddSize(self._manager) - 1
-        ccudd.Cudd_zddSymmProfile(self._manager, lower, upper)
+        AcquireManager(self)
+        try:
+            if upper is None:
+                upper = ccudd.Cudd_ReadZddSize(self._manager) - 1
+            ccudd.Cudd_zddSymmProfile(self._manager, lower, upper)
+        finally:
+            ReleaseManager(self)
 
     def makeTreeNode(self, low, size = 2, groupType = ccudd.MTR_FIXED):
         """Create a variable group."""
-        cdef ccudd.MtrNode * res = ccudd.Cudd_MakeTreeNode(self._manager, low, size, groupType)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
+        cdef ccudd.MtrNode * res
+        AcquireManager(self)
+        try:
+            res = ccudd.Cudd_MakeTreeNode(self._manager, low, size, groupType)
+            if res is NULL:
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
 
     def makeZddTreeNode(self, low, size = 2, groupType = ccudd.MTR_FIXED):
         """Create a ZDD variable group."""
-        cdef ccudd.MtrNode * res = ccudd.Cudd_MakeZddTreeNode(self._manager, low, size, groupType)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
+        cdef ccudd.MtrNode * res
+        AcquireManager(self)
+        try:
+            res = ccudd.Cudd_MakeZddTreeNode(self._manager, low, size, groupType)
+            if res is NULL:
+                raise ManagerError(self)
+        finally:
+            ReleaseManager(self)
 
     def xeqy(self, list x, list y):
         """Build BDD or ADD for the x==y function.
@@ -698,285 +2406,463 @@ cdef class Cudd:
         the x and y lists.  It is an error to mix BDD and ADD variables.
         """
         cdef int n = len(x)
-        if n < 1:
-            raise TypeError("There should be at least one x variable")
-        if len(y) != n:
-            raise TypeError("The number of y variables should equal the number of x variables")
-        cdef ccudd.DdNode * * xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if xvars is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef ccudd.DdNode * * yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if yvars is NULL:
-            free(xvars)
-            raise MemoryError("memory allocation failed")
+        cdef ccudd.DdNode * * xvars
+        cdef ccudd.DdNode * * yvars
         cdef ccudd.DdNode * res
-        if type(x[0]) is BDD:
-            for i in range(n):
-                xvars[i] = (<BDD>x[i])._node
-                yvars[i] = (<BDD>y[i])._node
-            res = ccudd.Cudd_Xeqy(self._manager, n, xvars, yvars)
-        else:
-            for i in range(n):
-                xvars[i] = (<ADD>x[i])._node
-                yvars[i] = (<ADD>y[i])._node
-            res = ccudd.Cudd_addXeqy(self._manager, n, xvars, yvars)
-        free(yvars)
-        free(xvars)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        if type(x[0]) is BDD:
-            return MakeBDD(self, res)
-        else:
-            return MakeADD(self, res)
+        AcquireManager(self)
+        try:
+            if n < 1:
+                raise TypeError("There should be at least one x variable")
+            if len(y) != n:
+                raise TypeError("The number of y variables should equal the number of x variables")
+            xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if xvars is NULL:
+                raise MemoryError("memory allocation failed")
+            yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if yvars is NULL:
+                free(xvars)
+                raise MemoryError("memory allocation failed")
+            if type(x[0]) is BDD:
+                for i in range(n):
+                    xvars[i] = (<BDD>x[i])._node
+                    yvars[i] = (<BDD>y[i])._node
+                res = ccudd.Cudd_Xeqy(self._manager, n, xvars, yvars)
+            else:
+                for i in range(n):
+                    xvars[i] = (<ADD>x[i])._node
+                    yvars[i] = (<ADD>y[i])._node
+                res = ccudd.Cudd_addXeqy(self._manager, n, xvars, yvars)
+            free(yvars)
+            free(xvars)
+            if res is NULL:
+                raise ManagerError(self)
+            if type(x[0]) is BDD:
+                return MakeBDD(self, res)
+            else:
+                return MakeADD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def xgty(self, list x, list y):
         """Build BDD for the x>y function."""
         cdef int n = len(x)
-        if n < 1:
-            raise TypeError("There should be at least one x variable")
-        if len(y) != n:
-            raise TypeError("The number of y variables should equal the number of x variables")
-        cdef ccudd.DdNode * * xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if xvars is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef ccudd.DdNode * * yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if yvars is NULL:
-            free(xvars)
-            raise MemoryError("memory allocation failed")
+        cdef ccudd.DdNode * * xvars
+        cdef ccudd.DdNode * * yvars
         cdef ccudd.DdNode * res
-        for i in range(n):
-            xvars[i] = (<BDD>x[i])._node
-            yvars[i] = (<BDD>y[i])._node
-        res = ccudd.Cudd_Xgty(self._manager, n, NULL, xvars, yvars)
-        free(yvars)
-        free(xvars)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, res)
+        AcquireManager(self)
+        try:
+            if n < 1:
+                raise TypeError("There should be at least one x variable")
+            if len(y) != n:
+                raise TypeError("The number of y variables should equal the number of x variables")
+            xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if xvars is NULL:
+                raise MemoryError("memory allocation failed")
+            yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if yvars is NULL:
+                free(xvars)
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                xvars[i] = (<BDD>x[i])._node
+                yvars[i] = (<BDD>y[i])._node
+            res = ccudd.Cudd_Xgty(self._manager, n, NULL, xvars, yvars)
+            free(yvars)
+            free(xvars)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def inequality(self, c, list x, list y):
         """Return the BDD for the function x - y >= c."""
         cdef n = len(x)
-        if len(y) != n:
-            raise TypeError("The two sets of variables should have the same size")
-        cdef ccudd.DdNode * * xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if xvars is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef ccudd.DdNode * * yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if yvars is NULL:
+        cdef ccudd.DdNode * * xvars
+        cdef ccudd.DdNode * * yvars
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            if len(y) != n:
+                raise TypeError("The two sets of variables should have the same size")
+            xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if xvars is NULL:
+                raise MemoryError("memory allocation failed")
+            yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if yvars is NULL:
+                free(xvars)
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                xvars[i] = (<BDD>x[i])._node
+                yvars[i] = (<BDD>y[i])._node
+            res = ccudd.Cudd_Inequality(self._manager, n, <int>c, xvars, yvars)
             free(xvars)
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            xvars[i] = (<BDD>x[i])._node
-            yvars[i] = (<BDD>y[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_Inequality(self._manager, n, <int>c, xvars, yvars)
-        free(xvars)
-        free(yvars)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, res)
+            free(yvars)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def disequality(self, c, list x, list y):
         """Return the BDD for the function x - y != c."""
         cdef n = len(x)
-        if len(y) != n:
-            raise TypeError("The two lists of variables should have the same length")
-        cdef ccudd.DdNode * * xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if xvars is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef ccudd.DdNode * * yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if yvars is NULL:
+        cdef ccudd.DdNode * * xvars
+        cdef ccudd.DdNode * * yvars
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            if len(y) != n:
+                raise TypeError("The two lists of variables should have the same length")
+            xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if xvars is NULL:
+                raise MemoryError("memory allocation failed")
+            yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if yvars is NULL:
+                free(xvars)
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                xvars[i] = (<BDD>x[i])._node
+                yvars[i] = (<BDD>y[i])._node
+            res = ccudd.Cudd_Disequality(self._manager, n, <int>c, xvars, yvars)
             free(xvars)
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            xvars[i] = (<BDD>x[i])._node
-            yvars[i] = (<BDD>y[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_Disequality(self._manager, n, <int>c, xvars, yvars)
-        free(xvars)
-        free(yvars)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, res)
+            free(yvars)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def interval(self, list x, lower, upper=None):
         """Return the BDD for the function lower <= x <= upper."""
-        if upper is None:
-            upper = lower
-        if lower > upper:
-            raise TypeError("lower bound ({0}) greater than ".format(lower)
-                            + "upper bound ({0})".format(upper))
-        cdef n = len(x)
-        cdef ccudd.DdNode * * vars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if vars is NULL:
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            vars[i] = (<BDD>x[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddInterval(self._manager, n, vars, lower, upper)
-        free(vars)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, res)
+        cdef n
+        cdef ccudd.DdNode * * vars
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            if upper is None:
+                upper = lower
+            if lower > upper:
+                raise TypeError("lower bound ({0}) greater than ".format(lower)
+                                + "upper bound ({0})".format(upper))
+            n = len(x)
+            vars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if vars is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                vars[i] = (<BDD>x[i])._node
+            res = ccudd.Cudd_bddInterval(self._manager, n, vars, lower, upper)
+            free(vars)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def cardinality(self, list x, lower, upper=None):
         """Compute the BDD for the function lower <= cardinality <= upper."""
-        if upper is None:
-            upper = lower
-        if lower > upper:
-            raise TypeError("lower bound ({0}) greater than ".format(lower)
-                            + "upper bound ({0})".format(upper))
-        cdef n = len(x)
-        cdef ccudd.DdNode * * vars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if vars is NULL:
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            if not isinstance(x[i], BDD):
-                raise TypeError("The variable list is not a list of BDDs.")
-            vars[i] = (<BDD>x[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddCardinality(self._manager, vars, n, lower, upper)
-        free(vars)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, res)
+        cdef n
+        cdef ccudd.DdNode * * vars
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            if upper is None:
+                upper = lower
+            if lower > upper:
+                raise TypeError("lower bound ({0}) greater than ".format(lower)
+                                + "upper bound ({0})".format(upper))
+            n = len(x)
+            vars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if vars is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                if not isinstance(x[i], BDD):
+                    raise TypeError("The variable list is not a list of BDDs.")
+                vars[i] = (<BDD>x[i])._node
+            res = ccudd.Cudd_bddCardinality(self._manager, vars, n, lower, upper)
+            free(vars)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, res)
+        finally:
+            ReleaseManager(self)
+
+    def linear_constraint(self, list variables, list weights, lower=None,
+                          upper=None):
+        """Return the BDD for lower <= sum of weights[i] * variables[i] <= upper.
+
+        The variables may be complemented; the weights are integers of
+        any sign, and a missing bound is not enforced.  The BDD is built
+        bottom-up, one level at a time, and each intermediate BDD is
+        shared by all the residual bounds that produce it, so that the
+        cost is proportional to the size of the result.
+        """
+        AcquireManager(self)
+        try:
+            return LinearConstraint(self, variables, weights, lower, upper)
+        finally:
+            ReleaseManager(self)
+
+    def at_most_k(self, list variables, k):
+        """Return the BDD for at most k of the literals being true."""
+        AcquireManager(self)
+        try:
+            return LinearConstraint(self, variables, [1] * len(variables), None, k)
+        finally:
+            ReleaseManager(self)
+
+    def at_least_k(self, list variables, k):
+        """Return the BDD for at least k of the literals being true."""
+        AcquireManager(self)
+        try:
+            return LinearConstraint(self, variables, [1] * len(variables), k, None)
+        finally:
+            ReleaseManager(self)
+
+    def exactly_k(self, list variables, k):
+        """Return the BDD for exactly k of the literals being true."""
+        AcquireManager(self)
+        try:
+            return LinearConstraint(self, variables, [1] * len(variables), k, k)
+        finally:
+            ReleaseManager(self)
 
     def fromCubeString(self, cubestring):
         """Return BDD from cube string."""
-        cdef int size = ccudd.Cudd_ReadSize(self._manager)
-        if len(cubestring) != size:
-            raise TypeError("length of string different from number of variables")
-        cdef int * carray = <int *> malloc(size * sizeof(int))
-        if carray is NULL:
-            raise MemoryError(self.readErrorCode())
-        allowed = set(['0','1','2','-'])
-        for (c,i) in zip(cubestring,range(size)):
-            if not c in allowed:
-                raise ValueError("unexpected character (%s) in string" % c)
-            carray[i] = 2 if c == "-" else int(c)
-        cdef ccudd.DdNode * res = ccudd.Cudd_CubeArrayToBdd(self._manager, carray)
-        free(carray)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, res)
+        cdef int size
+        cdef int * carray
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            size = ccudd.Cudd_ReadSize(self._manager)
+            if len(cubestring) != size:
+                raise TypeError("length of string different from number of variables")
+            carray = <int *> malloc(size * sizeof(int))
+            if carray is NULL:
+                raise MemoryError("memory allocation failed")
+            allowed = set(['0','1','2','-'])
+            for (c,i) in zip(cubestring,range(size)):
+                if not c in allowed:
+                    raise ValueError("unexpected character (%s) in string" % c)
+                carray[i] = 2 if c == "-" else int(c)
+            res = ccudd.Cudd_CubeArrayToBdd(self._manager, carray)
+            free(carray)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def fromLiteralList(self, list lits):
         """Return BDD from cube literal list."""
-        cdef int size = ccudd.Cudd_ReadSize(self._manager)
-        if len(lits) != size:
-            raise TypeError("length of list different from number of variables")
-        cdef int * carray = <int *> malloc(size * sizeof(int))
-        if carray is NULL:
-            raise MemoryError(self.readErrorCode())
-        allowed = set([0,1,2])
-        for i in range(len(lits)):
-            l = lits[i]
-            if not l in allowed:
-                raise ValueError("unexpected literal (%d) in list" % l)
-            carray[i] = l
-        cdef ccudd.DdNode * res = ccudd.Cudd_CubeArrayToBdd(self._manager, carray)
-        free(carray)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, res)
+        cdef int size
+        cdef int * carray
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            size = ccudd.Cudd_ReadSize(self._manager)
+            if len(lits) != size:
+                raise TypeError("length of list different from number of variables")
+            carray = <int *> malloc(size * sizeof(int))
+            if carray is NULL:
+                raise MemoryError("memory allocation failed")
+            allowed = set([0,1,2])
+            for i in range(len(lits)):
+                l = lits[i]
+                if not l in allowed:
+                    raise ValueError("unexpected literal (%d) in list" % l)
+                carray[i] = l
+            res = ccudd.Cudd_CubeArrayToBdd(self._manager, carray)
+            free(carray)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, res)
+        finally:
+            ReleaseManager(self)
+
+    def conjoin_all(self, bdds, strategy='balanced', limit=None, reorder=None):
+        """Return the conjunction of an iterable of BDDs.
+
+        The operands are kept in a heap and the two at its top are
+        conjoined until one is left.  The strategy decides the order:
+        'balanced' conjoins them pairwise in rounds, 'smallest_first'
+        always conjoins the two smallest BDDs, and 'support_affinity'
+        conjoins the BDDs whose top variables are deepest in the order
+        first, so that operands with overlapping supports meet early.
+        If limit is given, no conjunction may create more than limit
+        new nodes.  If reorder is a reordering method, the variables
+        are reordered after each round.
+        """
+        AcquireManager(self)
+        try:
+            return ConjoinAll(self, bdds, strategy, limit, reorder, False)
+        finally:
+            ReleaseManager(self)
+
+    def disjoin_all(self, bdds, strategy='balanced', limit=None, reorder=None):
+        """Return the disjunction of an iterable of BDDs.
+
+        The arguments are as for conjoin_all.
+        """
+        AcquireManager(self)
+        try:
+            return ConjoinAll(self, bdds, strategy, limit, reorder, True)
+        finally:
+            ReleaseManager(self)
+
+    def from_dimacs(self, source, order='file', strategy='balanced',
+                    limit=None, window=1024):
+        """Return the conjunction of the clauses of a CNF in DIMACS format.
+
+        The source is a file name or a file object.  It is read in
+        chunks and each clause is turned into a BDD as soon as it is
+        complete.  With order 'file', DIMACS variable k is BDD variable
+        k-1; with order 'appearance', new variables are created as the
+        DIMACS variables are first seen; order may also be a list of
+        DIMACS variables, which get new BDD variables in that order.
+        New variables are named after the DIMACS variables.
+
+        The clauses are conjoined in windows of the given size with
+        the strategy of conjoin_all, and the products of the windows
+        are combined pairwise as they are completed, so that only a
+        logarithmic number of them is alive at any time.  Strategy
+        'linear' instead conjoins each clause to the running product.
+        The limit is as in conjoin_all.
+        """
+        AcquireManager(self)
+        try:
+            return LoadDimacs(self, source, order, strategy, limit, window)
+        finally:
+            ReleaseManager(self)
 
     def conjoin(self, list bdds, list phase=None):
         """Return the conjunction of a set of BDDs with optional phases."""
         cdef int n = len(bdds)
-        cdef ccudd.DdNode * * carray = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if carray is NULL:
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            carray[i] = (<BDD>bdds[i])._node
-        cdef int * cphase = NULL
-
-        if phase is None:
-            cphase = NULL
-        else:
-            if len(phase) != n:
-                raise TypeError("lists of different length")
-            cphase = <int *> malloc(n * sizeof(int))
-            if cphase is NULL:
+        cdef ccudd.DdNode * * carray
+        cdef int * cphase
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            carray = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if carray is NULL:
                 raise MemoryError("memory allocation failed")
-            allowed = set([0,1])
             for i in range(n):
-                ph = phase[i]
-                if not ph in allowed:
-                    raise ValueError("unexpected phase (%d) in list" % ph)
-                cphase[i] = ph
-
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddComputeCube(self._manager, carray,
-                                                            cphase, n)
-        free(carray)
-        if cphase is not NULL:
-            free(cphase)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeBDD(self, res)
+                carray[i] = (<BDD>bdds[i])._node
+            cphase = NULL
+
+            if phase is None:
+                cphase = NULL
+            else:
+                if len(phase) != n:
+                    raise TypeError("lists of different length")
+                cphase = <int *> malloc(n * sizeof(int))
+                if cphase is NULL:
+                    raise MemoryError("memory allocation failed")
+                allowed = set([0,1])
+                for i in range(n):
+                    ph = phase[i]
+                    if not ph in allowed:
+                        raise ValueError("unexpected phase (%d) in list" % ph)
+                    cphase[i] = ph
+
+            res = ccudd.Cudd_bddComputeCube(self._manager, carray,
+                                            cphase, n)
+            free(carray)
+            if cphase is not NULL:
+                free(cphase)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeBDD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def Walsh(self, list x, list y):
         """Return the ADD of a Walsh matrix."""
         cdef int n = len(x)
-        if len(y) != n:
-            raise TypeError("The two lists of variables should have the same length")
-        cdef ccudd.DdNode * * xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if xvars is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef ccudd.DdNode * * yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if yvars is NULL:
+        cdef ccudd.DdNode * * xvars
+        cdef ccudd.DdNode * * yvars
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            if len(y) != n:
+                raise TypeError("The two lists of variables should have the same length")
+            xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if xvars is NULL:
+                raise MemoryError("memory allocation failed")
+            yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if yvars is NULL:
+                free(xvars)
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                xvars[i] = (<ADD>x[i])._node
+                yvars[i] = (<ADD>y[i])._node
+            res = ccudd.Cudd_addWalsh(self._manager, xvars, yvars, n)
             free(xvars)
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            xvars[i] = (<ADD>x[i])._node
-            yvars[i] = (<ADD>y[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_addWalsh(self._manager, xvars, yvars, n)
-        free(xvars)
-        free(yvars)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeADD(self, res)
+            free(yvars)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeADD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def Hamming(self, list x, list y):
         """Return the ADD of the Hamming distance between x and y."""
         cdef int n = len(x)
-        if len(y) != n:
-            raise TypeError("The two lists of variables should have the same length")
-        if n < 1:
-            raise TypeError("There should be at least one variable in each set")
-        if type(x[0]) is ADD:
-            x = [v.bddPattern() for v in x]
-        if type(y[0]) is ADD:
-            y = [v.bddPattern() for v in y]
-        cdef ccudd.DdNode * * xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if xvars is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef ccudd.DdNode * * yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if yvars is NULL:
-            free(xvars)
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            xvars[i] = (<BDD>x[i])._node
-            yvars[i] = (<BDD>y[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_addHamming(self._manager, xvars, yvars, n)
-        free(xvars)
-        free(yvars)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeADD(self, res)
+        cdef ccudd.DdNode * * xvars
+        cdef ccudd.DdNode * * yvars
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            if len(y) != n:
+                raise TypeError("The two lists of variables should have the same length")
+            if n < 1:
+                raise TypeError("There should be at least one variable in each set")
+            if type(x[0]) is ADD:
+                x = [v.bddPattern() for v in x]
+            if type(y[0]) is ADD:
+                y = [v.bddPattern() for v in y]
+            xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if xvars is NULL:
+                raise MemoryError("memory allocation failed")
+            yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if yvars is NULL:
+                free(xvars)
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                xvars[i] = (<BDD>x[i])._node
+                yvars[i] = (<BDD>y[i])._node
+            res = ccudd.Cudd_addHamming(self._manager, xvars, yvars, n)
+            free(xvars)
+            free(yvars)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeADD(self, res)
+        finally:
+            ReleaseManager(self)
 
     def residue(self, nbits, modulus, options=ccudd.CUDD_RESIDUE_DEFAULT, top=0):
         """Return the ADD of the residue modulo 'modulus.'"""
-        cdef ccudd.DdNode * res = ccudd.Cudd_addResidue(self._manager, nbits,
-                                                        modulus, options, top)
-        if res is NULL:
-            raise MemoryError(self.readErrorCode())
-        return MakeADD(self, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self)
+        try:
+            res = ccudd.Cudd_addResidue(self._manager, nbits,
+                                        modulus, options, top)
+            if res is NULL:
+                raise ManagerError(self)
+            return MakeADD(self, res)
+        finally:
+            ReleaseManager(self)
 
 
+# Released BDD, ADD and ZDD objects are kept on free lists, so that the
+# Make functions seldom go to the allocator.
+@cython.freelist(1024)
 cdef class BDD:
     """Class of Binary Decision Diagrams."""
 
     cdef Cudd _mgr
     cdef ccudd.DdNode * _node
 
-    def __cinit__(self, manager):
+    def __cinit__(self, manager=None):
         """Create a BDD."""
         self._mgr = manager
         self._node = NULL
@@ -985,52 +2871,58 @@ cdef class BDD:
         """Destroy a BDD."""
         if self._node is not NULL:
             #print("destructor called")
-            ccudd.Cudd_RecursiveDeref(<ccudd.DdManager *>self._mgr._manager,
-                                      self._node)
+            DerefNode(self._mgr, self._node, False)
 
     def __repr__(self):
         """Return a factored form string for a BDD."""
         cdef int i
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
         cdef char * * variable_names
-        if len(self._mgr._varnames) == size:
-            variable_names = <char * *> malloc(size * sizeof(char *))
-            for i in range(size):
-                utfname = self._mgr._varnames[i].encode('utf-8')
-                one_name = <char *> malloc((len(utfname)+1) * sizeof(char))
-                strcpy(one_name, utfname)
-                variable_names[i] = one_name
-        else:
-            variable_names = NULL
-        cdef char * str = ccudd.Cudd_FactoredFormString(dd, self._node,
-                                                        <const char * const *>
-                                                        variable_names)
-        if variable_names is not NULL:
-            for i in range(size):
-                free(variable_names[i])
-            free(variable_names)
-        if str is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        i = 0
-        while str[i] != b'\0':
-            if str[i] == b'!':
-                str[i] = b'~'
-            i += 1
-        cdef bytes py_str = <bytes> str
-        free(str)
-        return py_str.decode('utf-8', 'strict')
+        cdef char * str
+        cdef bytes py_str
+        AcquireManager(self._mgr)
+        try:
+            variable_names = self._mgr._cnames.update(
+                self._mgr._varnames, ccudd.Cudd_ReadSize(dd))
+            str = ccudd.Cudd_FactoredFormString(dd, self._node,
+                                                <const char * const *>
+                                                variable_names)
+            if str is NULL:
+                raise ManagerError(self._mgr)
+            i = 0
+            while str[i] != b'\0':
+                if str[i] == b'!':
+                    str[i] = b'~'
+                i += 1
+            py_str = <bytes> str
+            free(str)
+            return py_str.decode('utf-8', 'strict')
+        finally:
+            ReleaseManager(self._mgr)
 
     def __hash__(self):
         """Return hash code for a BDD."""
         return int(<intptr_t> self._node)
 
+    def __reduce__(self):
+        """Pickle a BDD as a reference into a shared node table."""
+        AcquireManager(self._mgr)
+        try:
+            return (_restoreDD, EncodeNodes(self._mgr, BDD_TABLE, self._node))
+        finally:
+            ReleaseManager(self._mgr)
+
     def negate(self):
         """Return the negation of the BDD."""
-        cdef ccudd.DdNode * fnot = ccudd.Cudd_Not(self._node)
-        if fnot is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, fnot)
+        cdef ccudd.DdNode * fnot
+        AcquireManager(self._mgr)
+        try:
+            fnot = ccudd.Cudd_Not(self._node)
+            if fnot is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, fnot)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __invert__(self):
         """Return the negation of the BDD."""
@@ -1040,13 +2932,17 @@ cdef class BDD:
         """Return the conjunction with another BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        if limit is None:
-            res = ccudd.Cudd_bddAnd(dd, self._node, other._node)
-        else:
-            res = ccudd.Cudd_bddAndLimit(dd, self._node, other._node, limit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        AcquireManager(self._mgr)
+        try:
+            if limit is None:
+                res = ccudd.Cudd_bddAnd(dd, self._node, other._node)
+            else:
+                res = ccudd.Cudd_bddAndLimit(dd, self._node, other._node, limit)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __and__(self, BDD other):
         """Return the conjunction with another BDD."""
@@ -1055,11 +2951,16 @@ cdef class BDD:
     def iconjoin(self, BDD other):
         """Conjoin this BDD with another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddAnd(dd, self._node,
-                                                    other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddAnd(dd, self._node,
+                                    other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __iand__(self, BDD other):
         """Conjoin this BDD with another."""
@@ -1068,11 +2969,16 @@ cdef class BDD:
     def disjoin(self, BDD other):
         """Return the disjunction with another BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * disj = ccudd.Cudd_bddOr(dd, self._node,
-                                                    other._node)
-        if disj is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, disj)
+        cdef ccudd.DdNode * disj
+        AcquireManager(self._mgr)
+        try:
+            disj = ccudd.Cudd_bddOr(dd, self._node,
+                                    other._node)
+            if disj is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, disj)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __or__(self, BDD other):
         """Return the disjunction with another BDD."""
@@ -1085,11 +2991,16 @@ cdef class BDD:
     def xor(self, BDD other):
         """Return the exclusive or with another BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * diff = ccudd.Cudd_bddXor(dd, self._node,
-                                                     other._node)
-        if diff is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, diff)
+        cdef ccudd.DdNode * diff
+        AcquireManager(self._mgr)
+        try:
+            diff = ccudd.Cudd_bddXor(dd, self._node,
+                                     other._node)
+            if diff is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, diff)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __xor__(self, BDD other):
         """Return the symmetric difference with another BDD."""
@@ -1103,14 +3014,18 @@ cdef class BDD:
         """Return the exclusive NOR with another BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        if limit is None:
-            res = ccudd.Cudd_bddXnor(dd, self._node, other._node)
-        else:
-            res = ccudd.Cudd_bddXnorLimit(dd, self._node, other._node,
-                                         limit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        AcquireManager(self._mgr)
+        try:
+            if limit is None:
+                res = ccudd.Cudd_bddXnor(dd, self._node, other._node)
+            else:
+                res = ccudd.Cudd_bddXnorLimit(dd, self._node, other._node,
+                                             limit)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def iff(self, BDD other, limit=None):
         """Return the equivalence with another BDD."""
@@ -1120,70 +3035,94 @@ cdef class BDD:
         """Return the OR of the negation with another BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        if limit is None:
-            res = ccudd.Cudd_bddAnd(dd, self._node, ccudd.Cudd_Not(other._node))
-        else:
-            res = ccudd.Cudd_bddAndLimit(dd, self._node,
-                                         ccudd.Cudd_Not(other._node), limit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, ccudd.Cudd_Not(res))
+        AcquireManager(self._mgr)
+        try:
+            if limit is None:
+                res = ccudd.Cudd_bddAnd(dd, self._node, ccudd.Cudd_Not(other._node))
+            else:
+                res = ccudd.Cudd_bddAndLimit(dd, self._node,
+                                             ccudd.Cudd_Not(other._node), limit)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, ccudd.Cudd_Not(res))
+        finally:
+            ReleaseManager(self._mgr)
 
     def ite(self, BDD g, BDD h, limit=None):
         """Perform the if-then-else operation."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        if limit is None:
-            res = ccudd.Cudd_bddIte(dd, self._node, g._node, h._node)
-        else:
-            res = ccudd.Cudd_bddIteLimit(dd, self._node, g._node, h._node,
-                                         limit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        AcquireManager(self._mgr)
+        try:
+            if limit is None:
+                res = ccudd.Cudd_bddIte(dd, self._node, g._node, h._node)
+            else:
+                res = ccudd.Cudd_bddIteLimit(dd, self._node, g._node, h._node,
+                                             limit)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def intersect(self, BDD other):
         """Return a function included in the intersection of this BDD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        res = ccudd.Cudd_bddIntersect(dd, self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddIntersect(dd, self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def intersectionCube(self, BDD other):
         """Return a cube included in the intersection of this BDD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        res = ccudd.Cudd_bddIntersectionCube(dd, self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddIntersectionCube(dd, self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def closestCube(self, BDD other):
         """Find a cube of f at minimum Hamming distance from the minterms of g."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef int distance
-        res = ccudd.Cudd_bddClosestCube(dd, self._node, other._node, &distance)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res), distance
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddClosestCube(dd, self._node, other._node, &distance)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res), distance
+        finally:
+            ReleaseManager(self._mgr)
 
     def compare(self, BDD other, int op):
         """Compare this BDD to another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if op == 2:   # ==
-            return self._node == other._node
-        elif op == 3: # !=
-            return self._node != other._node
-        elif op == 1: # <=
-            return ccudd.Cudd_bddLeq(dd, self._node, other._node)
-        elif op == 4: # >
-            return self._node != other._node and ccudd.Cudd_bddLeq(dd, other._node, self._node)
-        elif op == 0: # <
-            return self._node != other._node and ccudd.Cudd_bddLeq(dd, self._node, other._node)
-        else:         # >=
-            return ccudd.Cudd_bddLeq(dd, other._node, self._node)
+        AcquireManager(self._mgr)
+        try:
+            if op == 2:   # ==
+                return self._node == other._node
+            elif op == 3: # !=
+                return self._node != other._node
+            elif op == 1: # <=
+                return ccudd.Cudd_bddLeq(dd, self._node, other._node)
+            elif op == 4: # >
+                return self._node != other._node and ccudd.Cudd_bddLeq(dd, other._node, self._node)
+            elif op == 0: # <
+                return self._node != other._node and ccudd.Cudd_bddLeq(dd, self._node, other._node)
+            else:         # >=
+                return ccudd.Cudd_bddLeq(dd, other._node, self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __richcmp__(self, other, op):
         """Compare this BDD to another."""
@@ -1214,400 +3153,698 @@ cdef class BDD:
     def isVar(self):
         """Test whether this BDD is a variable."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_bddIsVar(dd, self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_bddIsVar(dd, self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def display(self, numVars=None, detail=2, name=None):
         """Display this BDD."""
-        if name:
-            print(name, end='')
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadSize(dd)
-        if not ccudd.Cudd_PrintDebug(dd, self._node, numVars, detail):
-            raise MemoryError(self._mgr.readErrorCode())
-        fflush(stdout)
+        cdef ccudd.DdManager * dd
+        AcquireManager(self._mgr)
+        try:
+            if name:
+                print(name, end='')
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            if not ccudd.Cudd_PrintDebug(dd, self._node, numVars, detail):
+                raise ManagerError(self._mgr)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self._mgr)
 
     def summary(self, numVars=None, mode=0, name=None):
         """Print a summary of this BDD."""
-        if name:
-            print(name, end='')
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadSize(dd)
-        if not ccudd.Cudd_PrintSummary(dd, self._node, numVars, mode):
-            raise MemoryError(self._mgr.readErrorCode())
-        fflush(stdout)
+        cdef ccudd.DdManager * dd
+        AcquireManager(self._mgr)
+        try:
+            if name:
+                print(name, end='')
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            if not ccudd.Cudd_PrintSummary(dd, self._node, numVars, mode):
+                raise ManagerError(self._mgr)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self._mgr)
 
     def cubes(self, epilog=None):
         """Print a disjoint-cube cover of this BDD."""
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if not ccudd.Cudd_PrintMinterm(dd, self._node):
-            raise MemoryError(self._mgr.readErrorCode())
-        fflush(stdout)
-        if epilog is not None:
-            print(epilog)
+        cdef ccudd.DdManager * dd
+        AcquireManager(self._mgr)
+        try:
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            if not ccudd.Cudd_PrintMinterm(dd, self._node):
+                raise ManagerError(self._mgr)
+            fflush(stdout)
+            if epilog is not None:
+                print(epilog)
+        finally:
+            ReleaseManager(self._mgr)
 
     def printCover(self, BDD upper_bound=None):
         """Print a disjunctive normal form cover of this BDD."""
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if upper_bound is None:
-            upper_bound = self
-        if not ccudd.Cudd_bddPrintCover(dd, self._node, upper_bound._node):
-            raise MemoryError(self._mgr.readErrorCode())
-        fflush(stdout)
+        cdef ccudd.DdManager * dd
+        AcquireManager(self._mgr)
+        try:
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            if upper_bound is None:
+                upper_bound = self
+            if not ccudd.Cudd_bddPrintCover(dd, self._node, upper_bound._node):
+                raise ManagerError(self._mgr)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self._mgr)
 
     def interpolate(self, BDD upper_bound):
         """Compute an interpolant between this BDD and upper_bound."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * ip = ccudd.Cudd_bddInterpolate(dd, self._node,
-                                                           upper_bound._node)
-        if ip is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, ip)
+        cdef ccudd.DdNode * ip
+        AcquireManager(self._mgr)
+        try:
+            ip = ccudd.Cudd_bddInterpolate(dd, self._node,
+                                           upper_bound._node)
+            if ip is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, ip)
+        finally:
+            ReleaseManager(self._mgr)
 
     def generate_primes(self, BDD upper_bound=None):
         """Generate prime implicants of this BDD."""
         if upper_bound is None:
             upper_bound = self
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
+        cdef int size
         cdef int * cube
-        cdef ccudd.DdGen * gen = ccudd.Cudd_FirstPrime(dd, self._node,
-                                                       upper_bound._node, &cube)
-        if gen is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
+        cdef ccudd.DdGen * gen
+        # The lock is not held while the caller consumes the primes.
+        AcquireManager(self._mgr)
+        try:
+            size = ccudd.Cudd_ReadSize(dd)
+            gen = ccudd.Cudd_FirstPrime(dd, self._node, upper_bound._node, &cube)
+            if gen is NULL:
+                raise ManagerError(self._mgr)
+        finally:
+            ReleaseManager(self._mgr)
         while not ccudd.Cudd_IsGenEmpty(gen):
             yield [cube[i] for i in range(size)]
+            AcquireManager(self._mgr)
             ccudd.Cudd_NextPrime(gen, &cube)
+            ReleaseManager(self._mgr)
+        AcquireManager(self._mgr)
         ccudd.Cudd_GenFree(gen)
+        ReleaseManager(self._mgr)
 
     def generate_cubes(self):
         """Generate cubes of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
+        cdef int size
         cdef int * cube
         cdef ccudd.CUDD_VALUE_TYPE value
-        cdef ccudd.DdGen * gen = ccudd.Cudd_FirstCube(dd, self._node,
-                                                      &cube, &value)
-        if gen is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
+        cdef ccudd.DdGen * gen
+        # The lock is not held while the caller consumes the cubes.
+        AcquireManager(self._mgr)
+        try:
+            size = ccudd.Cudd_ReadSize(dd)
+            gen = ccudd.Cudd_FirstCube(dd, self._node, &cube, &value)
+            if gen is NULL:
+                raise ManagerError(self._mgr)
+        finally:
+            ReleaseManager(self._mgr)
         while not ccudd.Cudd_IsGenEmpty(gen):
             yield [cube[i] for i in range(size)]
+            AcquireManager(self._mgr)
             ccudd.Cudd_NextCube(gen, &cube, &value)
+            ReleaseManager(self._mgr)
+        AcquireManager(self._mgr)
         ccudd.Cudd_GenFree(gen)
+        ReleaseManager(self._mgr)
+
+    def cubes_array(self, chunk=65536, max_cubes=None, list vars=None):
+        """Generate the cubes of this BDD in chunks.
+
+        Each chunk is a numpy array of int8 with one cube per row.
+        Entries are 0, 1, or 2 (don't care).  If vars is given, only the
+        columns of the variables with those indices are returned.
+        """
+        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
+        cdef int * cube
+        cdef ccudd.CUDD_VALUE_TYPE value
+        cdef ccudd.DdGen * gen
+        AcquireManager(self._mgr)
+        try:
+            gen = ccudd.Cudd_FirstCube(dd, self._node,
+                                       &cube, &value)
+            if gen is NULL:
+                raise ManagerError(self._mgr)
+            return MakeCubeArrays(self._mgr, self, CUBE_GEN, gen, cube, value,
+                                  ccudd.Cudd_ReadSize(dd), chunk, max_cubes,
+                                  vars)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def primes_array(self, BDD upper_bound=None, chunk=65536, max_cubes=None,
+                     list vars=None):
+        """Generate prime implicants of this BDD in chunks of int8 arrays."""
+        cdef ccudd.DdManager * dd
+        cdef int * cube
+        cdef ccudd.DdGen * gen
+        AcquireManager(self._mgr)
+        try:
+            if upper_bound is None:
+                upper_bound = self
+            dd = <ccudd.DdManager *>self._mgr._manager
+            gen = ccudd.Cudd_FirstPrime(dd, self._node,
+                                        upper_bound._node, &cube)
+            if gen is NULL:
+                raise ManagerError(self._mgr)
+            return MakeCubeArrays(self._mgr, (self, upper_bound), PRIME_GEN, gen,
+                                  cube, 0, ccudd.Cudd_ReadSize(dd), chunk,
+                                  max_cubes, vars)
+        finally:
+            ReleaseManager(self._mgr)
 
     def pickOneCube(self):
         """Pick a cube from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
-        cdef char * cubestring = <char *> malloc(size * sizeof(char))
-        if cubestring is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef int res = ccudd.Cudd_bddPickOneCube(dd, self._node,
-                                                 cubestring)
-        if not res:
-            raise ValueError(self._mgr.readErrorCode())
-        retstring = [cubestring[i] for i in range(size)]
-        free(cubestring)
-        return retstring
+        cdef int size
+        cdef char * cubestring
+        cdef int res
+        AcquireManager(self._mgr)
+        try:
+            size = ccudd.Cudd_ReadSize(dd)
+            cubestring = <char *> malloc(size * sizeof(char))
+            if cubestring is NULL:
+                raise MemoryError("memory allocation failed")
+            res = ccudd.Cudd_bddPickOneCube(dd, self._node,
+                                            cubestring)
+            if not res:
+                raise ValueError(self._mgr.readErrorCode())
+            retstring = [cubestring[i] for i in range(size)]
+            free(cubestring)
+            return retstring
+        finally:
+            ReleaseManager(self._mgr)
 
     def pickOneMinterm(self, list vars=None):
         """Pick a minterm from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * * cvars
         cdef int nvars
-        if vars is None:
-            nvars = ccudd.Cudd_ReadSize(dd)
-            cvars = <ccudd.DdNode * *> malloc(nvars * sizeof(ccudd.DdNode *))
-            if cvars is NULL:
-                raise MemoryError("memory allocation failed")
-            for index in range(nvars):
-                cvars[index] = ccudd.Cudd_bddIthVar(dd, index)
-        else:
-            nvars = len(vars)
-            cvars = <ccudd.DdNode * *> malloc(nvars * sizeof(ccudd.DdNode *))
-            for i in range(nvars):
-                if not vars[i].isVar():
-                    free(cvars)
-                    raise TypeError("Found a non-variable at position {0}".format(i))
-                cvars[i] = (<BDD>vars[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddPickOneMinterm(dd, self._node, cvars, nvars)
-        free(cvars)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            if vars is None:
+                nvars = ccudd.Cudd_ReadSize(dd)
+                cvars = <ccudd.DdNode * *> malloc(nvars * sizeof(ccudd.DdNode *))
+                if cvars is NULL:
+                    raise MemoryError("memory allocation failed")
+                for index in range(nvars):
+                    cvars[index] = ccudd.Cudd_bddIthVar(dd, index)
+            else:
+                nvars = len(vars)
+                cvars = <ccudd.DdNode * *> malloc(nvars * sizeof(ccudd.DdNode *))
+                for i in range(nvars):
+                    if not vars[i].isVar():
+                        free(cvars)
+                        raise TypeError("Found a non-variable at position {0}".format(i))
+                    cvars[i] = (<BDD>vars[i])._node
+            res = ccudd.Cudd_bddPickOneMinterm(dd, self._node, cvars, nvars)
+            free(cvars)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def pickCube(self):
         """Pick a cube from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddPickCube(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddPickCube(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def existAbstract(self, BDD cube, limit=None):
         """Existentially quantify variables from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        if limit is None:
-            res = ccudd.Cudd_bddExistAbstract(dd, self._node, cube._node)
-        else:
-            res = ccudd.Cudd_bddExistAbstractLimit(dd, self._node, cube._node,
-                                                   limit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef bint limited = limit is not None
+        cdef unsigned int lim = limit if limited else 0
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                if limited:
+                    res = ccudd.Cudd_bddExistAbstractLimit(dd, self._node,
+                                                           cube._node, lim)
+                else:
+                    res = ccudd.Cudd_bddExistAbstract(dd, self._node, cube._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def univAbstract(self, BDD cube):
         """Universally quantify variables from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddUnivAbstract(dd, self._node,
-                                                             cube._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                res = ccudd.Cudd_bddUnivAbstract(dd, self._node, cube._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def andAbstract(self, BDD other, BDD cube, limit=None):
         """Conjoin to another BDD and existentially quantify variables."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        if limit is None:
-            res = ccudd.Cudd_bddAndAbstract(dd, self._node, other._node,
-                                            cube._node)
-        else:
-            res = ccudd.Cudd_bddAndAbstractLimit(dd, self._node, other._node,
-                                                 cube._node, limit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef bint limited = limit is not None
+        cdef unsigned int lim = limit if limited else 0
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                if limited:
+                    res = ccudd.Cudd_bddAndAbstractLimit(dd, self._node, other._node,
+                                                         cube._node, lim)
+                else:
+                    res = ccudd.Cudd_bddAndAbstract(dd, self._node, other._node,
+                                                    cube._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def booleanDiff(self, BDD var):
         """Compute the Boolean difference w.r.t. a variable."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef int idx = var.index()
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddBooleanDiff(dd, self._node, idx)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddBooleanDiff(dd, self._node, idx)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def compose(self, BDD other, int index):
         """Substitute a variable with a function."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddCompose(dd, self._node,
-                                                        other._node, index)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                res = ccudd.Cudd_bddCompose(dd, self._node, other._node, index)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
-    def vectorCompose(self, list vars, list vector):
-        """Simultaneously substitute a list of variables."""
-        cdef int ns = len(vars)
-        if len(vector) != ns:
-            raise TypeError("The number of functions should equal the number of variables")
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
-        if ns > size:
-            raise TypeError("More substitutions than existing BDD variables")
-        cdef ccudd.DdNode * * functions = <ccudd.DdNode * *> malloc(size * sizeof(ccudd.DdNode *))
-        if functions is NULL:
-            raise MemoryError("memory allocation failed")
-        # Here we rely on the fact that projection functions need no referencing.
-        for index in range(size):
-            functions[index] = ccudd.Cudd_bddIthVar(dd, index)
-        for i in range(ns):
-            if not vars[i].isVar():
-                free(functions)
-                raise TypeError("Found a non-variable at position {0}".format(i))
-            functions[vars[i].index()] = (<BDD>vector[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddVectorCompose(dd, self._node, functions)
-        free(functions)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+    def vectorCompose(self, vars, list vector=None):
+        """Simultaneously substitute a list of variables.
 
-    def swapVariables(self, list current_vars, list new_vars):
-        """Swap two lists of variables."""
-        if len(current_vars) != len(new_vars):
-            raise TypeError("The two lists of variables should have the same length")
-        cdef int n = len(current_vars)
-        cdef ccudd.DdNode * * xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if xvars is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef ccudd.DdNode * * yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if yvars is NULL:
+        vars may also be a VariableMap, in which case vector is omitted.
+        """
+        cdef int ns
+        cdef ccudd.DdManager * dd
+        cdef int size
+        cdef ccudd.DdNode * * functions
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            if isinstance(vars, VariableMap):
+                return (<VariableMap>vars).apply(self, MAP_COMPOSE)
+            if vector is None:
+                raise TypeError("missing list of functions")
+            ns = len(vars)
+            if len(vector) != ns:
+                raise TypeError("The number of functions should equal the number of variables")
+            dd = <ccudd.DdManager *>self._mgr._manager
+            size = ccudd.Cudd_ReadSize(dd)
+            if ns > size:
+                raise TypeError("More substitutions than existing BDD variables")
+            functions = <ccudd.DdNode * *> malloc(size * sizeof(ccudd.DdNode *))
+            if functions is NULL:
+                raise MemoryError("memory allocation failed")
+            # Here we rely on the fact that projection functions need no referencing.
+            for index in range(size):
+                functions[index] = ccudd.Cudd_bddIthVar(dd, index)
+            for i in range(ns):
+                if not vars[i].isVar():
+                    free(functions)
+                    raise TypeError("Found a non-variable at position {0}".format(i))
+                functions[vars[i].index()] = (<BDD>vector[i])._node
+            with nogil:
+                res = ccudd.Cudd_bddVectorCompose(dd, self._node, functions)
+            free(functions)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def swapVariables(self, current_vars, list new_vars=None):
+        """Swap two lists of variables.
+
+        current_vars may also be a VariableMap, in which case new_vars
+        is omitted.
+        """
+        cdef int n
+        cdef ccudd.DdNode * * xvars
+        cdef ccudd.DdNode * * yvars
+        cdef ccudd.DdManager * dd
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            if isinstance(current_vars, VariableMap):
+                return (<VariableMap>current_vars).apply(self, MAP_SWAP)
+            if new_vars is None:
+                raise TypeError("missing list of new variables")
+            if len(current_vars) != len(new_vars):
+                raise TypeError("The two lists of variables should have the same length")
+            n = len(current_vars)
+            xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if xvars is NULL:
+                raise MemoryError("memory allocation failed")
+            yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if yvars is NULL:
+                free(xvars)
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                xvars[i] = (<BDD>current_vars[i])._node
+                yvars[i] = (<BDD>new_vars[i])._node
+            dd = <ccudd.DdManager *>self._mgr._manager
+            with nogil:
+                res = ccudd.Cudd_bddSwapVariables(dd, self._node, xvars, yvars, n)
             free(xvars)
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            xvars[i] = (<BDD>current_vars[i])._node
-            yvars[i] = (<BDD>new_vars[i])._node
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddSwapVariables(dd, self._node,
-                                                              xvars, yvars, n)
-        free(xvars)
-        free(yvars)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+            free(yvars)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def permute(self, permutation):
-        """Return BDD with permuted variables."""
+        """Return BDD with permuted variables.
+
+        permutation is a list of indices or a VariableMap.
+        """
+        cdef ccudd.DdManager * dd
+        cdef int size
+        cdef int * p
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            if isinstance(permutation, VariableMap):
+                return (<VariableMap>permutation).apply(self, MAP_PERMUTE)
+            dd = <ccudd.DdManager *>self._mgr._manager
+            size = ccudd.Cudd_ReadSize(dd)
+            if len(permutation) != size:
+                raise TypeError("length of permutation ({0}) different ".format(len(permutation))
+                                + "from number of variables ({0})".format(size))
+            p = <int *> malloc(size * sizeof(int))
+            if p is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(size):
+                v = permutation[i]
+                if not 0 <= v < size:
+                    raise TypeError("{0} is not a valid variable index (not between 0 and {1})".format(v,size))
+                p[i] = v
+            with nogil:
+                res = ccudd.Cudd_bddPermute(dd, self._node, p)
+            free(p)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def varMap(self):
+        """Apply the variable map set with Cudd.setVarMap to this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
-        if len(permutation) != size:
-            raise TypeError("length of permutation ({0}) different ".format(len(permutation))
-                            + "from number of variables ({0})".format(size))
-        cdef int * p = <int *> malloc(size * sizeof(int))
-        if p is NULL:
-            raise MemoryError("memory allocation failed")
-        for i in range(size):
-            v = permutation[i]
-            if not 0 <= v < size:
-                raise TypeError("{0} is not a valid variable index (not between 0 and {1})".format(v,size))
-            p[i] = v
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddPermute(dd, self._node, p)
-        free(p)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                res = ccudd.Cudd_bddVarMap(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def cofactor(self, BDD cube):
         """Cofactor w.r.t. set of literals (signed variables)."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_Cofactor(dd, self._node,
-                                                      cube._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_Cofactor(dd, self._node,
+                                      cube._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isCube(self):
         """Test whether this BDD is a conjunction of literals."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_CheckCube(dd, self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_CheckCube(dd, self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def dual(self):
         """Return dual of BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddDual(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddDual(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isDual(self, BDD other):
         """Check if BDD is dual to another BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_bddAreDual(dd, self._node, other._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_bddAreDual(dd, self._node, other._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isSelfDual(self):
         """Check if BDD is self-dual."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_bddAreDual(dd, self._node, self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_bddAreDual(dd, self._node, self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def constrain(self, BDD constraint):
         """Apply the 'constrain' generalized cofactor.""" 
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddConstrain(dd, self._node,
-                                                          constraint._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddConstrain(dd, self._node,
+                                          constraint._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def restrict(self, BDD constraint):
         """Apply the 'restrict' generalized cofactor."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddRestrict(dd, self._node,
-                                                         constraint._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddRestrict(dd, self._node,
+                                         constraint._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def npAnd(self, BDD constraint, limit=None):
         """Apply the 'non-polluting-and' generalized cofactor."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        if limit is None:
-            res = ccudd.Cudd_bddNPAnd(dd, self._node, constraint._node)
-        else:
-            res = ccudd.Cudd_bddNPAndLimit(dd, self._node, constraint._node, limit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        AcquireManager(self._mgr)
+        try:
+            if limit is None:
+                res = ccudd.Cudd_bddNPAnd(dd, self._node, constraint._node)
+            else:
+                res = ccudd.Cudd_bddNPAndLimit(dd, self._node, constraint._node, limit)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def LIcompaction(self, BDD constraint):
         """Apply the 'LI compaction' generalized cofactor."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddLICompaction(dd, self._node,
-                                                             constraint._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddLICompaction(dd, self._node,
+                                             constraint._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def squeeze(self, BDD ub):
         """Apply the 'squeeze' generalized cofactor."""
-        if not ub >= self:
-            raise TypeError("invalid upper bound")
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddSqueeze(dd, self._node,
-                                                        ub._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdManager * dd
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            if not ub >= self:
+                raise TypeError("invalid upper bound")
+            dd = <ccudd.DdManager *>self._mgr._manager
+            res = ccudd.Cudd_bddSqueeze(dd, self._node,
+                                        ub._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def minimize(self, BDD constraint):
         """Apply the 'minimize' generalized cofactor."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddMinimize(dd, self._node,
-                                                         constraint._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddMinimize(dd, self._node,
+                                         constraint._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def charToVect(self):
         """Compute a vector of BDDs whose image is this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * * vect = <ccudd.DdNode * *> ccudd.Cudd_bddCharToVect(dd, self._node)
-        if vect is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        cdef int n = ccudd.Cudd_ReadSize(dd)
-        res = [MakeBDD(self._mgr, vect[i]) for i in range(n)]
-        free(vect)
-        return res
+        cdef ccudd.DdNode * * vect
+        cdef int n
+        AcquireManager(self._mgr)
+        try:
+            vect = <ccudd.DdNode * *> ccudd.Cudd_bddCharToVect(dd, self._node)
+            if vect is NULL:
+                raise ManagerError(self._mgr)
+            n = ccudd.Cudd_ReadSize(dd)
+            res = [MakeBDD(self._mgr, vect[i]) for i in range(n)]
+            free(vect)
+            return res
+        finally:
+            ReleaseManager(self._mgr)
 
     def probabilities(self):
         """Return variable probabilities."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef double * vect = ccudd.Cudd_CofMinterm(dd, self._node)
-        cdef int n = ccudd.Cudd_ReadSize(dd)
-        # The factor of 2 is to account for the lack of one variable
-        # in each cofactor.
-        res = [vect[i]/(vect[n]*2.0) for i in range(n)]
-        free(vect)
-        return res
+        cdef double * vect
+        cdef int n
+        AcquireManager(self._mgr)
+        try:
+            vect = ccudd.Cudd_CofMinterm(dd, self._node)
+            n = ccudd.Cudd_ReadSize(dd)
+            # The factor of 2 is to account for the lack of one variable
+            # in each cofactor.
+            res = [vect[i]/(vect[n]*2.0) for i in range(n)]
+            free(vect)
+            return res
+        finally:
+            ReleaseManager(self._mgr)
 
     def support(self):
         """Compute the cube of the variables in the support of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_Support(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_Support(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def supportIndices(self):
+        """Return the sorted indices of the variables in the support."""
+        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
+        cdef int * indices
+        cdef int n
+        AcquireManager(self._mgr)
+        try:
+            n = ccudd.Cudd_SupportIndices(dd, self._node, &indices)
+            if n == ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+            support = [indices[i] for i in range(n)]
+            free(indices)
+            return support
+        finally:
+            ReleaseManager(self._mgr)
 
     def varIsDependent(self, BDD var):
         """Test whether var is dependent in this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_bddVarIsDependent(dd, self._node, var._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_bddVarIsDependent(dd, self._node, var._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def varsAreSymmetric(self, int index1, int index2):
         """Test whether variables are symmetric in this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_VarsAreSymmetric(dd, self._node, index1, index2)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_VarsAreSymmetric(dd, self._node, index1, index2)
+        finally:
+            ReleaseManager(self._mgr)
 
     def size(self):
         """Return the size of this BDD."""
-        return ccudd.Cudd_DagSize(self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_DagSize(self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def index(self):
         """Return the index of the root of this BDD."""
@@ -1617,272 +3854,439 @@ cdef class BDD:
         """Evaluate this BDD for specified values of the variables."""
         cdef int n = len(values)
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
-        if n != size:
-            raise TypeError("number of values ({0}) different ".format(n) +
-                            "from number of variables ({0})".format(size))
-        cdef int * inputs = <int *> malloc(n * sizeof(int))
-        if inputs is NULL:
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            if not values[i] in range(2):
-                free(inputs)
-                raise TypeError("non-binary value ({0}) ".format(values[i]) +
-                                "in position {0}".format(i))
-            inputs[i] = values[i]
-        cdef ccudd.DdNode * res = ccudd.Cudd_Eval(dd, self._node, inputs)
-        free(inputs)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef int size
+        cdef int * inputs
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            size = ccudd.Cudd_ReadSize(dd)
+            if n != size:
+                raise TypeError("number of values ({0}) different ".format(n) +
+                                "from number of variables ({0})".format(size))
+            inputs = <int *> malloc(n * sizeof(int))
+            if inputs is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                if not values[i] in range(2):
+                    free(inputs)
+                    raise TypeError("non-binary value ({0}) ".format(values[i]) +
+                                    "in position {0}".format(i))
+                inputs[i] = values[i]
+            res = ccudd.Cudd_Eval(dd, self._node, inputs)
+            free(inputs)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
+
+    @cython.boundscheck(False)
+    def eval_batch(self, inputs, packed=False):
+        """Evaluate this BDD for each row of a 2-D array of uint8.
+
+        Returns a numpy array of bool.  If packed is true, the rows hold
+        the values of the variables as bits (see numpy.packbits).
+        """
+        cdef ccudd.DdManager * dd
+        cdef const unsigned char[:, ::1] rv
+        cdef const unsigned char * base
+        cdef Py_ssize_t width
+        cdef unsigned char[::1] resv
+        cdef Py_ssize_t i
+        cdef bint bits
+        cdef ccudd.DdNode * f
+        AcquireManager(self._mgr)
+        try:
+            import numpy
+            dd = <ccudd.DdManager *>self._mgr._manager
+            rows = BatchInputs(inputs, ccudd.Cudd_ReadSize(dd), packed)
+            rv = rows
+            base = &rv[0, 0] if rows.size > 0 else NULL
+            width = rv.shape[1]
+            result = numpy.empty(rv.shape[0], dtype=numpy.uint8)
+            resv = result
+            bits = packed
+            f = self._node
+            with nogil:
+                for i in range(rv.shape[0]):
+                    resv[i] = EvalBddRow(f, base + i * width, bits)
+            return result.view(numpy.bool_)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isDecreasing(self, i):
         """Return True if and only if this BDD is decreasing in index i."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_Decreasing(dd, self._node, i)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return res == ccudd.Cudd_ReadOne(dd)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_Decreasing(dd, self._node, i)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return res == ccudd.Cudd_ReadOne(dd)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isIncreasing(self, i):
         """Return True if and only if this BDD is increasing in index i."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_Increasing(dd, self._node, i)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return res == ccudd.Cudd_ReadOne(dd)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_Increasing(dd, self._node, i)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return res == ccudd.Cudd_ReadOne(dd)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isPositive(self):
         """Return True if and only if this BDD is increasing in all variables."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_bddPositive(dd, self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_bddPositive(dd, self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isNegative(self):
         """Return True if and only if this BDD is decreasing in all variables."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_bddNegative(dd, self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_bddNegative(dd, self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def makePrime(self, BDD f):
         """Expand this cube BDD to a prime implicant of f."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddMakePrime(dd, self._node, f._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddMakePrime(dd, self._node, f._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def maximallyExpand(self, BDD ub, BDD f):
         """Expand this BDD to the disjunction of primes of (f and ub)."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddMaximallyExpand(dd, self._node, ub._node, f._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
-        pass
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddMaximallyExpand(dd, self._node, ub._node, f._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+            pass
+        finally:
+            ReleaseManager(self._mgr)
 
     def largestPrimeUnate(self, BDD phaseBDD):
         """Find largest prime implicant of a unate function."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddLargestPrimeUnate(dd, self._node, phaseBDD._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
-        pass
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_bddLargestPrimeUnate(dd, self._node, phaseBDD._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+            pass
+        finally:
+            ReleaseManager(self._mgr)
 
     def essential(self):
         """Return the cube of the essential variables of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_FindEssential(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_FindEssential(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isEssential(self, BDD var):
         """Test whether a variable is essential in this BDD."""
-        if (~var).isVar():
-            phase = False
-        elif not var.isVar():
-            raise TypeError("parameter is not a variable")
-        else:
-            phase = True
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int idx = var.index()
-        return ccudd.Cudd_bddIsVarEssential(dd, self._node, idx, phase)
+        cdef ccudd.DdManager * dd
+        cdef int idx
+        AcquireManager(self._mgr)
+        try:
+            if (~var).isVar():
+                phase = False
+            elif not var.isVar():
+                raise TypeError("parameter is not a variable")
+            else:
+                phase = True
+            dd = <ccudd.DdManager *>self._mgr._manager
+            idx = var.index()
+            return ccudd.Cudd_bddIsVarEssential(dd, self._node, idx, phase)
+        finally:
+            ReleaseManager(self._mgr)
 
     def solveEqn(self, list unknowns, verify=False):
         """Solve the equation F=0 for the unknowns."""
-        Y = self._mgr.bddOne()
-        for y in unknowns:
-            Y &= y
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int n = len(unknowns)
-        cdef ccudd.DdNode * * G = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if G is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef int * yindex = NULL
-        cdef ccudd.DdNode * consist = ccudd.Cudd_SolveEqn(dd, self._node, (<BDD>Y)._node, G, &yindex, n)
-        if consist is NULL:
-            free(yindex)
-            raise MemoryError(self._mgr.readErrorCode())
+        cdef ccudd.DdManager * dd
+        cdef int n
+        cdef ccudd.DdNode * * G
+        cdef int * yindex
+        cdef ccudd.DdNode * consist
         cdef ccudd.DdNode * ver
-        if verify:
-            ver = ccudd.Cudd_VerifySol(dd, self._node, G, yindex, n)
-            if ver != consist:
-                free(G)
-                raise RuntimeError(self._mgr.readErrorCode())
-        else:
-            free(yindex)
-        solutions = [MakeBDD(self._mgr, G[i]) for i in range(n)]
-        free(G)
-        return (MakeBDD(self._mgr, consist), solutions)
+        AcquireManager(self._mgr)
+        try:
+            Y = self._mgr.bddOne()
+            for y in unknowns:
+                Y &= y
+            dd = <ccudd.DdManager *>self._mgr._manager
+            n = len(unknowns)
+            G = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if G is NULL:
+                raise MemoryError("memory allocation failed")
+            yindex = NULL
+            consist = ccudd.Cudd_SolveEqn(dd, self._node, (<BDD>Y)._node, G, &yindex, n)
+            if consist is NULL:
+                free(yindex)
+                raise ManagerError(self._mgr)
+            if verify:
+                ver = ccudd.Cudd_VerifySol(dd, self._node, G, yindex, n)
+                if ver != consist:
+                    free(G)
+                    raise RuntimeError(self._mgr.readErrorCode())
+            else:
+                free(yindex)
+            solutions = [MakeBDD(self._mgr, G[i]) for i in range(n)]
+            free(G)
+            return (MakeBDD(self._mgr, consist), solutions)
+        finally:
+            ReleaseManager(self._mgr)
 
     def remapUnderApprox(self, numVars=0, threshold=0, quality=1.0):
         """Compute an underapproximation of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_RemapUnderApprox(dd, self._node, numVars, threshold, quality)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_RemapUnderApprox(dd, self._node, numVars, threshold, quality)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def remapOverApprox(self, numVars=0, threshold=0, quality=1.0):
         """Compute an overapproximation of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_RemapOverApprox(dd, self._node, numVars, threshold, quality)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_RemapOverApprox(dd, self._node, numVars, threshold, quality)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def biasedUnderApprox(self, BDD bias, numVars=0, threshold=0, quality1=1.0, quality0=1.0):
         """Compute a biased underapproximation of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_BiasedUnderApprox(dd, self._node, bias._node, numVars, threshold, quality1, quality0)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_BiasedUnderApprox(dd, self._node, bias._node, numVars, threshold, quality1, quality0)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def biasedOverApprox(self, BDD bias, numVars=0, threshold=0, quality1=1.0, quality0=1.0):
         """Compute a biased overapproximation of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_BiasedOverApprox(dd, self._node, bias._node, numVars, threshold, quality1, quality0)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_BiasedOverApprox(dd, self._node, bias._node, numVars, threshold, quality1, quality0)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def genConjDecomp(self):
         """Decompose this BDD conjunctively."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode ** conjuncts = NULL
-        cdef int nc = ccudd.Cudd_bddGenConjDecomp(dd, self._node, &conjuncts)
-        if nc == 0:
-            raise MemoryError(self._mgr.readErrorCode())
-        left = MakeBDD(self._mgr, conjuncts[0])
-        if nc == 1:
-            right = self._mgr.bddOne()
-        else:
-            right = MakeBDD(self._mgr, conjuncts[1])
-        free(conjuncts)
-        return (left,right)
+        cdef int nc
+        AcquireManager(self._mgr)
+        try:
+            nc = ccudd.Cudd_bddGenConjDecomp(dd, self._node, &conjuncts)
+            if nc == 0:
+                raise ManagerError(self._mgr)
+            left = MakeBDD(self._mgr, conjuncts[0])
+            if nc == 1:
+                right = self._mgr.bddOne()
+            else:
+                right = MakeBDD(self._mgr, conjuncts[1])
+            free(conjuncts)
+            return (left,right)
+        finally:
+            ReleaseManager(self._mgr)
 
     def varConjDecomp(self):
         """Decompose this BDD conjunctively."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode ** conjuncts = NULL
-        cdef int nc = ccudd.Cudd_bddVarConjDecomp(dd, self._node, &conjuncts)
-        if nc == 0:
-            raise MemoryError(self._mgr.readErrorCode())
-        left = MakeBDD(self._mgr, conjuncts[0])
-        if nc == 1:
-            right = self._mgr.bddOne()
-        else:
-            right = MakeBDD(self._mgr, conjuncts[1])
-        free(conjuncts)
-        return (left,right)
+        cdef int nc
+        AcquireManager(self._mgr)
+        try:
+            nc = ccudd.Cudd_bddVarConjDecomp(dd, self._node, &conjuncts)
+            if nc == 0:
+                raise ManagerError(self._mgr)
+            left = MakeBDD(self._mgr, conjuncts[0])
+            if nc == 1:
+                right = self._mgr.bddOne()
+            else:
+                right = MakeBDD(self._mgr, conjuncts[1])
+            free(conjuncts)
+            return (left,right)
+        finally:
+            ReleaseManager(self._mgr)
 
     def approxConjDecomp(self):
         """Decompose this BDD conjunctively."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode ** conjuncts = NULL
-        cdef int nc = ccudd.Cudd_bddApproxConjDecomp(dd, self._node, &conjuncts)
-        if nc == 0:
-            raise MemoryError(self._mgr.readErrorCode())
-        left = MakeBDD(self._mgr, conjuncts[0])
-        if nc == 1:
-            right = self._mgr.bddOne()
-        else:
-            right = MakeBDD(self._mgr, conjuncts[1])
-        free(conjuncts)
-        return (left,right)
+        cdef int nc
+        AcquireManager(self._mgr)
+        try:
+            nc = ccudd.Cudd_bddApproxConjDecomp(dd, self._node, &conjuncts)
+            if nc == 0:
+                raise ManagerError(self._mgr)
+            left = MakeBDD(self._mgr, conjuncts[0])
+            if nc == 1:
+                right = self._mgr.bddOne()
+            else:
+                right = MakeBDD(self._mgr, conjuncts[1])
+            free(conjuncts)
+            return (left,right)
+        finally:
+            ReleaseManager(self._mgr)
 
     def iterConjDecomp(self):
         """Decompose this BDD conjunctively."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode ** conjuncts = NULL
-        cdef int nc = ccudd.Cudd_bddIterConjDecomp(dd, self._node, &conjuncts)
-        if nc == 0:
-            raise MemoryError(self._mgr.readErrorCode())
-        left = MakeBDD(self._mgr, conjuncts[0])
-        if nc == 1:
-            right = self._mgr.bddOne()
-        else:
-            right = MakeBDD(self._mgr, conjuncts[1])
-        free(conjuncts)
-        return (left,right)
+        cdef int nc
+        AcquireManager(self._mgr)
+        try:
+            nc = ccudd.Cudd_bddIterConjDecomp(dd, self._node, &conjuncts)
+            if nc == 0:
+                raise ManagerError(self._mgr)
+            left = MakeBDD(self._mgr, conjuncts[0])
+            if nc == 1:
+                right = self._mgr.bddOne()
+            else:
+                right = MakeBDD(self._mgr, conjuncts[1])
+            free(conjuncts)
+            return (left,right)
+        finally:
+            ReleaseManager(self._mgr)
 
     def subsetHeavyBranch(self, numVars=0, threshold=1):
         """Extract a dense subset from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_SubsetHeavyBranch(dd, self._node, numVars, threshold)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_SubsetHeavyBranch(dd, self._node, numVars, threshold)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def supersetHeavyBranch(self, numVars=0, threshold=1):
         """Extract a dense subset from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_SupersetHeavyBranch(dd, self._node, numVars, threshold)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_SupersetHeavyBranch(dd, self._node, numVars, threshold)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def subsetShortPaths(self, numVars=0, threshold=1, hardlimit=False):
         """Extract a dense subset from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_SubsetShortPaths(dd, self._node, numVars, threshold, hardlimit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_SubsetShortPaths(dd, self._node, numVars, threshold, hardlimit)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def supersetShortPaths(self, numVars=0, threshold=1, hardlimit=False):
         """Extract a dense subset from this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_SupersetShortPaths(dd, self._node, numVars, threshold, hardlimit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_SupersetShortPaths(dd, self._node, numVars, threshold, hardlimit)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def toADD(self):
         """Return the result of converting this BDD to an ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_BddToAdd(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_BddToAdd(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def toZDD(self, BDD cube=None):
         """Return the result of converting this BDD to a ZDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * zdd
-        if cube is None:
-            zdd = ccudd.Cudd_zddPortFromBdd(dd, self._node)
-        else:
-            zdd = ccudd.Cudd_zddPortFromBddNegCof(dd, self._node, cube._node)
-        if zdd is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, zdd)
+        AcquireManager(self._mgr)
+        try:
+            if cube is None:
+                zdd = ccudd.Cudd_zddPortFromBdd(dd, self._node)
+            else:
+                zdd = ccudd.Cudd_zddPortFromBddNegCof(dd, self._node, cube._node)
+            if zdd is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, zdd)
+        finally:
+            ReleaseManager(self._mgr)
 
     def leqUnless(self, BDD other, BDD dontcare):
         """Test whether this BDD is less than or equal to another with don't cares."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_bddLeqUnless(dd, self._node, other._node, dontcare._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_bddLeqUnless(dd, self._node, other._node, dontcare._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     
     def isop(self, BDD upper, cover=False):
@@ -1890,16 +4294,20 @@ cdef class BDD:
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
         cdef ccudd.DdNode * cov
-        if cover:
-            res = ccudd.Cudd_zddIsop(dd, self._node, upper._node, &cov)
-        else:
-            res = ccudd.Cudd_bddIsop(dd, self._node, upper._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        if cover:
-            return (MakeBDD(self._mgr, res), MakeZDD(self._mgr, cov))
-        else:
-            return MakeBDD(self._mgr, res)
+        AcquireManager(self._mgr)
+        try:
+            if cover:
+                res = ccudd.Cudd_zddIsop(dd, self._node, upper._node, &cov)
+            else:
+                res = ccudd.Cudd_bddIsop(dd, self._node, upper._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            if cover:
+                return (MakeBDD(self._mgr, res), MakeZDD(self._mgr, cov))
+            else:
+                return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def correlation(self, BDD other=None, list prob=None):
         """Return the correlation of this BDD and another."""
@@ -1907,194 +4315,401 @@ cdef class BDD:
         cdef double corr
         cdef double * weights
         cdef ccudd.DdNode * othernode
-        if other is None:
-            othernode = ccudd.Cudd_ReadOne(dd);
-        else:
-            othernode = other._node
-        if prob is None:
-            corr = ccudd.Cudd_bddCorrelation(dd, self._node, othernode)
-        else:
-            size = len(prob)
-            nvars = ccudd.Cudd_ReadSize(dd)
-            if size != nvars:
-                raise TypeError(str(size) + " probabilities instead of " + str(nvars))
-            weights = <double *> malloc(size * sizeof(double))
-            for i in range(size):
-                weights[i] = prob[i]
-            corr = ccudd.Cudd_bddCorrelationWeights(dd, self._node, othernode, weights)
-            free(weights)
-        if corr == <double>ccudd.CUDD_OUT_OF_MEM:
-            raise MemoryError(self._mgr.readErrorCode())
-        return corr
+        AcquireManager(self._mgr)
+        try:
+            if other is None:
+                othernode = ccudd.Cudd_ReadOne(dd);
+            else:
+                othernode = other._node
+            if prob is None:
+                corr = ccudd.Cudd_bddCorrelation(dd, self._node, othernode)
+            else:
+                size = len(prob)
+                nvars = ccudd.Cudd_ReadSize(dd)
+                if size != nvars:
+                    raise TypeError(str(size) + " probabilities instead of " + str(nvars))
+                weights = <double *> malloc(size * sizeof(double))
+                for i in range(size):
+                    weights[i] = prob[i]
+                corr = ccudd.Cudd_bddCorrelationWeights(dd, self._node, othernode, weights)
+                free(weights)
+            if corr == <double>ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+            return corr
+        finally:
+            ReleaseManager(self._mgr)
 
     def probability(self, list prob=None):
         """Return the probability of this BDD begin true."""
         return self.correlation(None, prob)
 
+    def weighted_count(self, pos_weights, neg_weights):
+        """Return the weighted count of the minterms of this BDD.
+
+        The weight of a minterm is the product of pos_weights[i] for the
+        variables i that it sets to 1 and neg_weights[i] for the others.
+        With neg_weights[i] = 1 - pos_weights[i] this is the probability.
+        """
+        AcquireManager(self._mgr)
+        try:
+            return WeightedCount(self, pos_weights, neg_weights)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def compile(self):
+        """Return this BDD linearized for repeated weighted counting.
+
+        The compiled form is a snapshot: it keeps the variables and their
+        order at the time of compilation.
+        """
+        cdef CompiledBDD compiled = CompiledBDD.__new__(CompiledBDD)
+        cdef int res
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                res = LinearizeDag(self._mgr._manager, self._node, &compiled._dag)
+            if not res:
+                raise MemoryError("memory allocation failed")
+            return compiled
+        finally:
+            ReleaseManager(self._mgr)
+
     def shortestPath(self, list costs=None, findSupport=False):
         """Return a shortest path of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef int * weights = NULL
         cdef int * support = NULL
         cdef int length
-        cdef int nvars = ccudd.Cudd_ReadSize(dd)
-        if costs is not None:
-            n = len(costs)
-            if n != nvars:
-                raise TypeError(str(n) + " costs instead of " + str(nvars))
-            weights = <int *> malloc(n * sizeof(int))
-            for i in range(n):
-                weights[i] = costs[i]
-        if findSupport:
-            support = <int *> malloc(nvars * sizeof(int))
-        cdef ccudd.DdNode * res = ccudd.Cudd_ShortestPath(dd, self._node, weights, support, &length)
-        free(weights)
-        if res is NULL:
-            free(support)
-            raise MemoryError(self._mgr.readErrorCode())
-        if findSupport:
-            sprt = [support[i] for i in range(nvars)]
-            free(support)
-            return (MakeBDD(self._mgr, res), length, sprt)
-        else:
-            return (MakeBDD(self._mgr, res), length)
+        cdef int nvars
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            nvars = ccudd.Cudd_ReadSize(dd)
+            if costs is not None:
+                n = len(costs)
+                if n != nvars:
+                    raise TypeError(str(n) + " costs instead of " + str(nvars))
+                weights = <int *> malloc(n * sizeof(int))
+                for i in range(n):
+                    weights[i] = costs[i]
+            if findSupport:
+                support = <int *> malloc(nvars * sizeof(int))
+            res = ccudd.Cudd_ShortestPath(dd, self._node, weights, support, &length)
+            free(weights)
+            if res is NULL:
+                free(support)
+                raise ManagerError(self._mgr)
+            if findSupport:
+                sprt = [support[i] for i in range(nvars)]
+                free(support)
+                return (MakeBDD(self._mgr, res), length, sprt)
+            else:
+                return (MakeBDD(self._mgr, res), length)
+        finally:
+            ReleaseManager(self._mgr)
         
     def shortestLength(self, list costs=None):
         """Return the length of the shortest path."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef int * weights
-        if costs is None:
-            weights = NULL
-        else:
-            n = len(costs)
-            nvars = ccudd.Cudd_ReadSize(dd)
-            if n != nvars:
-                raise TypeError(str(n) + " costs instead of " + str(nvars))
-            weights = <int *> malloc(n * sizeof(int))
-            for i in range(n):
-                weights[i] = costs[i]
-        cdef int length = ccudd.Cudd_ShortestLength(dd, self._node, weights)
-        free(weights)
-        if length == ccudd.CUDD_OUT_OF_MEM:
-            raise MemoryError(self._mgr.readErrorCode())
-        return length
+        cdef int length
+        AcquireManager(self._mgr)
+        try:
+            if costs is None:
+                weights = NULL
+            else:
+                n = len(costs)
+                nvars = ccudd.Cudd_ReadSize(dd)
+                if n != nvars:
+                    raise TypeError(str(n) + " costs instead of " + str(nvars))
+                weights = <int *> malloc(n * sizeof(int))
+                for i in range(n):
+                    weights[i] = costs[i]
+            length = ccudd.Cudd_ShortestLength(dd, self._node, weights)
+            free(weights)
+            if length == ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+            return length
+        finally:
+            ReleaseManager(self._mgr)
 
     def largestCube(self, findLength=False):
         """Return a largest cube of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef int length
-        cdef ccudd.DdNode * cube = ccudd.Cudd_LargestCube(dd, self._node, &length)
-        if cube is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        if findLength:
-            return (MakeBDD(self._mgr, cube), length)
-        else:
-            return MakeBDD(self._mgr, cube)
+        cdef ccudd.DdNode * cube
+        AcquireManager(self._mgr)
+        try:
+            cube = ccudd.Cudd_LargestCube(dd, self._node, &length)
+            if cube is NULL:
+                raise ManagerError(self._mgr)
+            if findLength:
+                return (MakeBDD(self._mgr, cube), length)
+            else:
+                return MakeBDD(self._mgr, cube)
+        finally:
+            ReleaseManager(self._mgr)
 
     def transfer(self, Cudd otherManager):
         """Tranfer this BDD to another manager."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdManager * otherDd = <ccudd.DdManager *>otherManager._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_bddTransfer(dd, otherDd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(otherManager, res)
+        cdef ccudd.DdNode * res
+        AcquireManagers(self._mgr, otherManager)
+        try:
+            res = ccudd.Cudd_bddTransfer(dd, otherDd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(otherManager, res)
+        finally:
+            ReleaseManagers(self._mgr, otherManager)
 
     def printTwoLiteralClauses(self):
         """Print two literal clauses of this BDD to stdout."""
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
+        cdef ccudd.DdManager * dd
         cdef char * * variable_names
-        if len(self._mgr._varnames) == size:
-            variable_names = <char * *> malloc(size * sizeof(char *))
-            if variable_names is NULL:
-                raise MemoryError("memory allocation failed")
-            for i in range(size):
-                utfname = self._mgr._varnames[i].encode('utf-8')
-                one_name = <char *> malloc((len(utfname)+1) * sizeof(char))
-                strcpy(one_name, utfname)
-                variable_names[i] = one_name
-        else:
-            variable_names = NULL
-        cdef bint res = ccudd.Cudd_PrintTwoLiteralClauses(dd, self._node, variable_names, stdout)
-        if variable_names is not NULL:
-            for i in range(size):
-                free(variable_names[i])
-            free(variable_names)
-        fflush(stdout)
-        if not res:
-            raise MemoryError(self._mgr.readErrorCode())
+        cdef bint res
+        AcquireManager(self._mgr)
+        try:
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            variable_names = self._mgr._cnames.update(
+                self._mgr._varnames, ccudd.Cudd_ReadSize(dd))
+            res = ccudd.Cudd_PrintTwoLiteralClauses(dd, self._node, variable_names, stdout)
+            fflush(stdout)
+            if not res:
+                raise ManagerError(self._mgr)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def to_cnf(self, file_path, mode='best', edgeInTh=1, pathLengthTh=4):
+        """Store this BDD to a file in DIMACS CNF format.
+
+        BDD variable i is CNF variable i+1; more variables are added
+        for the nodes that are cut by the encoding.  Mode 'node' cuts
+        every node, 'maxterm' cuts none and writes the off-set, and
+        'best' cuts the nodes with more than edgeInTh incoming edges
+        and the paths longer than pathLengthTh (-1 disables either
+        criterion).  Return the number of clauses and the number of
+        added variables.  The constants are written without variables:
+        true as no clauses and false as one empty clause.
+        """
+        cdef ccudd.Dddmp_DecompCnfStoreType cmode
+        cdef ccudd.DdManager * dd
+        cdef char * * variable_names
+        cdef char * cpath
+        cdef int edges
+        cdef int length
+        cdef int nclauses
+        cdef int nnew
+        cdef int ret
+        AcquireManager(self._mgr)
+        try:
+            modes = {'node': ccudd.DDDMP_CNF_MODE_NODE,
+                     'maxterm': ccudd.DDDMP_CNF_MODE_MAXTERM,
+                     'best': ccudd.DDDMP_CNF_MODE_BEST}
+            if mode not in modes:
+                raise ValueError("unknown mode ({0})".format(mode))
+            cmode = modes[mode]
+            dd = <ccudd.DdManager *>self._mgr._manager
+            variable_names = self._mgr._cnames.update(
+                self._mgr._varnames, ccudd.Cudd_ReadSize(dd))
+            utfpath = file_path.encode('utf-8')
+            cpath = utfpath
+            edges = edgeInTh
+            length = pathLengthTh
+            nclauses = 0
+            nnew = 0
+            if ccudd.Cudd_IsConstant(self._node):
+                # DDDMP cannot store the constants.
+                nclauses = self._node != ccudd.Cudd_ReadOne(dd)
+                with open(file_path, 'w') as f:
+                    f.write("p cnf 0 {0}\n".format(nclauses))
+                    f.write("0\n" * nclauses)
+                return nclauses, 0
+            with nogil:
+                ret = ccudd.Dddmp_cuddBddStoreCnf(dd, self._node, cmode, 0,
+                                                  variable_names, NULL, NULL, NULL,
+                                                  0, edges, length, cpath, NULL,
+                                                  &nclauses, &nnew)
+            if ret != ccudd.DDDMP_SUCCESS:
+                raise IOError("cannot store CNF to {0}".format(file_path))
+            return nclauses, nnew
+        finally:
+            ReleaseManager(self._mgr)
 
     def twoLiteralClauses(self):
         """Return list of two-literal clauses of this BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
-        cdef ccudd.DdTlcInfo * tlc = ccudd.Cudd_FindTwoLiteralClauses(dd, self._node)
-        if tlc is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
+        cdef int size
+        cdef ccudd.DdTlcInfo * tlc
         cdef unsigned var1
         cdef unsigned var2
         cdef int phase1
         cdef int phase2
-        cdef int i = 0
-        cl_lst = []
-        while ccudd.Cudd_ReadIthClause(tlc, i, &var1, &var2, &phase1, &phase2):
-            lit1 = self._mgr.bddVar(var1)
-            if phase1 == 1:
-                lit1 = ~lit1
-            if var2 == ccudd.Cudd_ReadMaxIndex():
-                lit2 = self._mgr.bddZero()
-            else:
-                lit2 = self._mgr.bddVar(var2)
-                if phase2 == 1:
-                    lit2 = ~lit2
-            cl_lst.append(lit1 | lit2)
-            i += 1
-        ccudd.Cudd_tlcInfoFree(tlc)
-        return cl_lst
+        cdef int i
+        AcquireManager(self._mgr)
+        try:
+            size = ccudd.Cudd_ReadSize(dd)
+            tlc = ccudd.Cudd_FindTwoLiteralClauses(dd, self._node)
+            if tlc is NULL:
+                raise ManagerError(self._mgr)
+            i = 0
+            cl_lst = []
+            while ccudd.Cudd_ReadIthClause(tlc, i, &var1, &var2, &phase1, &phase2):
+                lit1 = self._mgr.bddVar(var1)
+                if phase1 == 1:
+                    lit1 = ~lit1
+                if var2 == ccudd.Cudd_ReadMaxIndex():
+                    lit2 = self._mgr.bddZero()
+                else:
+                    lit2 = self._mgr.bddVar(var2)
+                    if phase2 == 1:
+                        lit2 = ~lit2
+                cl_lst.append(lit1 | lit2)
+                i += 1
+            ccudd.Cudd_tlcInfoFree(tlc)
+            return cl_lst
+        finally:
+            ReleaseManager(self._mgr)
 
     def count_as_double(self, numVars=None):
         """Return the number of minterms as a double."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadSize(dd)
-        cdef double count = ccudd.Cudd_CountMinterm(dd, self._node, numVars)
-        if count == <double>ccudd.CUDD_OUT_OF_MEM:
-            raise MemoryError(self._mgr.readErrorCode())
-        return count
+        cdef int nvars
+        cdef double count
+        AcquireManager(self._mgr)
+        try:
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            nvars = numVars
+            with nogil:
+                count = ccudd.Cudd_CountMinterm(dd, self._node, nvars)
+            if count == <double>ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+            return count
+        finally:
+            ReleaseManager(self._mgr)
 
     def count(self, numVars=None):
         """Return the number of minterms as an unbounded int."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadSize(dd)
+        cdef int nvars
+        cdef int digits
+        cdef ccudd.DdApaNumber apacount
+        AcquireManager(self._mgr)
+        try:
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            nvars = numVars
+            with nogil:
+                apacount = ccudd.Cudd_ApaCountMinterm(dd, self._node, nvars, &digits)
+            if apacount is NULL:
+                raise ManagerError(self._mgr)
+            return ApaToInt(apacount, digits)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def count_as_long_double(self, numVars=None):
+        """Return the number of minterms, computed in long double
+        precision, as an int."""
+        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
+        cdef int nvars
+        cdef long double count
+        AcquireManager(self._mgr)
+        try:
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            nvars = numVars
+            with nogil:
+                count = ccudd.Cudd_LdblCountMinterm(dd, self._node, nvars)
+            if count == <long double>ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+            if count == HUGE_VALL:
+                raise OverflowError("number of minterms too large for a long double")
+            return FloatToInt(count)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def count_as_epd(self, numVars=None):
+        """Return the number of minterms, computed with at least the
+        precision of a double and an unbounded exponent, as an int.
+
+        The count is done in long double precision, and exactly when it
+        overflows a long double.
+        """
+        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
+        cdef int nvars
+        cdef long double count
         cdef int digits
-        cdef ccudd.DdApaNumber apacount = ccudd.Cudd_ApaCountMinterm(dd, self._node, numVars, &digits)
-        if apacount is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        # Convert.
-        count = apacount[0]
-        for i in range(1,digits):
-            count <<= sizeof(ccudd.DdApaDigit) * 8
-            count += apacount[i]
-        ccudd.Cudd_FreeApaNumber(apacount)
-        return count
+        cdef ccudd.DdApaNumber apacount
+        AcquireManager(self._mgr)
+        try:
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            nvars = numVars
+            with nogil:
+                count = ccudd.Cudd_LdblCountMinterm(dd, self._node, nvars)
+            if count == <long double>ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+            if count != HUGE_VALL:
+                return FloatToInt(count)
+            with nogil:
+                apacount = ccudd.Cudd_ApaCountMinterm(dd, self._node, nvars, &digits)
+            if apacount is NULL:
+                raise ManagerError(self._mgr)
+            return ApaToInt(apacount, digits)
+        finally:
+            ReleaseManager(self._mgr)
+
+    def count_parallel(self, split_vars=4, workers=None, numVars=None):
+        """Return the number of minterms, counted in a pool of processes.
+
+        The BDD is cofactored on the split_vars topmost variables of its
+        support, and the exact minterm counts of the cofactors are
+        computed concurrently by the workers of a ManagerPool and summed.
+        """
+        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
+        # The manager is not locked while the workers count.
+        AcquireManager(self._mgr)
+        try:
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            levels = sorted((ccudd.Cudd_ReadPerm(dd, i), i)
+                            for i in self.supportIndices())
+            split = [i for level, i in levels[:split_vars]]
+            if not split:
+                return self.count(numVars)
+            cubes = [self._mgr.bddOne()]
+            for index in split:
+                var = self._mgr.bddVar(index)
+                cubes = [c & lit for c in cubes for lit in (~var, var)]
+        finally:
+            ReleaseManager(self._mgr)
+        # A cofactor does not depend on the split variables.
+        tasks = [(self, cube, numVars - len(split)) for cube in cubes]
+        with ManagerPool(self._mgr, workers) as pool:
+            return sum(pool.map(_countWorker, tasks))
 
     def cube(self):
         """Return a positional cube representation of a cube BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        numVars = ccudd.Cudd_ReadSize(dd)
-        cube = <int *> malloc(numVars * sizeof(int))
-        cdef int ret = ccudd.Cudd_BddToCubeArray(dd, self._node, cube);
-        if ret == 0:
+        cdef int ret
+        AcquireManager(self._mgr)
+        try:
+            numVars = ccudd.Cudd_ReadSize(dd)
+            cube = <int *> malloc(numVars * sizeof(int))
+            ret = ccudd.Cudd_BddToCubeArray(dd, self._node, cube);
+            if ret == 0:
+                free(cube)
+                raise ManagerError(self._mgr)
+            cubelist = []
+            for i in range(numVars):
+                cubelist.append(cube[i])
             free(cube)
-            raise MemoryError(self._mgr.readErrorCode())
-        cubelist = []
-        for i in range(numVars):
-            cubelist.append(cube[i])
-        free(cube)
-        return cubelist
+            return cubelist
+        finally:
+            ReleaseManager(self._mgr)
 
     def cubeString(self):
         """Return a positional cube string of a cube BDD."""
@@ -2102,13 +4717,14 @@ cdef class BDD:
         convert = lambda x : "-" if x == 2 else str(x)
         return "".join(map(convert, cubelist))
 
+@cython.freelist(1024)
 cdef class ADD:
     """Class of Algebraic Decision Diagrams."""
 
     cdef Cudd _mgr
     cdef ccudd.DdNode * _node
 
-    def __cinit__(self, manager):
+    def __cinit__(self, manager=None):
         """Create an ADD."""
         self._mgr = manager
         self._node = NULL
@@ -2117,22 +4733,57 @@ cdef class ADD:
         """Destroy an ADD."""
         if self._node is not NULL:
             #print("destructor called")
-            ccudd.Cudd_RecursiveDeref(<ccudd.DdManager *>self._mgr._manager,
-                                      self._node)
+            DerefNode(self._mgr, self._node, False)
     def generate_cubes(self):
         """Generate the cubes of this ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
+        cdef int size
         cdef int * cube
         cdef ccudd.CUDD_VALUE_TYPE value
-        cdef ccudd.DdGen * gen = ccudd.Cudd_FirstCube(dd, self._node,
-                                                      &cube, &value)
-        if gen is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
+        cdef ccudd.DdGen * gen
+        # The lock is not held while the caller consumes the cubes.
+        AcquireManager(self._mgr)
+        try:
+            size = ccudd.Cudd_ReadSize(dd)
+            gen = ccudd.Cudd_FirstCube(dd, self._node, &cube, &value)
+            if gen is NULL:
+                raise ManagerError(self._mgr)
+        finally:
+            ReleaseManager(self._mgr)
         while not ccudd.Cudd_IsGenEmpty(gen):
             yield ([cube[i] for i in range(size)], value)
+            AcquireManager(self._mgr)
             ccudd.Cudd_NextCube(gen, &cube, &value)
+            ReleaseManager(self._mgr)
+        AcquireManager(self._mgr)
         ccudd.Cudd_GenFree(gen)
+        ReleaseManager(self._mgr)
+
+    def cubes_array(self, chunk=65536, max_cubes=None, list vars=None):
+        """Generate the cubes of this ADD in chunks.
+
+        Each chunk is a pair of numpy arrays: the cubes as int8, one per
+        row, and their values as float64.  If vars is given, only the
+        columns of the variables with those indices are returned.
+        """
+        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
+        cdef int * cube
+        cdef ccudd.CUDD_VALUE_TYPE value
+        cdef ccudd.DdGen * gen
+        cdef CubeArrays chunks
+        AcquireManager(self._mgr)
+        try:
+            gen = ccudd.Cudd_FirstCube(dd, self._node,
+                                       &cube, &value)
+            if gen is NULL:
+                raise ManagerError(self._mgr)
+            chunks = MakeCubeArrays(
+                self._mgr, self, CUBE_GEN, gen, cube, value,
+                ccudd.Cudd_ReadSize(dd), chunk, max_cubes, vars)
+            chunks._withValues = True
+            return chunks
+        finally:
+            ReleaseManager(self._mgr)
 
     def __repr__(self):
         """Return the truth table of this ADD as a string."""
@@ -2148,21 +4799,33 @@ cdef class ADD:
         """Return hash code for an ADD."""
         return int(<intptr_t> self._node)
 
+    def __reduce__(self):
+        """Pickle an ADD as a reference into a shared node table."""
+        AcquireManager(self._mgr)
+        try:
+            return (_restoreDD, EncodeNodes(self._mgr, ADD_TABLE, self._node))
+        finally:
+            ReleaseManager(self._mgr)
+
     def compare(self, ADD other, int op):
         """Compare this ADD to another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if op == 2:   # ==
-            return self._node == other._node
-        elif op == 3: # !=
-            return self._node != other._node
-        elif op == 1: # <=
-            return ccudd.Cudd_addLeq(dd, self._node, other._node)
-        elif op == 4: # >
-            return self._node != other._node and ccudd.Cudd_addLeq(dd, other._node, self._node)
-        elif op == 0: # <
-            return self._node != other._node and ccudd.Cudd_addLeq(dd, self._node, other._node)
-        else:         # >=
-            return ccudd.Cudd_addLeq(dd, other._node, self._node)
+        AcquireManager(self._mgr)
+        try:
+            if op == 2:   # ==
+                return self._node == other._node
+            elif op == 3: # !=
+                return self._node != other._node
+            elif op == 1: # <=
+                return ccudd.Cudd_addLeq(dd, self._node, other._node)
+            elif op == 4: # >
+                return self._node != other._node and ccudd.Cudd_addLeq(dd, other._node, self._node)
+            elif op == 0: # <
+                return self._node != other._node and ccudd.Cudd_addLeq(dd, self._node, other._node)
+            else:         # >=
+                return ccudd.Cudd_addLeq(dd, other._node, self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __richcmp__(self, other, op):
         """Compare this ADD to another."""
@@ -2193,7 +4856,11 @@ cdef class ADD:
     def isVar(self):
         """Test whether this ADD is a variable."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_addIsVar(dd, self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_addIsVar(dd, self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def index(self):
         """Return the index of the root of this ADD."""
@@ -2201,63 +4868,131 @@ cdef class ADD:
 
     def size(self):
         """Return the size of this ADD."""
-        return ccudd.Cudd_DagSize(self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_DagSize(self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def display(self, numVars=None, detail=2, name=None):
         """Display this ADD."""
-        if name:
-            print(name, end='')
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadSize(dd)
-        if not ccudd.Cudd_PrintDebug(dd, self._node, numVars, detail):
-            raise MemoryError(self._mgr.readErrorCode())
-        fflush(stdout)
+        cdef ccudd.DdManager * dd
+        AcquireManager(self._mgr)
+        try:
+            if name:
+                print(name, end='')
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            if not ccudd.Cudd_PrintDebug(dd, self._node, numVars, detail):
+                raise ManagerError(self._mgr)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self._mgr)
 
     def summary(self, numVars=None, mode=0, name=None):
         """Print a summary of this ADD."""
-        if name:
-            print(name, end='')
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadSize(dd)
-        if not ccudd.Cudd_PrintSummary(dd, self._node, numVars, mode):
-            raise MemoryError(self._mgr.readErrorCode())
-        fflush(stdout)
+        cdef ccudd.DdManager * dd
+        AcquireManager(self._mgr)
+        try:
+            if name:
+                print(name, end='')
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            if not ccudd.Cudd_PrintSummary(dd, self._node, numVars, mode):
+                raise ManagerError(self._mgr)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self._mgr)
 
     def countLeaves(self):
         """Return the number of leaves."""
-        cdef int cnt = ccudd.Cudd_CountLeaves(self._node)
-        if cnt == ccudd.CUDD_OUT_OF_MEM:
-            raise MemoryError(self._mgr.readErrorCode())
+        cdef int cnt
+        AcquireManager(self._mgr)
+        try:
+            cnt = ccudd.Cudd_CountLeaves(self._node)
+            if cnt == ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+        finally:
+            ReleaseManager(self._mgr)
+
+    @cython.boundscheck(False)
+    def eval_batch(self, inputs, packed=False):
+        """Evaluate this ADD for each row of a 2-D array of uint8.
+
+        Returns a numpy array of float64.  If packed is true, the rows
+        hold the values of the variables as bits (see numpy.packbits).
+        """
+        cdef ccudd.DdManager * dd
+        cdef const unsigned char[:, ::1] rv
+        cdef const unsigned char * base
+        cdef Py_ssize_t width
+        cdef double[::1] resv
+        cdef Py_ssize_t i
+        cdef bint bits
+        cdef ccudd.DdNode * f
+        AcquireManager(self._mgr)
+        try:
+            import numpy
+            dd = <ccudd.DdManager *>self._mgr._manager
+            rows = BatchInputs(inputs, ccudd.Cudd_ReadSize(dd), packed)
+            rv = rows
+            base = &rv[0, 0] if rows.size > 0 else NULL
+            width = rv.shape[1]
+            result = numpy.empty(rv.shape[0], dtype=numpy.float64)
+            resv = result
+            bits = packed
+            f = self._node
+            with nogil:
+                for i in range(rv.shape[0]):
+                    resv[i] = EvalAddRow(f, base + i * width, bits)
+            return result
+        finally:
+            ReleaseManager(self._mgr)
 
     def ite(self, ADD g, ADD h):
         """Apply the if-then-else operation."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addIte(dd, self._node, g._node,
-                                                    h._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addIte(dd, self._node, g._node,
+                                    h._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def cofactor(self, ADD cube):
         """Return the cofactor this ADD w.r.t. a set of literals."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_Cofactor(dd, self._node,
-                                                      cube._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_Cofactor(dd, self._node,
+                                      cube._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def complement(self):
         """Return the complement of this ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addCmpl(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addCmpl(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __invert__(self):
         """Return the complement of this ADD."""
@@ -2266,10 +5001,15 @@ cdef class ADD:
     def negate(self):
         """Return the additive inverse of this ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addNegate(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addNegate(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __neg__(self):
         """Return the additive inverse of this ADD."""
@@ -2278,11 +5018,16 @@ cdef class ADD:
     def plus(self, ADD other):
         """Return the sum of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addPlus,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addPlus,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __add__(self, ADD other):
         """Return the sum of this ADD and another."""
@@ -2295,11 +5040,16 @@ cdef class ADD:
     def times(self, ADD other):
         """Return the product of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addTimes,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addTimes,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __mul__(self, ADD other):
         """Return the pointwise product of this ADD and another."""
@@ -2320,11 +5070,16 @@ cdef class ADD:
     def divide(self, ADD other):
         """Return the pointwise division of this ADD by another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addDivide,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addDivide,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __div__(self, ADD other):
         """Return the pointwise division of this ADD by another."""
@@ -2337,11 +5092,16 @@ cdef class ADD:
     def minus(self, ADD other):
         """Return the subtraction of another ADD from this one."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addMinus,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addMinus,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __sub__(self, ADD other):
         """Return the subtraction of another ADD from this one."""
@@ -2354,38 +5114,58 @@ cdef class ADD:
     def min(self, ADD other):
         """Return the pointwise minimum of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addMinimum,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addMinimum,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def max(self, ADD other):
         """Return the pointwise maximum of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addMaximum,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addMaximum,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def agreement(self, ADD other):
         """Return the ADD that is 1 iff this ADD agrees with another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addAgreement,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addAgreement,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def disjoin(self, ADD other):
         """Return the disjunction of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addOr,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addOr,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __or__(self, ADD other):
         """Return the disjunction of this ADD and another."""
@@ -2398,29 +5178,44 @@ cdef class ADD:
     def nand(self, ADD other):
         """Return the NAND of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addNand,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addNand,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def nor(self, ADD other):
         """Return the NOR of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addNor,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addNor,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def xor(self, ADD other):
         """Return the symmetric difference of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addXor,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addXor,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __xor__(self, ADD other):
         """Return the symmetric difference of this ADD and another."""
@@ -2433,11 +5228,16 @@ cdef class ADD:
     def xnor(self, ADD other):
         """Return the exclusive NOR of this ADD and another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addXnor,
-                                                      self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addApply(dd, ccudd.Cudd_addXnor,
+                                      self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def iff(self, ADD other):
         """Return the equivalence of this ADD and another."""
@@ -2446,264 +5246,382 @@ cdef class ADD:
     def existAbstract(self, ADD cube):
         """Return the existential quantification of a set of variables."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addExistAbstract(dd, self._node,
-                                                              cube._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                res = ccudd.Cudd_addExistAbstract(dd, self._node, cube._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def univAbstract(self, ADD cube):
         """Return the universal quantification of a set of variables."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addUnivAbstract(dd, self._node,
-                                                             cube._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                res = ccudd.Cudd_addUnivAbstract(dd, self._node, cube._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def log(self):
         """Return the pointwise logarithm of this ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addMonadicApply(dd,
-                                                             ccudd.Cudd_addLog,
-                                                             self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addMonadicApply(dd,
+                                             ccudd.Cudd_addLog,
+                                             self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def findMin(self):
         """Return the constant ADD that is the minimum of this ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addMonadicApply(dd, ccudd.Cudd_addFindMin,
-                                                             self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addMonadicApply(dd, ccudd.Cudd_addFindMin,
+                                             self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def findMax(self):
         """Return the constant ADD that is the maximum of this ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addMonadicApply(dd, ccudd.Cudd_addFindMax,
-                                                             self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addMonadicApply(dd, ccudd.Cudd_addFindMax,
+                                             self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def ithBit(self, int bit):
         """Extract the i-th bit from this ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addIthBit(dd, self._node, bit)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addIthBit(dd, self._node, bit)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def compose(self, ADD other, int index):
         """Substitute a function for a variable in this ADD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addCompose(dd, self._node,
-                                                        other._node, index)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            with nogil:
+                res = ccudd.Cudd_addCompose(dd, self._node, other._node, index)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
     
 
     def vectorCompose(self, list vars, list vector):
         """ Composes an ADD with a vector of 0-1 ADDs."""
         cdef int ns = len(vars)
-        if len(vector) != ns:
-            raise TypeError("The number of functions should equal the number of variables")
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
-        if ns > size:
-            raise TypeError("More substitutions than existing ADD variables")
-        cdef ccudd.DdNode * * functions = <ccudd.DdNode * *> malloc(size * sizeof(ccudd.DdNode *))
-        if functions is NULL:
-            raise MemoryError("memory allocation failed")
-        # Here we rely on the fact that projection functions need no referencing.
-        for index in range(size):
-            functions[index] = ccudd.Cudd_addIthVar(dd, index)
-        for i in range(ns):
-            if not vars[i].isVar():
-                free(functions)
-                raise TypeError("Found a non-variable at position {0}".format(i))
-            functions[vars[i].index()] = (<BDD>vector[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_addVectorCompose(dd, self._node, functions)
-        free(functions)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdManager * dd
+        cdef int size
+        cdef ccudd.DdNode * * functions
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            if len(vector) != ns:
+                raise TypeError("The number of functions should equal the number of variables")
+            dd = <ccudd.DdManager *>self._mgr._manager
+            size = ccudd.Cudd_ReadSize(dd)
+            if ns > size:
+                raise TypeError("More substitutions than existing ADD variables")
+            functions = <ccudd.DdNode * *> malloc(size * sizeof(ccudd.DdNode *))
+            if functions is NULL:
+                raise MemoryError("memory allocation failed")
+            # Here we rely on the fact that projection functions need no referencing.
+            for index in range(size):
+                functions[index] = ccudd.Cudd_addIthVar(dd, index)
+            for i in range(ns):
+                if not vars[i].isVar():
+                    free(functions)
+                    raise TypeError("Found a non-variable at position {0}".format(i))
+                functions[vars[i].index()] = (<BDD>vector[i])._node
+            with nogil:
+                res = ccudd.Cudd_addVectorCompose(dd, self._node, functions)
+            free(functions)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
     
     def swapVariables(self, list current_vars, list new_vars):
         """Swap two lists of variables in this ADD."""
-        if len(current_vars) != len(new_vars):
-            raise TypeError("the two lists of variables should have the same length")
-        cdef int n = len(current_vars)
-        cdef ccudd.DdNode * * xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if xvars is NULL:
-            raise MemoryError("memory allocation failed")
-        cdef ccudd.DdNode * * yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
-        if yvars is NULL:
+        cdef int n
+        cdef ccudd.DdNode * * xvars
+        cdef ccudd.DdNode * * yvars
+        cdef ccudd.DdManager * dd
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            if len(current_vars) != len(new_vars):
+                raise TypeError("the two lists of variables should have the same length")
+            n = len(current_vars)
+            xvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if xvars is NULL:
+                raise MemoryError("memory allocation failed")
+            yvars = <ccudd.DdNode * *> malloc(n * sizeof(ccudd.DdNode *))
+            if yvars is NULL:
+                free(xvars)
+                raise MemoryError("memory allocation failed")
+            for i in range(n):
+                xvars[i] = (<ADD>current_vars[i])._node
+                yvars[i] = (<ADD>new_vars[i])._node
+            dd = <ccudd.DdManager *>self._mgr._manager
+            with nogil:
+                res = ccudd.Cudd_addSwapVariables(dd, self._node, xvars, yvars, n)
             free(xvars)
-            raise MemoryError("memory allocation failed")
-        for i in range(n):
-            xvars[i] = (<ADD>current_vars[i])._node
-            yvars[i] = (<ADD>new_vars[i])._node
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addSwapVariables(dd, self._node,
-                                                              xvars, yvars, n)
-        free(xvars)
-        free(yvars)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+            free(yvars)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def permute(self, permutation):
         """Return ADD with permuted variables."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadSize(dd)
-        if len(permutation) != size:
-            raise TypeError("length of permutation ({0}) different ".format(len(permutation))
-                            + "from number of variables ({0})".format(size))
-        cdef int * p = <int *> malloc(size * sizeof(int))
-        if p is NULL:
-            raise MemoryError("memory allocation failed")
-        for i in range(size):
-            v = permutation[i]
-            if not 0 <= v < size:
-                raise TypeError("{0} is not a valid variable index (not between 0 and {1})".format(v,size))
-            p[i] = v
-        cdef ccudd.DdNode * res = ccudd.Cudd_addPermute(dd, self._node, p)
-        free(p)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef int size
+        cdef int * p
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            size = ccudd.Cudd_ReadSize(dd)
+            if len(permutation) != size:
+                raise TypeError("length of permutation ({0}) different ".format(len(permutation))
+                                + "from number of variables ({0})".format(size))
+            p = <int *> malloc(size * sizeof(int))
+            if p is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(size):
+                v = permutation[i]
+                if not 0 <= v < size:
+                    raise TypeError("{0} is not a valid variable index (not between 0 and {1})".format(v,size))
+                p[i] = v
+            with nogil:
+                res = ccudd.Cudd_addPermute(dd, self._node, p)
+            free(p)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def constrain(self, ADD constraint):
         """Apply the 'constrain' generalized cofactor."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addConstrain(dd, self._node,
-                                                          constraint._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addConstrain(dd, self._node,
+                                          constraint._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def restrict(self, ADD constraint):
         """Apply the 'restrict' generalized cofactor."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addRestrict(dd, self._node,
-                                                         constraint._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addRestrict(dd, self._node,
+                                         constraint._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def bddPattern(self):
         """Return the conversion of this ADD to a BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addBddPattern(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addBddPattern(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def bddThreshold(self, value):
         """Return the conversion of this ADD to a BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addBddThreshold(dd, self._node,
-                                                             value)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addBddThreshold(dd, self._node,
+                                             value)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def bddStrictThreshold(self, value):
         """Return the conversion of this ADD to a BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addBddStrictThreshold(dd, self._node,
-                                                                   value)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addBddStrictThreshold(dd, self._node,
+                                                   value)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def bddInterval(self, lower, upper):
         """Return the conversion of this ADD to a BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_addBddInterval(dd, self._node,
-                                                            lower, upper)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_addBddInterval(dd, self._node,
+                                            lower, upper)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def matrixMultiply(self, ADD other, list zvars):
         """Multiply this ADD (interpreted as a matrix) by another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef int nz = len(zvars)
-        cdef ccudd.DdNode * * Z = <ccudd.DdNode * *> malloc(nz * sizeof(ccudd.DdNode *))
-        if Z is NULL:
-            raise MemoryError("memory allocation failed")
-        for i in range(nz):
-            Z[i] = (<ADD>zvars[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_addMatrixMultiply(dd, self._node,
-                                                               other._node,
-                                                               Z, nz)
-        free(Z)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * * Z
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            Z = <ccudd.DdNode * *> malloc(nz * sizeof(ccudd.DdNode *))
+            if Z is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(nz):
+                Z[i] = (<ADD>zvars[i])._node
+            with nogil:
+                res = ccudd.Cudd_addMatrixMultiply(dd, self._node, other._node, Z,
+                                                   nz)
+            free(Z)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def triangle(self, ADD other, list zvars):
         """Perform a triangulation step."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef int nz = len(zvars)
-        cdef ccudd.DdNode * * Z = <ccudd.DdNode * *> malloc(nz * sizeof(ccudd.DdNode *))
-        if Z is NULL:
-            raise MemoryError("memory allocation failed")
-        for i in range(nz):
-            Z[i] = (<ADD>zvars[i])._node
-        cdef ccudd.DdNode * res = ccudd.Cudd_addTriangle(dd, self._node,
-                                                         other._node, Z, nz)
-        free(Z)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeADD(self._mgr, res)
+        cdef ccudd.DdNode * * Z
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            Z = <ccudd.DdNode * *> malloc(nz * sizeof(ccudd.DdNode *))
+            if Z is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(nz):
+                Z[i] = (<ADD>zvars[i])._node
+            with nogil:
+                res = ccudd.Cudd_addTriangle(dd, self._node, other._node, Z, nz)
+            free(Z)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeADD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def equalSupNorm(self, ADD other, tolerance=1e-9, pr=0):
         """Test whether this ADD is close to another in the sup norm."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        return ccudd.Cudd_EqualSupNorm(dd, self._node, other._node, tolerance, pr)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_EqualSupNorm(dd, self._node, other._node, tolerance, pr)
+        finally:
+            ReleaseManager(self._mgr)
 
     def count_as_double(self, numVars=None):
         """Return the number of minterms as a double."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadSize(dd)
-        cdef double count = ccudd.Cudd_CountMinterm(dd, self._node, numVars)
-        if count == <double>ccudd.CUDD_OUT_OF_MEM:
-            raise MemoryError(self._mgr.readErrorCode())
-        return count
+        cdef int nvars
+        cdef double count
+        AcquireManager(self._mgr)
+        try:
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            nvars = numVars
+            with nogil:
+                count = ccudd.Cudd_CountMinterm(dd, self._node, nvars)
+            if count == <double>ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+            return count
+        finally:
+            ReleaseManager(self._mgr)
 
     def count(self, numVars=None):
         """Return the number of minterms as an unbounded int."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadSize(dd)
+        cdef int nvars
         cdef int digits
-        cdef ccudd.DdApaNumber apacount = ccudd.Cudd_ApaCountMinterm(dd, self._node, numVars, &digits)
-        if apacount is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        # Convert.
-        count = apacount[0]
-        for i in range(1,digits):
-            count <<= sizeof(ccudd.DdApaDigit) * 8
-            count += apacount[i]
-        ccudd.Cudd_FreeApaNumber(apacount)
-        return count
-
-
+        cdef ccudd.DdApaNumber apacount
+        AcquireManager(self._mgr)
+        try:
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadSize(dd)
+            nvars = numVars
+            with nogil:
+                apacount = ccudd.Cudd_ApaCountMinterm(dd, self._node, nvars, &digits)
+            if apacount is NULL:
+                raise ManagerError(self._mgr)
+            return ApaToInt(apacount, digits)
+        finally:
+            ReleaseManager(self._mgr)
+
+
+@cython.freelist(1024)
 cdef class ZDD:
     """Class of Zero-Suppressed Decision Diagrams."""
 
     cdef Cudd _mgr
     cdef ccudd.DdNode * _node
 
-    def __cinit__(self, manager):
+    def __cinit__(self, manager=None):
         """Create a ZDD."""
         self._mgr = manager
         self._node = NULL
@@ -2712,22 +5630,48 @@ cdef class ZDD:
         """Destroy a ZDD."""
         if self._node is not NULL:
             #print("destructor called")
-            ccudd.Cudd_RecursiveDerefZdd(<ccudd.DdManager *>self._mgr._manager,
-                                         self._node)
+            DerefNode(self._mgr, self._node, True)
 
     def generate_paths(self):
         """Generate the paths of this ZDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int size = ccudd.Cudd_ReadZddSize(dd)
+        cdef int size
         cdef int * path
-        cdef ccudd.DdGen * gen = ccudd.Cudd_zddFirstPath(dd, self._node,
-                                                         &path)
-        if gen is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
+        cdef ccudd.DdGen * gen
+        # The lock is not held while the caller consumes the paths.
+        AcquireManager(self._mgr)
+        try:
+            size = ccudd.Cudd_ReadZddSize(dd)
+            gen = ccudd.Cudd_zddFirstPath(dd, self._node, &path)
+            if gen is NULL:
+                raise ManagerError(self._mgr)
+        finally:
+            ReleaseManager(self._mgr)
         while not ccudd.Cudd_IsGenEmpty(gen):
             yield [path[i] for i in range(size)]
+            AcquireManager(self._mgr)
             ccudd.Cudd_zddNextPath(gen, &path)
+            ReleaseManager(self._mgr)
+        AcquireManager(self._mgr)
         ccudd.Cudd_GenFree(gen)
+        ReleaseManager(self._mgr)
+
+    def paths_array(self, chunk=65536, max_cubes=None, list vars=None):
+        """Generate the paths of this ZDD in chunks of int8 arrays."""
+        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
+        cdef int * path
+        cdef ccudd.DdGen * gen
+        AcquireManager(self._mgr)
+        try:
+            gen = ccudd.Cudd_zddFirstPath(dd, self._node,
+                                          &path)
+            if gen is NULL:
+                raise ManagerError(self._mgr)
+            return MakeCubeArrays(self._mgr, self, PATH_GEN, gen, path, 0,
+                                  ccudd.Cudd_ReadZddSize(dd), chunk, max_cubes,
+                                  vars)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __repr__(self):
         """Return the truth table of this ZDD as a string."""
@@ -2743,17 +5687,30 @@ cdef class ZDD:
         """Return hash code for a ZDD."""
         return int(<intptr_t> self._node)
 
+    def __reduce__(self):
+        """Pickle a ZDD as a reference into a shared node table."""
+        AcquireManager(self._mgr)
+        try:
+            return (_restoreDD, EncodeNodes(self._mgr, ZDD_TABLE, self._node))
+        finally:
+            ReleaseManager(self._mgr)
+
     def display(self, numVars=None, detail=2, name=None):
         """Display this ZDD."""
-        if name:
-            print(name, end='')
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadZddSize(dd)
-        if not ccudd.Cudd_zddPrintDebug(dd, self._node, numVars, detail):
-            raise MemoryError(self._mgr.readErrorCode())
-        fflush(stdout)
+        cdef ccudd.DdManager * dd
+        AcquireManager(self._mgr)
+        try:
+            if name:
+                print(name, end='')
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadZddSize(dd)
+            if not ccudd.Cudd_zddPrintDebug(dd, self._node, numVars, detail):
+                raise ManagerError(self._mgr)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self._mgr)
 
     def isOne(self, topIndex=0):
         """Test whether this ZDD is identically 1."""
@@ -2775,33 +5732,46 @@ cdef class ZDD:
 
     def size(self):
         """Return the size of this ZDD."""
-        return ccudd.Cudd_zddDagSize(self._node)
+        AcquireManager(self._mgr)
+        try:
+            return ccudd.Cudd_zddDagSize(self._node)
+        finally:
+            ReleaseManager(self._mgr)
 
     def support(self):
         """Compute the BDD of the variables in the support of this ZDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_zddSupport(dd, self._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_zddSupport(dd, self._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def compare(self, ZDD other, int op):
         """Compare this ZDD to another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if op == 2:   # ==
-            return self._node == other._node
-        elif op == 3: # !=
-            return self._node != other._node
-        elif op == 1: # <=
-            return ccudd.Cudd_zddDiffConst(dd, self._node, other._node) == ccudd.Cudd_ReadZero(dd)
-        elif op == 4: # >
-            return self._node != other._node and \
-                ccudd.Cudd_zddDiffConst(dd, other._node, self._node) == ccudd.Cudd_ReadZero(dd)
-        elif op == 0: # <
-            return self._node != other._node and \
-                ccudd.Cudd_zddDiffConst(dd, self._node, other._node) == ccudd.Cudd_ReadZero(dd)
-        else:         # >=
-            return ccudd.Cudd_zddDiffConst(dd, other._node, self._node) == ccudd.Cudd_ReadZero(dd)
+        AcquireManager(self._mgr)
+        try:
+            if op == 2:   # ==
+                return self._node == other._node
+            elif op == 3: # !=
+                return self._node != other._node
+            elif op == 1: # <=
+                return ccudd.Cudd_zddDiffConst(dd, self._node, other._node) == ccudd.Cudd_ReadZero(dd)
+            elif op == 4: # >
+                return self._node != other._node and \
+                    ccudd.Cudd_zddDiffConst(dd, other._node, self._node) == ccudd.Cudd_ReadZero(dd)
+            elif op == 0: # <
+                return self._node != other._node and \
+                    ccudd.Cudd_zddDiffConst(dd, self._node, other._node) == ccudd.Cudd_ReadZero(dd)
+            else:         # >=
+                return ccudd.Cudd_zddDiffConst(dd, other._node, self._node) == ccudd.Cudd_ReadZero(dd)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __richcmp__(self, other, op):
         """Compare this ZDD to another."""
@@ -2810,28 +5780,42 @@ cdef class ZDD:
     def ite(self, ZDD g, ZDD h):
         """Apply the if-then-else operation."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_zddIte(dd, self._node, g._node,
-                                                    h._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_zddIte(dd, self._node, g._node,
+                                    h._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def change(self, var):
         """Substitute var with its complement in this ZDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * res = ccudd.Cudd_zddChange(dd, self._node, var)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, res)
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_zddChange(dd, self._node, var)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def intsec(self, ZDD other):
         """Return the conjunction with another ZDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
         cdef ccudd.DdNode * res
-        res = ccudd.Cudd_zddIntersect(dd, self._node, other._node)
-        if res is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, res)
+        AcquireManager(self._mgr)
+        try:
+            res = ccudd.Cudd_zddIntersect(dd, self._node, other._node)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __and__(self, ZDD other):
         """Return the conjunction with another ZDD."""
@@ -2844,11 +5828,16 @@ cdef class ZDD:
     def union(self, ZDD other):
         """Return the disjunction with another ZDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * disj = ccudd.Cudd_zddUnion(dd, self._node,
-                                                       other._node)
-        if disj is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, disj)
+        cdef ccudd.DdNode * disj
+        AcquireManager(self._mgr)
+        try:
+            disj = ccudd.Cudd_zddUnion(dd, self._node,
+                                       other._node)
+            if disj is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, disj)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __or__(self, ZDD other):
         """Return the disjunction with another ZDD."""
@@ -2861,11 +5850,16 @@ cdef class ZDD:
     def diff(self, ZDD other):
         """Return the difference with another ZDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * diff = ccudd.Cudd_zddDiff(dd, self._node,
-                                                      other._node)
-        if diff is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, diff)
+        cdef ccudd.DdNode * diff
+        AcquireManager(self._mgr)
+        try:
+            diff = ccudd.Cudd_zddDiff(dd, self._node,
+                                      other._node)
+            if diff is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, diff)
+        finally:
+            ReleaseManager(self._mgr)
 
     def __invert__(self):
         """Return the negation of the ZDD."""
@@ -2892,102 +5886,2677 @@ cdef class ZDD:
     def subset0(self, var):
         """Return the subset with var=0."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * s0 = ccudd.Cudd_zddSubset0(dd, self._node, var)
-        if s0 is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, s0)
+        cdef ccudd.DdNode * s0
+        AcquireManager(self._mgr)
+        try:
+            s0 = ccudd.Cudd_zddSubset0(dd, self._node, var)
+            if s0 is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, s0)
+        finally:
+            ReleaseManager(self._mgr)
 
     def subset1(self, var):
         """Return the subset with var=1."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * s1 = ccudd.Cudd_zddSubset1(dd, self._node, var)
-        if s1 is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, s1)
+        cdef ccudd.DdNode * s1
+        AcquireManager(self._mgr)
+        try:
+            s1 = ccudd.Cudd_zddSubset1(dd, self._node, var)
+            if s1 is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, s1)
+        finally:
+            ReleaseManager(self._mgr)
 
     def toBDD(self, BDD cube=None):
         """Return the result of converting this ZDD to a BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef int bddsize = ccudd.Cudd_ReadSize(dd)
-        cdef int zddsize = ccudd.Cudd_ReadZddSize(dd)
-        if bddsize != zddsize:
-            raise TypeError("number of BDD variables ({0}) different ".format(bddsize)
-                            + "from number of ZDD variables ({0})".format(zddsize))
+        cdef int bddsize
+        cdef int zddsize
         cdef ccudd.DdNode * bdd
-        if cube is None:
-            bdd = ccudd.Cudd_zddPortToBdd(dd, self._node)
-        else:
-            bdd = ccudd.Cudd_zddPortToBddNegCof(dd, self._node, cube._node)
-        if bdd is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, bdd)
+        AcquireManager(self._mgr)
+        try:
+            bddsize = ccudd.Cudd_ReadSize(dd)
+            zddsize = ccudd.Cudd_ReadZddSize(dd)
+            if bddsize != zddsize:
+                raise TypeError("number of BDD variables ({0}) different ".format(bddsize)
+                                + "from number of ZDD variables ({0})".format(zddsize))
+            if cube is None:
+                bdd = ccudd.Cudd_zddPortToBdd(dd, self._node)
+            else:
+                bdd = ccudd.Cudd_zddPortToBddNegCof(dd, self._node, cube._node)
+            if bdd is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, bdd)
+        finally:
+            ReleaseManager(self._mgr)
 
     def product(self, ZDD other):
         """Return the product of this cover with another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * prod = ccudd.Cudd_zddProduct(dd, self._node,
-                                                         other._node)
-        if prod is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, prod)
+        cdef ccudd.DdNode * prod
+        AcquireManager(self._mgr)
+        try:
+            prod = ccudd.Cudd_zddProduct(dd, self._node,
+                                         other._node)
+            if prod is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, prod)
+        finally:
+            ReleaseManager(self._mgr)
 
     def unateProduct(self, ZDD other):
         """Return the product of this unate cover with another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * prod = ccudd.Cudd_zddUnateProduct(dd, self._node,
-                                                              other._node)
-        if prod is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, prod)
+        cdef ccudd.DdNode * prod
+        AcquireManager(self._mgr)
+        try:
+            prod = ccudd.Cudd_zddUnateProduct(dd, self._node,
+                                              other._node)
+            if prod is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, prod)
+        finally:
+            ReleaseManager(self._mgr)
 
     def weakDiv(self, ZDD other):
         """Divide this cover by another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * div = ccudd.Cudd_zddWeakDiv(dd, self._node,
-                                                        other._node)
-        if div is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, div)
+        cdef ccudd.DdNode * div
+        AcquireManager(self._mgr)
+        try:
+            div = ccudd.Cudd_zddWeakDiv(dd, self._node,
+                                        other._node)
+            if div is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, div)
+        finally:
+            ReleaseManager(self._mgr)
 
     def unateWeakDiv(self, ZDD other):
         """Divide this unate cover by another."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * div = ccudd.Cudd_zddDivide(dd, self._node,
-                                                       other._node)
-        if div is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, div)
+        cdef ccudd.DdNode * div
+        AcquireManager(self._mgr)
+        try:
+            div = ccudd.Cudd_zddDivide(dd, self._node,
+                                       other._node)
+            if div is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, div)
+        finally:
+            ReleaseManager(self._mgr)
 
     def complement(self):
         """Return the complement of this cover."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * compl = ccudd.Cudd_zddComplement(dd, self._node)
-        if compl is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeZDD(self._mgr, compl)
+        cdef ccudd.DdNode * compl
+        AcquireManager(self._mgr)
+        try:
+            compl = ccudd.Cudd_zddComplement(dd, self._node)
+            if compl is NULL:
+                raise ManagerError(self._mgr)
+            return MakeZDD(self._mgr, compl)
+        finally:
+            ReleaseManager(self._mgr)
 
     def makeBddFromCover(self):
         """Return the result of converting this cover to a BDD."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        cdef ccudd.DdNode * bdd = ccudd.Cudd_MakeBddFromZddCover(dd, self._node)
-        if bdd is NULL:
-            raise MemoryError(self._mgr.readErrorCode())
-        return MakeBDD(self._mgr, bdd)
+        cdef ccudd.DdNode * bdd
+        AcquireManager(self._mgr)
+        try:
+            bdd = ccudd.Cudd_MakeBddFromZddCover(dd, self._node)
+            if bdd is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, bdd)
+        finally:
+            ReleaseManager(self._mgr)
 
     def printCover(self):
         """Print the cover represented by this ZDD."""
-        sys.stdout.flush()
-        cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if not ccudd.Cudd_zddPrintCover(dd, self._node):
-            raise MemoryError(self._mgr.readErrorCode())
-        fflush(stdout)
+        cdef ccudd.DdManager * dd
+        AcquireManager(self._mgr)
+        try:
+            sys.stdout.flush()
+            dd = <ccudd.DdManager *>self._mgr._manager
+            if not ccudd.Cudd_zddPrintCover(dd, self._node):
+                raise ManagerError(self._mgr)
+            fflush(stdout)
+        finally:
+            ReleaseManager(self._mgr)
 
     def count_as_double(self, numVars=None):
         """Return the number of minterms as a double."""
         cdef ccudd.DdManager * dd = <ccudd.DdManager *>self._mgr._manager
-        if numVars is None:
-            numVars = ccudd.Cudd_ReadZddSize(dd)
-        cdef double count = ccudd.Cudd_zddCountMinterm(dd, self._node, numVars)
-        if count == <double>ccudd.CUDD_OUT_OF_MEM:
-            raise MemoryError(self._mgr.readErrorCode())
-        return count
\ No newline at end of file
+        cdef int nvars
+        cdef double count
+        AcquireManager(self._mgr)
+        try:
+            if numVars is None:
+                numVars = ccudd.Cudd_ReadZddSize(dd)
+            nvars = numVars
+            with nogil:
+                count = ccudd.Cudd_zddCountMinterm(dd, self._node, nvars)
+            if count == <double>ccudd.CUDD_OUT_OF_MEM:
+                raise ManagerError(self._mgr)
+            return count
+        finally:
+            ReleaseManager(self._mgr)
+
+cdef class NodeTable:
+    """Array of decision diagram nodes in topological order.
+
+    Node tables are the pickled form of BDDs, ADDs and ZDDs.  The
+    children of a node are either in the same table or in one of the
+    parent tables.  A table stays alive as long as a pickler holds it
+    in its memo: while it does, new tables for the same manager refer to
+    its nodes instead of encoding them again.  Therefore the nodes shared
+    by the decision diagrams pickled together are written only once.
+    """
+
+    cdef Cudd _mgr
+    cdef int _kind
+    cdef int _n
+    cdef ccudd.DdNode * * _nodes
+    cdef tuple _parents
+    cdef tuple _encoding
+    cdef object __weakref__
+
+    def __cinit__(self):
+        """Create an empty node table."""
+        self._n = 0
+        self._nodes = NULL
+
+    def __dealloc__(self):
+        """Destroy a node table."""
+        cdef int i
+        if self._nodes is NULL:
+            return
+        if self._encoding is not None:
+            tables = self._mgr._tables
+            for i in range(self._n):
+                key = (self._kind, <intptr_t>self._nodes[i])
+                entry = tables.get(key)
+                if entry is not None and entry[0]() is None:
+                    del tables[key]
+        for i in range(self._n):
+            DerefNode(self._mgr, self._nodes[i], self._kind == ZDD_TABLE)
+        free(self._nodes)
+
+    def __reduce__(self):
+        """Pickle a node table."""
+        return (_restoreNodeTable,
+                (self._mgr, self._kind, self._parents) + self._encoding)
+
+
+cdef LookupNode(dict tables, int kind, ccudd.DdNode * node):
+    """Return (table, position) of a node in a live table or None."""
+    key = (kind, <intptr_t>node)
+    entry = tables.get(key)
+    if entry is None:
+        return None
+    table = entry[0]()
+    if table is None:
+        del tables[key]
+        return None
+    return (table, entry[1])
+
+
+cdef tuple EncodeNodes(Cudd mgr, int kind, ccudd.DdNode * f):
+    """Return a node table and the reference of f in it."""
+    cdef ccudd.DdManager * dd = mgr._manager
+    cdef ccudd.DdNode * root = ccudd.Cudd_Regular(f)
+    cdef ccudd.DdNode * node
+    cdef ccudd.DdNode * child
+    cdef dict tables = mgr._tables
+    cdef int i
+    cdef int j
+    cdef int n
+    found = LookupNode(tables, kind, root)
+    if found is not None:
+        return (found[0], (found[1] << 1) | ccudd.Cudd_IsComplement(f))
+    # Nodes found in live tables become references to parent tables;
+    # the others are numbered in post-order.
+    cdef dict refs = {}
+    cdef list order = []
+    cdef list parents = []
+    cdef dict parentpos = {}
+    stack = [<intptr_t>root]
+    while stack:
+        addr = stack[-1]
+        if addr in refs:
+            stack.pop()
+            continue
+        node = <ccudd.DdNode *><intptr_t>addr
+        pending = False
+        if not ccudd.Cudd_IsConstant(node):
+            for j in range(2):
+                if j == 0:
+                    child = ccudd.Cudd_Regular(ccudd.Cudd_T(node))
+                else:
+                    child = ccudd.Cudd_Regular(ccudd.Cudd_E(node))
+                caddr = <intptr_t>child
+                if caddr in refs:
+                    continue
+                found = LookupNode(tables, kind, child)
+                if found is None:
+                    stack.append(caddr)
+                    pending = True
+                else:
+                    parent = found[0]
+                    if id(parent) not in parentpos:
+                        parents.append(parent)
+                        parentpos[id(parent)] = len(parents)
+                    refs[caddr] = (parentpos[id(parent)] << TABLE_SHIFT) | (found[1] << 1)
+        if not pending:
+            stack.pop()
+            refs[addr] = len(order) << 1
+            order.append(addr)
+    n = len(order)
+    variables = array('i', [0]) * n
+    thens = array('q', [0]) * n
+    elses = array('q', [0]) * n
+    values = array('d')
+    for i in range(n):
+        node = <ccudd.DdNode *><intptr_t>order[i]
+        if ccudd.Cudd_IsConstant(node):
+            variables[i] = -1
+            values.append(ccudd.Cudd_V(node))
+        else:
+            variables[i] = ccudd.Cudd_NodeReadIndex(node)
+            child = ccudd.Cudd_T(node)
+            thens[i] = refs[<intptr_t>ccudd.Cudd_Regular(child)] | ccudd.Cudd_IsComplement(child)
+            child = ccudd.Cudd_E(node)
+            elses[i] = refs[<intptr_t>ccudd.Cudd_Regular(child)] | ccudd.Cudd_IsComplement(child)
+    if sys.byteorder == 'big':
+        for a in (variables, thens, elses, values):
+            a.byteswap()
+    cdef NodeTable table = NodeTable.__new__(NodeTable)
+    table._mgr = mgr
+    table._kind = kind
+    table._parents = tuple(parents)
+    table._encoding = (variables.tobytes(), thens.tobytes(),
+                       elses.tobytes(), values.tobytes())
+    table._nodes = <ccudd.DdNode * *> malloc((n+1) * sizeof(ccudd.DdNode *))
+    if table._nodes is NULL:
+        raise MemoryError("memory allocation failed")
+    tref = weakref.ref(table)
+    for i in range(n):
+        node = <ccudd.DdNode *><intptr_t>order[i]
+        ccudd.Cudd_Ref(node)
+        table._nodes[i] = node
+        table._n = i + 1
+        tables[(kind, order[i])] = (tref, i)
+    return (table, refs[<intptr_t>root] | ccudd.Cudd_IsComplement(f))
+
+
+cdef ccudd.DdNode * ResolveNode(NodeTable table, long long ref) except NULL:
+    """Return the node of a reference relative to a table."""
+    cdef long long tidx = ref >> TABLE_SHIFT
+    cdef long long pos = (ref & ((<long long>1 << TABLE_SHIFT) - 1)) >> 1
+    cdef NodeTable src = table
+    if tidx > 0:
+        if tidx > len(table._parents):
+            raise ValueError("invalid node table reference")
+        src = table._parents[tidx-1]
+    if pos >= src._n:
+        raise ValueError("invalid node table reference")
+    cdef ccudd.DdNode * node = src._nodes[pos]
+    if ref & 1:
+        return ccudd.Cudd_Not(node)
+    return node
+
+
+def _restoreNodeTable(Cudd mgr, int kind, tuple parents, bytes variables,
+                      bytes thens, bytes elses, bytes values):
+    """Rebuild a pickled node table in the (unpickled) manager."""
+    cdef ccudd.DdManager * dd = mgr._manager
+    cdef ccudd.DdNode * node
+    cdef ccudd.DdNode * t
+    cdef ccudd.DdNode * e
+    cdef ccudd.DdNode * tmp
+    cdef int i
+    cdef int k = 0
+    cdef int[:] vv
+    cdef long long[:] tv
+    cdef long long[:] ev
+    cdef int n
+    cdef NodeTable table
+    AcquireManager(mgr)
+    try:
+        avariables = array('i', variables)
+        athens = array('q', thens)
+        aelses = array('q', elses)
+        avalues = array('d', values)
+        if sys.byteorder == 'big':
+            for a in (avariables, athens, aelses, avalues):
+                a.byteswap()
+        vv = avariables
+        tv = athens
+        ev = aelses
+        n = len(avariables)
+        if len(athens) != n or len(aelses) != n:
+            raise ValueError("inconsistent node table")
+        table = NodeTable.__new__(NodeTable)
+        table._mgr = mgr
+        table._kind = kind
+        table._parents = parents
+        table._encoding = None
+        table._nodes = <ccudd.DdNode * *> malloc((n+1) * sizeof(ccudd.DdNode *))
+        if table._nodes is NULL:
+            raise MemoryError("memory allocation failed")
+        for i in range(n):
+            if vv[i] < 0:
+                value = avalues[k]
+                k += 1
+                if kind == ADD_TABLE:
+                    node = ccudd.Cudd_addConst(dd, value)
+                elif kind == ZDD_TABLE and value == 0:
+                    node = ccudd.Cudd_ReadZero(dd)
+                else:
+                    node = ccudd.Cudd_ReadOne(dd)
+            elif kind == BDD_TABLE:
+                t = ResolveNode(table, tv[i])
+                e = ResolveNode(table, ev[i])
+                node = ccudd.Cudd_bddIte(dd, ccudd.Cudd_bddIthVar(dd, vv[i]), t, e)
+            else:
+                t = ResolveNode(table, tv[i])
+                e = ResolveNode(table, ev[i])
+                # An ADD node is an if-then-else on its variable; a ZDD node
+                # is the union of its else child with the then child
+                # extended by the node's variable.
+                if kind == ADD_TABLE:
+                    tmp = ccudd.Cudd_addIthVar(dd, vv[i])
+                else:
+                    tmp = ccudd.Cudd_zddChange(dd, t, vv[i])
+                if tmp is NULL:
+                    raise ManagerError(mgr)
+                ccudd.Cudd_Ref(tmp)
+                if kind == ADD_TABLE:
+                    node = ccudd.Cudd_addIte(dd, tmp, t, e)
+                else:
+                    node = ccudd.Cudd_zddUnion(dd, tmp, e)
+                # Reference the result before tmp, which it may be.
+                if node is not NULL:
+                    ccudd.Cudd_Ref(node)
+                if kind == ADD_TABLE:
+                    ccudd.Cudd_RecursiveDeref(dd, tmp)
+                else:
+                    ccudd.Cudd_RecursiveDerefZdd(dd, tmp)
+                if node is NULL:
+                    raise ManagerError(mgr)
+                table._nodes[i] = node
+                table._n = i + 1
+                continue
+            if node is NULL:
+                raise ManagerError(mgr)
+            ccudd.Cudd_Ref(node)
+            table._nodes[i] = node
+            table._n = i + 1
+        return table
+    finally:
+        ReleaseManager(mgr)
+
+
+def _portfolioWorker(bytes data, method, timeout):
+    """Reorder a pickled snapshot with one method for portfolio_reorder.
+
+    Return the shared size of the roots and the order by index.
+    """
+    cdef Cudd mgr
+    mgr, roots, record = pickle.loads(data)
+    RestoreOrder(mgr, record, False, False)
+    if timeout is not None:
+        mgr.setTimeLimit(mgr.readElapsedTime() + <unsigned long>(timeout * 1000))
+    try:
+        mgr.reduceHeap(method)
+    except (TimeoutError, MemoryError):
+        # The order reached when reordering stopped is still valid.
+        pass
+    nvars = ccudd.Cudd_ReadSize(mgr._manager)
+    return (mgr.sharingSize(roots),
+            [ccudd.Cudd_ReadInvPerm(mgr._manager, i) for i in range(nvars)])
+
+def _restoreDD(NodeTable table, long long ref):
+    """Return the unpickled decision diagram referenced in a table."""
+    cdef ccudd.DdNode * node
+    AcquireManager(table._mgr)
+    try:
+        node = ResolveNode(table, ref)
+        if table._kind == BDD_TABLE:
+            return MakeBDD(table._mgr, node)
+        elif table._kind == ADD_TABLE:
+            return MakeADD(table._mgr, node)
+        else:
+            return MakeZDD(table._mgr, node)
+    finally:
+        ReleaseManager(table._mgr)
+
+
+cdef class CubeArrays:
+    """Iterator over the cubes of a decision diagram in numpy arrays.
+
+    It fills each chunk directly from a CUDD generator, without
+    creating a Python object per cube.
+    """
+
+    cdef object _owner
+    cdef Cudd _mgr
+    cdef ccudd.DdGen * _gen
+    cdef int _kind
+    cdef int * _cube
+    cdef double _value
+    cdef Py_ssize_t _chunk
+    cdef Py_ssize_t _remaining
+    cdef int * _columns
+    cdef int _ncolumns
+    cdef bint _withValues
+
+    def __cinit__(self):
+        """Create an exhausted iterator."""
+        self._gen = NULL
+        self._columns = NULL
+
+    def __dealloc__(self):
+        """Release the generator and the column array."""
+        if self._gen is not NULL:
+            FreeGenerator(self._mgr, self._gen)
+        free(self._columns)
+
+    def __iter__(self):
+        """Return this iterator."""
+        return self
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def __next__(self):
+        """Return the next chunk of cubes."""
+        cdef Py_ssize_t k
+        cdef signed char[:, ::1] cv
+        cdef double[::1] vv
+        cdef Py_ssize_t row
+        cdef int j
+        AcquireManager(self._mgr)
+        try:
+            if self._gen is NULL:
+                raise StopIteration
+            if ccudd.Cudd_IsGenEmpty(self._gen) or self._remaining == 0:
+                ccudd.Cudd_GenFree(self._gen)
+                self._gen = NULL
+                raise StopIteration
+            import numpy
+            k = self._chunk
+            if 0 <= self._remaining < k:
+                k = self._remaining
+            cubes = numpy.empty((k, self._ncolumns), dtype=numpy.int8)
+            values = numpy.empty(k if self._withValues else 0, dtype=numpy.float64)
+            cv = cubes
+            vv = values
+            row = 0
+            while row < k and not ccudd.Cudd_IsGenEmpty(self._gen):
+                for j in range(self._ncolumns):
+                    cv[row, j] = self._cube[self._columns[j]]
+                if self._withValues:
+                    vv[row] = self._value
+                row += 1
+                if self._kind == CUBE_GEN:
+                    ccudd.Cudd_NextCube(self._gen, &self._cube, &self._value)
+                elif self._kind == PRIME_GEN:
+                    ccudd.Cudd_NextPrime(self._gen, &self._cube)
+                else:
+                    ccudd.Cudd_zddNextPath(self._gen, &self._cube)
+            if self._remaining > 0:
+                self._remaining -= row
+            if row < k:
+                cubes = cubes[:row]
+                values = values[:row]
+            if self._withValues:
+                return (cubes, values)
+            return cubes
+        finally:
+            ReleaseManager(self._mgr)
+
+
+cdef CubeArrays MakeCubeArrays(Cudd mgr, owner, int kind, ccudd.DdGen * gen,
+                               int * cube, double value, int size, chunk,
+                               max_cubes, list vars):
+    """Return an iterator over chunks of cubes taken from a generator.
+
+    The iterator owns the generator from now on, even if this function
+    raises an exception.
+    """
+    cdef CubeArrays chunks = CubeArrays.__new__(CubeArrays)
+    chunks._gen = gen
+    chunks._owner = owner
+    chunks._mgr = mgr
+    chunks._kind = kind
+    chunks._cube = cube
+    chunks._value = value
+    if chunk < 1:
+        raise ValueError("chunk size must be positive")
+    chunks._chunk = chunk
+    if max_cubes is None:
+        chunks._remaining = -1
+    elif max_cubes < 0:
+        raise ValueError("max_cubes must not be negative")
+    else:
+        chunks._remaining = max_cubes
+    if vars is None:
+        vars = list(range(size))
+    chunks._columns = <int *> malloc((len(vars)+1) * sizeof(int))
+    if chunks._columns is NULL:
+        raise MemoryError("memory allocation failed")
+    for j, index in enumerate(vars):
+        if not 0 <= index < size:
+            raise ValueError("variable index {0} out of range".format(index))
+        chunks._columns[j] = index
+    chunks._ncolumns = len(vars)
+    return chunks
+
+
+cdef class VariableMap:
+    """Exchange of two lists of BDD variables.
+
+    The map keeps the C arrays that swapVariables, permute, and
+    vectorCompose need, so that they are not rebuilt at each call.
+
+    >>> vmap = VariableMap(mgr, x, y)
+    >>> g = f.permute(vmap)
+    """
+
+    cdef Cudd _mgr
+    cdef list _vars
+    cdef int _n
+    cdef ccudd.DdNode * * _x
+    cdef ccudd.DdNode * * _y
+    cdef int _size
+    cdef int * _perm
+    cdef ccudd.DdNode * * _vector
+
+    def __cinit__(self):
+        """Initialize the arrays."""
+        self._n = 0
+        self._size = 0
+        self._x = NULL
+        self._y = NULL
+        self._perm = NULL
+        self._vector = NULL
+
+    def __dealloc__(self):
+        """Free the arrays."""
+        free(self._x)
+        free(self._y)
+        free(self._perm)
+        free(self._vector)
+
+    def __init__(self, Cudd mgr, list x, list y):
+        """Create the map that swaps the variables in x and y."""
+        cdef list xi
+        cdef list yi
+        AcquireManager(mgr)
+        try:
+            if len(x) != len(y):
+                raise TypeError("The two lists of variables should have the same length")
+            xi = VariableIndices(x)
+            yi = VariableIndices(y)
+            for v in x + y:
+                if (<BDD>v)._mgr is not mgr:
+                    raise ValueError("variable of a different manager")
+            self._mgr = mgr
+            # Projection functions need no referencing, but keep the objects.
+            self._vars = x + y
+            self._n = len(x)
+            self._x = <ccudd.DdNode * *> malloc((self._n+1) * sizeof(ccudd.DdNode *))
+            self._y = <ccudd.DdNode * *> malloc((self._n+1) * sizeof(ccudd.DdNode *))
+            if self._x is NULL or self._y is NULL:
+                raise MemoryError("memory allocation failed")
+            for i in range(self._n):
+                self._x[i] = (<BDD>x[i])._node
+                self._y[i] = (<BDD>y[i])._node
+            self._update()
+            for i, j in zip(xi, yi):
+                self._perm[i] = j
+                self._perm[j] = i
+                self._vector[i] = ccudd.Cudd_bddIthVar(mgr._manager, j)
+                self._vector[j] = ccudd.Cudd_bddIthVar(mgr._manager, i)
+        finally:
+            ReleaseManager(mgr)
+
+    def __len__(self):
+        """Return the number of pairs of variables in this map."""
+        return self._n
+
+    cdef int _update(self) except -1:
+        """Extend the permutation to variables created after the map."""
+        cdef ccudd.DdManager * dd = self._mgr._manager
+        cdef int size = ccudd.Cudd_ReadSize(dd)
+        if size <= self._size:
+            return 0
+        cdef int * perm = <int *> realloc(self._perm, size * sizeof(int))
+        if perm is NULL:
+            raise MemoryError("memory allocation failed")
+        self._perm = perm
+        cdef ccudd.DdNode * * vector = <ccudd.DdNode * *> realloc(
+            self._vector, size * sizeof(ccudd.DdNode *))
+        if vector is NULL:
+            raise MemoryError("memory allocation failed")
+        self._vector = vector
+        for i in range(self._size, size):
+            self._perm[i] = i
+            self._vector[i] = ccudd.Cudd_bddIthVar(dd, i)
+        self._size = size
+        return 0
+
+    cdef BDD apply(self, BDD f, int how):
+        """Apply this map to a BDD with one of the substitution methods."""
+        if f._mgr is not self._mgr:
+            raise ValueError("variable map of a different manager")
+        cdef ccudd.DdManager * dd = self._mgr._manager
+        cdef ccudd.DdNode * res
+        AcquireManager(self._mgr)
+        try:
+            self._update()
+            with nogil:
+                if how == MAP_SWAP:
+                    res = ccudd.Cudd_bddSwapVariables(dd, f._node, self._x,
+                                                      self._y, self._n)
+                elif how == MAP_PERMUTE:
+                    res = ccudd.Cudd_bddPermute(dd, f._node, self._perm)
+                else:
+                    res = ccudd.Cudd_bddVectorCompose(dd, f._node, self._vector)
+            if res is NULL:
+                raise ManagerError(self._mgr)
+            return MakeBDD(self._mgr, res)
+        finally:
+            ReleaseManager(self._mgr)
+
+
+cdef void HeapPush(HeapEntry * heap, int * n, HeapEntry entry) noexcept nogil:
+    """Insert an entry into a binary min-heap of n entries."""
+    cdef int i = n[0]
+    cdef int parent
+    n[0] += 1
+    while i > 0:
+        parent = (i - 1) // 2
+        if heap[parent].key <= entry.key:
+            break
+        heap[i] = heap[parent]
+        i = parent
+    heap[i] = entry
+
+cdef HeapEntry HeapPop(HeapEntry * heap, int * n) noexcept nogil:
+    """Remove and return the entry with the smallest key."""
+    cdef HeapEntry top = heap[0]
+    n[0] -= 1
+    cdef HeapEntry last = heap[n[0]]
+    cdef int i = 0
+    cdef int child
+    while 2 * i + 1 < n[0]:
+        child = 2 * i + 1
+        if child + 1 < n[0] and heap[child+1].key < heap[child].key:
+            child += 1
+        if last.key <= heap[child].key:
+            break
+        heap[i] = heap[child]
+        i = child
+    heap[i] = last
+    return top
+
+cdef long long HeapKey(ccudd.DdManager * dd, ccudd.DdNode * f, int strategy,
+                       long long * counter) nogil:
+    """Return the heap key of an operand of an n-ary conjunction."""
+    cdef int size
+    cdef int level
+    if strategy == CONJOIN_BALANCED:
+        counter[0] += 1
+        return counter[0]
+    size = ccudd.Cudd_DagSize(f)
+    if strategy == CONJOIN_SMALLEST_FIRST:
+        return size
+    size = ccudd.Cudd_ReadSize(dd)
+    if ccudd.Cudd_IsConstant(f):
+        level = size
+    else:
+        level = ccudd.Cudd_ReadPerm(dd, ccudd.Cudd_NodeReadIndex(f))
+    return (<long long>(size - level) << 32) | ccudd.Cudd_DagSize(f)
+
+cdef ccudd.DdNode * ConjoinHeap(ccudd.DdManager * dd, HeapEntry * entries,
+                                int n, int strategy, bint limited,
+                                unsigned int limit, int reorder,
+                                bint referenced) nogil:
+    """Conjoin the n nodes in entries and return the referenced result.
+
+    The entries array is used as the heap.  The nodes are referenced
+    first unless referenced is true; they are all dereferenced by the
+    time the function returns.  Return NULL on failure.
+    """
+    cdef ccudd.DdNode * zero = ccudd.Cudd_ReadLogicZero(dd)
+    cdef ccudd.DdNode * res
+    cdef HeapEntry a
+    cdef HeapEntry b
+    cdef long long counter = 0
+    cdef int size = 0
+    cdef int i
+    cdef int left
+    if not referenced:
+        for i in range(n):
+            ccudd.Cudd_Ref(entries[i].node)
+    for i in range(n):
+        a.node = entries[i].node
+        a.key = HeapKey(dd, a.node, strategy, &counter)
+        HeapPush(entries, &size, a)
+    if size == 0:
+        res = ccudd.Cudd_ReadOne(dd)
+        ccudd.Cudd_Ref(res)
+        return res
+    left = size // 2
+    while size > 1:
+        a = HeapPop(entries, &size)
+        b = HeapPop(entries, &size)
+        if limited:
+            res = ccudd.Cudd_bddAndLimit(dd, a.node, b.node, limit)
+        else:
+            res = ccudd.Cudd_bddAnd(dd, a.node, b.node)
+        if res is not NULL:
+            ccudd.Cudd_Ref(res)
+        ccudd.Cudd_RecursiveDeref(dd, a.node)
+        ccudd.Cudd_RecursiveDeref(dd, b.node)
+        if res is NULL or res == zero:
+            for i in range(size):
+                ccudd.Cudd_RecursiveDeref(dd, entries[i].node)
+            return res
+        a.node = res
+        a.key = HeapKey(dd, res, strategy, &counter)
+        HeapPush(entries, &size, a)
+        left -= 1
+        if left == 0:
+            if reorder >= 0 and size > 1:
+                if not ccudd.Cudd_ReduceHeap(
+                        dd, <ccudd.Cudd_ReorderingType> reorder, 0):
+                    for i in range(size):
+                        ccudd.Cudd_RecursiveDeref(dd, entries[i].node)
+                    return NULL
+                if strategy != CONJOIN_BALANCED:
+                    # Sizes and levels change with the order.
+                    n = size
+                    size = 0
+                    for i in range(n):
+                        a = entries[i]
+                        a.key = HeapKey(dd, a.node, strategy, &counter)
+                        HeapPush(entries, &size, a)
+            left = size // 2
+    return entries[0].node
+
+cdef BDD ConjoinAll(Cudd mgr, bdds, strategy, limit, reorder, bint disjoin):
+    """Return the conjunction or disjunction of an iterable of BDDs."""
+    strategies = {'balanced': CONJOIN_BALANCED,
+                  'smallest_first': CONJOIN_SMALLEST_FIRST,
+                  'support_affinity': CONJOIN_SUPPORT_AFFINITY}
+    if strategy not in strategies:
+        raise ValueError("unknown strategy ({0})".format(strategy))
+    cdef int cstrategy = strategies[strategy]
+    cdef bint limited = limit is not None
+    cdef unsigned int climit = limit if limited else 0
+    cdef int creorder = -1 if reorder is None else reorder
+    cdef ccudd.DdManager * dd = mgr._manager
+    cdef ccudd.DdNode * zero = ccudd.Cudd_ReadLogicZero(dd)
+    cdef ccudd.DdNode * one = ccudd.Cudd_ReadOne(dd)
+    cdef ccudd.DdNode * node
+    bdds = list(bdds)
+    cdef HeapEntry * entries = <HeapEntry *> malloc((len(bdds)+1) * sizeof(HeapEntry))
+    if entries is NULL:
+        raise MemoryError("memory allocation failed")
+    cdef int n = 0
+    for f in bdds:
+        if not isinstance(f, BDD):
+            free(entries)
+            raise TypeError("expected a BDD, got {0}".format(type(f).__name__))
+        if (<BDD>f)._mgr is not mgr:
+            free(entries)
+            raise ValueError("BDD of a different manager")
+        node = (<BDD>f)._node
+        if disjoin:
+            node = ccudd.Cudd_Not(node)
+        if node == zero:
+            free(entries)
+            return MakeBDD(mgr, ccudd.Cudd_NotCond(zero, disjoin))
+        if node != one:
+            entries[n].node = node
+            n += 1
+    cdef ccudd.DdNode * res
+    with nogil:
+        res = ConjoinHeap(dd, entries, n, cstrategy, limited, climit, creorder,
+                          False)
+    free(entries)
+    if res is NULL:
+        raise ManagerError(mgr)
+    cdef BDD result = MakeBDD(mgr, ccudd.Cudd_NotCond(res, disjoin))
+    ccudd.Cudd_RecursiveDeref(dd, res)
+    return result
+
+cdef ccudd.DdNode * DimacsAnd(DimacsReader * rd, ccudd.DdNode * f,
+                              ccudd.DdNode * g) noexcept nogil:
+    """Return the referenced conjunction of two referenced nodes.
+
+    Both arguments are dereferenced.  Return NULL on failure.
+    """
+    cdef ccudd.DdNode * res
+    if rd.limited:
+        res = ccudd.Cudd_bddAndLimit(rd.dd, f, g, rd.limit)
+    else:
+        res = ccudd.Cudd_bddAnd(rd.dd, f, g)
+    if res is not NULL:
+        ccudd.Cudd_Ref(res)
+    else:
+        rd.error = DIMACS_BDD
+    ccudd.Cudd_RecursiveDeref(rd.dd, f)
+    ccudd.Cudd_RecursiveDeref(rd.dd, g)
+    if res == ccudd.Cudd_ReadLogicZero(rd.dd):
+        rd.done = True
+    return res
+
+cdef int DimacsMerge(DimacsReader * rd, ccudd.DdNode * p) noexcept nogil:
+    """Add the referenced product of a window to the binary counter."""
+    cdef int k = 0
+    while rd.levels[k] is not NULL:
+        p = DimacsAnd(rd, rd.levels[k], p)
+        rd.levels[k] = NULL
+        if p is NULL:
+            return -1
+        k += 1
+    rd.levels[k] = p
+    return 0
+
+cdef int DimacsFlush(DimacsReader * rd) noexcept nogil:
+    """Conjoin the clauses in the window and merge their product."""
+    if rd.nwindow == 0:
+        return 0
+    cdef int n = rd.nwindow
+    rd.nwindow = 0
+    cdef ccudd.DdNode * p = ConjoinHeap(rd.dd, rd.window, n, rd.strategy,
+                                        rd.limited, rd.limit, -1, True)
+    if p is NULL:
+        rd.error = DIMACS_BDD
+        return -1
+    if p == ccudd.Cudd_ReadLogicZero(rd.dd):
+        rd.done = True
+    return DimacsMerge(rd, p)
+
+cdef int DimacsLiteral(DimacsReader * rd, long lit) noexcept nogil:
+    """Add a literal to the current clause."""
+    cdef long var = -lit if lit < 0 else lit
+    cdef long n
+    cdef int * index
+    cdef ccudd.DdNode * node
+    if var > 2147483647:
+        rd.error = DIMACS_SYNTAX
+        return -1
+    if var >= rd.nmapped:
+        n = max(2 * rd.nmapped, var + 1)
+        index = <int *> realloc(rd.index, n * sizeof(int))
+        if index is NULL:
+            rd.error = DIMACS_NOMEM
+            return -1
+        for i in range(rd.nmapped, n):
+            index[i] = -1
+        rd.index = index
+        rd.nmapped = n
+    if rd.index[var] < 0:
+        if rd.appearance:
+            node = ccudd.Cudd_bddNewVar(rd.dd)
+        else:
+            node = ccudd.Cudd_bddIthVar(rd.dd, var - 1)
+        if node is NULL:
+            rd.error = DIMACS_BDD
+            return -1
+        rd.index[var] = ccudd.Cudd_NodeReadIndex(node)
+    if rd.nlits == rd.litcap:
+        n = 2 * rd.litcap
+        rd.lits = <ccudd.DdNode * *> realloc(rd.lits, n * sizeof(ccudd.DdNode *))
+        rd.phase = <int *> realloc(rd.phase, n * sizeof(int))
+        if rd.lits is NULL or rd.phase is NULL:
+            rd.error = DIMACS_NOMEM
+            return -1
+        rd.litcap = n
+    rd.lits[rd.nlits] = ccudd.Cudd_bddIthVar(rd.dd, rd.index[var])
+    # A clause is the complement of the cube of its negated literals.
+    rd.phase[rd.nlits] = lit < 0
+    rd.nlits += 1
+    return 0
+
+cdef int DimacsClause(DimacsReader * rd) noexcept nogil:
+    """Turn the current clause into a BDD and add it to the product."""
+    if rd.nlits == 0:
+        return 0
+    cdef ccudd.DdNode * cube = ccudd.Cudd_bddComputeCube(rd.dd, rd.lits,
+                                                         rd.phase, rd.nlits)
+    rd.nlits = 0
+    if cube is NULL:
+        rd.error = DIMACS_BDD
+        return -1
+    cdef ccudd.DdNode * clause = ccudd.Cudd_Not(cube)
+    ccudd.Cudd_Ref(clause)
+    if rd.strategy < 0:
+        rd.acc = DimacsAnd(rd, rd.acc, clause)
+        return 0 if rd.acc is not NULL else -1
+    rd.window[rd.nwindow].node = clause
+    rd.nwindow += 1
+    if rd.nwindow == rd.windowSize:
+        return DimacsFlush(rd)
+    return 0
+
+cdef int DimacsFeed(DimacsReader * rd, const char * buf, Py_ssize_t n) noexcept nogil:
+    """Parse a chunk of DIMACS text.  Return -1 on failure."""
+    cdef Py_ssize_t i
+    cdef char c
+    for i in range(n):
+        if rd.done:
+            return 0
+        c = buf[i]
+        if rd.skipline:
+            if c == c'\n':
+                rd.skipline = False
+                rd.linestart = True
+                rd.line += 1
+            continue
+        if c == c' ' or c == c'\t' or c == c'\n' or c == c'\r':
+            if rd.innumber:
+                rd.innumber = False
+                if rd.value == 0:
+                    if rd.negative or DimacsClause(rd) < 0:
+                        rd.error = rd.error or DIMACS_SYNTAX
+                        return -1
+                elif DimacsLiteral(rd, -rd.value if rd.negative else rd.value) < 0:
+                    return -1
+            if c == c'\n':
+                rd.linestart = True
+                rd.line += 1
+            continue
+        if rd.linestart and (c == c'c' or c == c'p'):
+            rd.skipline = True
+            rd.linestart = False
+            continue
+        rd.linestart = False
+        if c == c'%' and not rd.innumber:
+            # SATLIB files end with a percent sign.
+            rd.done = True
+        elif c == c'-' and not rd.innumber:
+            rd.innumber = True
+            rd.negative = True
+            rd.value = 0
+        elif c'0' <= c <= c'9':
+            if not rd.innumber:
+                rd.innumber = True
+                rd.negative = False
+                rd.value = 0
+            rd.value = rd.value * 10 + (c - c'0')
+            if rd.value > 2147483647:
+                rd.error = DIMACS_SYNTAX
+                return -1
+        else:
+            rd.error = DIMACS_SYNTAX
+            return -1
+    return 0
+
+cdef ccudd.DdNode * DimacsFinish(DimacsReader * rd) noexcept nogil:
+    """Complete the last clause and return the referenced product."""
+    cdef ccudd.DdNode * res
+    if DimacsFeed(rd, b"\n", 1) < 0 or DimacsClause(rd) < 0:
+        return NULL
+    if rd.strategy < 0:
+        res = rd.acc
+        rd.acc = NULL
+        return res
+    if DimacsFlush(rd) < 0:
+        return NULL
+    res = ccudd.Cudd_ReadOne(rd.dd)
+    ccudd.Cudd_Ref(res)
+    for k in range(64):
+        if rd.levels[k] is not NULL:
+            res = DimacsAnd(rd, rd.levels[k], res)
+            rd.levels[k] = NULL
+            if res is NULL:
+                return NULL
+    return res
+
+cdef void DimacsFree(DimacsReader * rd) noexcept nogil:
+    """Release the nodes and the memory of a DIMACS reader."""
+    for i in range(rd.nwindow):
+        ccudd.Cudd_RecursiveDeref(rd.dd, rd.window[i].node)
+    for k in range(64):
+        if rd.levels[k] is not NULL:
+            ccudd.Cudd_RecursiveDeref(rd.dd, rd.levels[k])
+    if rd.acc is not NULL:
+        ccudd.Cudd_RecursiveDeref(rd.dd, rd.acc)
+    free(rd.index)
+    free(rd.lits)
+    free(rd.phase)
+    free(rd.window)
+
+cdef BDD LoadDimacs(Cudd mgr, source, order, strategy, limit, int window):
+    """Return the BDD of a CNF read from a DIMACS file."""
+    strategies = {'linear': -1,
+                  'balanced': CONJOIN_BALANCED,
+                  'smallest_first': CONJOIN_SMALLEST_FIRST,
+                  'support_affinity': CONJOIN_SUPPORT_AFFINITY}
+    if strategy not in strategies:
+        raise ValueError("unknown strategy ({0})".format(strategy))
+    if window < 1:
+        raise ValueError("window size should be positive")
+    if not isinstance(order, (list, tuple)) and order not in ('file', 'appearance'):
+        raise ValueError("unknown variable order ({0})".format(order))
+    cdef ccudd.DdManager * dd = mgr._manager
+    cdef int initial = ccudd.Cudd_ReadSize(dd)
+    cdef DimacsReader rd
+    memset(&rd, 0, sizeof(DimacsReader))
+    rd.dd = dd
+    rd.appearance = order != 'file'
+    rd.strategy = strategies[strategy]
+    rd.limited = limit is not None
+    rd.limit = limit if rd.limited else 0
+    rd.linestart = True
+    rd.line = 1
+    rd.litcap = 16
+    rd.windowSize = window
+    rd.lits = <ccudd.DdNode * *> malloc(rd.litcap * sizeof(ccudd.DdNode *))
+    rd.phase = <int *> malloc(rd.litcap * sizeof(int))
+    rd.window = <HeapEntry *> malloc(window * sizeof(HeapEntry))
+    if rd.strategy < 0:
+        rd.acc = ccudd.Cudd_ReadOne(dd)
+        ccudd.Cudd_Ref(rd.acc)
+    cdef FILE * fp = NULL
+    cdef char * buf = NULL
+    cdef const char * cbuf
+    cdef Py_ssize_t nread
+    cdef int ret = 0
+    cdef ccudd.DdNode * res = NULL
+    try:
+        if rd.lits is NULL or rd.phase is NULL or rd.window is NULL:
+            raise MemoryError("memory allocation failed")
+        if isinstance(order, (list, tuple)):
+            if len(set(order)) != len(order):
+                raise ValueError("repeated variable in order")
+            for var in order:
+                if var < 1:
+                    raise ValueError("invalid DIMACS variable ({0})".format(var))
+                if DimacsLiteral(&rd, var) < 0:
+                    raise ManagerError(mgr)
+            rd.nlits = 0
+        if hasattr(source, 'read'):
+            while not rd.done and ret == 0:
+                chunk = source.read(DIMACS_CHUNK)
+                if not chunk:
+                    break
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                cbuf = chunk
+                nread = len(chunk)
+                with nogil:
+                    ret = DimacsFeed(&rd, cbuf, nread)
+        else:
+            fp = fopen(str(source).encode('utf-8'), b'rb')
+            if fp is NULL:
+                raise IOError("cannot open {0}".format(source))
+            buf = <char *> malloc(DIMACS_CHUNK)
+            if buf is NULL:
+                raise MemoryError("memory allocation failed")
+            with nogil:
+                while not rd.done and ret == 0:
+                    nread = fread(buf, 1, DIMACS_CHUNK, fp)
+                    if nread == 0:
+                        break
+                    ret = DimacsFeed(&rd, buf, nread)
+            if ferror(fp):
+                raise IOError("cannot read {0}".format(source))
+        if ret == 0:
+            with nogil:
+                res = DimacsFinish(&rd)
+        if res is NULL:
+            if rd.error == DIMACS_SYNTAX:
+                raise ValueError("invalid DIMACS input at line {0}".format(rd.line))
+            elif rd.error == DIMACS_NOMEM:
+                raise MemoryError("memory allocation failed")
+            raise ManagerError(mgr)
+        result = MakeBDD(mgr, res)
+        ccudd.Cudd_RecursiveDeref(dd, res)
+    finally:
+        if fp is not NULL:
+            fclose(fp)
+        free(buf)
+        # Name the new variables after their DIMACS counterparts.
+        if rd.appearance:
+            for var in range(1, rd.nmapped):
+                if rd.index[var] >= initial and rd.index[var] not in mgr._varnames:
+                    mgr._varnames[rd.index[var]] = str(var)
+                    mgr._cnames.invalidate(rd.index[var])
+        else:
+            for index in range(initial, ccudd.Cudd_ReadSize(dd)):
+                if index not in mgr._varnames:
+                    mgr._varnames[index] = str(index + 1)
+                    mgr._cnames.invalidate(index)
+        DimacsFree(&rd)
+    return result
+
+cdef inline long long SaturatedAdd(long long a, long long b) noexcept nogil:
+    """Add b >= 0 to a, leaving the infinities (the extreme values) alone."""
+    if a == LLONG_MIN or a == LLONG_MAX:
+        return a
+    return a + b
+
+cdef ccudd.DdNode * LinearBuild(ccudd.DdManager * dd, LinearTerm * terms,
+                                long long * rest, LinearLevel * memo, int i,
+                                long long bound, long long * lo,
+                                long long * hi) noexcept nogil:
+    """Return the BDD of sum of the weights of terms i.. <= bound.
+
+    The weights are positive.  Following Abio et al., each BDD is
+    memoized with the interval of bounds for which it is the answer;
+    lo and hi are set to that interval.  The result is referenced by
+    the memo table, or is a constant; NULL means failure.
+    """
+    if bound < 0:
+        lo[0] = LLONG_MIN
+        hi[0] = -1
+        return ccudd.Cudd_ReadLogicZero(dd)
+    if bound >= rest[i]:
+        lo[0] = rest[i]
+        hi[0] = LLONG_MAX
+        return ccudd.Cudd_ReadOne(dd)
+    # Binary search for the interval that contains the bound.
+    cdef LinearLevel * level = &memo[i]
+    cdef int low = 0, high = level.n, mid
+    while low < high:
+        mid = (low + high) // 2
+        if level.items[mid].hi < bound:
+            low = mid + 1
+        else:
+            high = mid
+    if low < level.n and level.items[low].lo <= bound:
+        lo[0] = level.items[low].lo
+        hi[0] = level.items[low].hi
+        return level.items[low].node
+    cdef long long w = terms[i].weight
+    cdef long long lo0, hi0, lo1, hi1
+    cdef ccudd.DdNode * f0 = LinearBuild(dd, terms, rest, memo, i + 1, bound,
+                                         &lo0, &hi0)
+    if f0 is NULL:
+        return NULL
+    cdef ccudd.DdNode * f1 = LinearBuild(dd, terms, rest, memo, i + 1,
+                                         bound - w, &lo1, &hi1)
+    if f1 is NULL:
+        return NULL
+    lo[0] = max(lo0, SaturatedAdd(lo1, w))
+    hi[0] = min(hi0, SaturatedAdd(hi1, w))
+    cdef ccudd.DdNode * res
+    if f0 == f1:
+        res = f0
+    elif terms[i].negated:
+        res = ccudd.Cudd_bddIte(dd, terms[i].var, f0, f1)
+    else:
+        res = ccudd.Cudd_bddIte(dd, terms[i].var, f1, f0)
+    if res is NULL:
+        return NULL
+    cdef LinearInterval * items
+    if level.n == level.cap:
+        items = <LinearInterval *> realloc(
+            level.items, (2 * level.cap + 4) * sizeof(LinearInterval))
+        if items is NULL:
+            # Let CUDD free the result if it is new.
+            ccudd.Cudd_Ref(res)
+            ccudd.Cudd_RecursiveDeref(dd, res)
+            return NULL
+        level.items = items
+        level.cap = 2 * level.cap + 4
+    memmove(&level.items[low + 1], &level.items[low],
+            (level.n - low) * sizeof(LinearInterval))
+    level.items[low].lo = lo[0]
+    level.items[low].hi = hi[0]
+    level.items[low].node = res
+    level.n += 1
+    ccudd.Cudd_Ref(res)
+    return res
+
+cdef BDD LinearConstraint(Cudd mgr, list variables, list weights, lower, upper):
+    """Return the BDD of lower <= weighted sum of variables <= upper."""
+    cdef int n = len(variables)
+    if len(weights) != n:
+        raise TypeError("lists of variables and weights of different length")
+    cdef ccudd.DdManager * dd = mgr._manager
+    cdef ccudd.DdNode * node
+    # Normalize to positive weights over literals ordered by level.
+    terms = []
+    offset = 0
+    total = 0
+    for var, weight in zip(variables, weights):
+        if not isinstance(var, BDD):
+            raise TypeError("{0} is not a BDD".format(var))
+        node = (<BDD> var)._node
+        if not ccudd.Cudd_bddIsVar(dd, ccudd.Cudd_Regular(node)):
+            raise ValueError("{0} is not a literal".format(var))
+        weight = int(weight)
+        negated = ccudd.Cudd_IsComplement(node)
+        if weight < 0:
+            # w x = w + |w| (not x)
+            offset += weight
+            weight = -weight
+            negated = not negated
+        if weight == 0:
+            continue
+        total += weight
+        index = ccudd.Cudd_NodeReadIndex(node)
+        terms.append((ccudd.Cudd_ReadPerm(dd, index), index, weight, negated))
+    if total >= 2 ** 62:
+        raise OverflowError("sum of weights too large")
+    terms.sort()
+    n = len(terms)
+    cdef LinearTerm * cterms = <LinearTerm *> malloc((n + 1) * sizeof(LinearTerm))
+    cdef long long * rest = <long long *> malloc((n + 1) * sizeof(long long))
+    cdef LinearLevel * memo = <LinearLevel *> malloc((n + 1) * sizeof(LinearLevel))
+    if cterms is NULL or rest is NULL or memo is NULL:
+        free(cterms)
+        free(rest)
+        free(memo)
+        raise MemoryError("memory allocation failed")
+    memset(memo, 0, (n + 1) * sizeof(LinearLevel))
+    cdef int i, j
+    for i, (level, index, weight, negated) in enumerate(terms):
+        cterms[i].var = ccudd.Cudd_bddIthVar(dd, index)
+        cterms[i].weight = weight
+        cterms[i].negated = negated
+    rest[n] = 0
+    for i in range(n - 1, -1, -1):
+        rest[i] = rest[i + 1] + cterms[i].weight
+    # Clamp the bounds to the range of the sum.
+    cdef long long ub = total if upper is None else max(-1, min(total, upper - offset))
+    cdef long long lb = 0 if lower is None else max(0, min(total + 1, lower - offset))
+    cdef long long lo, hi
+    cdef ccudd.DdNode * fu = NULL
+    cdef ccudd.DdNode * fl = NULL
+    cdef ccudd.DdNode * res = NULL
+    with nogil:
+        fu = LinearBuild(dd, cterms, rest, memo, 0, ub, &lo, &hi)
+        if fu is not NULL:
+            fl = LinearBuild(dd, cterms, rest, memo, 0, lb - 1, &lo, &hi)
+        if fl is not NULL:
+            res = ccudd.Cudd_bddAnd(dd, fu, ccudd.Cudd_Not(fl))
+        if res is not NULL:
+            ccudd.Cudd_Ref(res)
+        for i in range(n):
+            for j in range(memo[i].n):
+                ccudd.Cudd_RecursiveDeref(dd, memo[i].items[j].node)
+            free(memo[i].items)
+    free(cterms)
+    free(rest)
+    free(memo)
+    if res is NULL:
+        raise ManagerError(mgr)
+    result = MakeBDD(mgr, res)
+    ccudd.Cudd_RecursiveDeref(dd, res)
+    return result
+
+cdef list ReadHypergraph(Hypergraph * h, edges):
+    """Fill a hypergraph from an iterable of edges and return its items.
+
+    Items are the absolute values of the edge entries, so that clauses
+    can be passed as they are; they are numbered in order of first
+    appearance.
+    """
+    cdef dict ids = {}
+    cdef list items = []
+    cdef list pins = []
+    cdef int npins = 0
+    for edge in edges:
+        pin = []
+        for lit in edge:
+            item = abs(lit)
+            lid = ids.get(item)
+            if lid is None:
+                lid = ids[item] = len(items)
+                items.append(item)
+            pin.append(lid)
+        pin = list(dict.fromkeys(pin))
+        npins += len(pin)
+        pins.append(pin)
+    h.nv = len(items)
+    h.ne = len(pins)
+    h.eptr = <int *> malloc((h.ne + 1) * sizeof(int))
+    h.epin = <int *> malloc((npins + 1) * sizeof(int))
+    h.vptr = <int *> malloc((h.nv + 1) * sizeof(int))
+    h.vedge = <int *> malloc((npins + 1) * sizeof(int))
+    if h.eptr is NULL or h.epin is NULL or h.vptr is NULL or h.vedge is NULL:
+        raise MemoryError("memory allocation failed")
+    cdef int i
+    cdef int k = 0
+    memset(h.vptr, 0, (h.nv + 1) * sizeof(int))
+    for i in range(h.ne):
+        h.eptr[i] = k
+        for lid in pins[i]:
+            h.epin[k] = lid
+            h.vptr[lid + 1] += 1
+            k += 1
+    h.eptr[h.ne] = k
+    for i in range(h.nv):
+        h.vptr[i + 1] += h.vptr[i]
+    cdef int * fill = h.vedge
+    cdef int v
+    for i in range(h.ne):
+        for k in range(h.eptr[i], h.eptr[i + 1]):
+            v = h.epin[k]
+            h.vedge[h.vptr[v]] = i
+            h.vptr[v] += 1
+    # Shift the vertex pointers back to the start of their ranges.
+    for v in range(h.nv, 0, -1):
+        h.vptr[v] = h.vptr[v - 1]
+    h.vptr[0] = 0
+    return items
+
+cdef void HypergraphFree(Hypergraph * h) noexcept nogil:
+    free(h.eptr)
+    free(h.epin)
+    free(h.vptr)
+    free(h.vedge)
+
+cdef int CompareKeys(const void * a, const void * b) noexcept nogil:
+    cdef const SortKey * x = <const SortKey *> a
+    cdef const SortKey * y = <const SortKey *> b
+    if x.key != y.key:
+        return -1 if x.key < y.key else 1
+    return x.tie - y.tie
+
+cdef long long OrderSpan(Hypergraph * h, int * rank) noexcept nogil:
+    """Return the sum over all edges of the distance of their extreme pins."""
+    cdef long long span = 0
+    cdef int e, k, lo, hi
+    for e in range(h.ne):
+        if h.eptr[e] == h.eptr[e + 1]:
+            continue
+        lo = hi = rank[h.epin[h.eptr[e]]]
+        for k in range(h.eptr[e] + 1, h.eptr[e + 1]):
+            lo = min(lo, rank[h.epin[k]])
+            hi = max(hi, rank[h.epin[k]])
+        span += hi - lo
+    return span
+
+cdef int ForceOrder(Hypergraph * h, int * order, int iterations) noexcept nogil:
+    """Improve an order of the vertices with the FORCE heuristic.
+
+    Each edge is placed at the center of gravity of its pins, and each
+    vertex is moved to the average position of its edges.  The order
+    with the smallest total span of the edges is kept; the iterations
+    stop when it has not improved for a few of them.  Return 1 on
+    success and 0 otherwise.
+    """
+    cdef int * rank = <int *> malloc((h.nv + 1) * sizeof(int))
+    cdef double * cog = <double *> malloc((h.ne + 1) * sizeof(double))
+    cdef SortKey * keys = <SortKey *> malloc((h.nv + 1) * sizeof(SortKey))
+    if rank is NULL or cog is NULL or keys is NULL:
+        free(rank)
+        free(cog)
+        free(keys)
+        return 0
+    cdef int i, e, k, v
+    cdef double total
+    for i in range(h.nv):
+        rank[order[i]] = i
+    cdef long long best = OrderSpan(h, rank)
+    cdef long long span
+    cdef int it
+    cdef int stale = 0
+    for it in range(iterations):
+        for e in range(h.ne):
+            total = 0.0
+            for k in range(h.eptr[e], h.eptr[e + 1]):
+                total += rank[h.epin[k]]
+            if h.eptr[e + 1] > h.eptr[e]:
+                cog[e] = total / (h.eptr[e + 1] - h.eptr[e])
+        for v in range(h.nv):
+            keys[v].item = v
+            keys[v].tie = rank[v]
+            if h.vptr[v + 1] == h.vptr[v]:
+                keys[v].key = rank[v]
+                continue
+            total = 0.0
+            for k in range(h.vptr[v], h.vptr[v + 1]):
+                total += cog[h.vedge[k]]
+            keys[v].key = total / (h.vptr[v + 1] - h.vptr[v])
+        qsort(keys, h.nv, sizeof(SortKey), CompareKeys)
+        for i in range(h.nv):
+            rank[keys[i].item] = i
+        span = OrderSpan(h, rank)
+        if span < best:
+            best = span
+            stale = 0
+            for i in range(h.nv):
+                order[i] = keys[i].item
+        else:
+            stale += 1
+            if stale == FORCE_PATIENCE:
+                break
+    free(rank)
+    free(cog)
+    free(keys)
+    return 1
+
+cdef int BisectionGain(Bisection * b, int v) noexcept nogil:
+    """Return the decrease in cut edges if v changes side."""
+    cdef Hypergraph * h = b.h
+    cdef int s = b.side[v]
+    cdef int t = 1 - s
+    cdef int g = 0
+    cdef int e, k
+    for k in range(h.vptr[v], h.vptr[v + 1]):
+        e = h.vedge[k]
+        if b.cnt[2*e+s] == 1 and b.cnt[2*e+t] > 0:
+            g += 1
+        elif b.cnt[2*e+s] > 1 and b.cnt[2*e+t] == 0:
+            g -= 1
+    return g
+
+cdef void BisectionPush(Bisection * b, int v) noexcept nogil:
+    """Queue v with its current gain; stale entries are skipped later."""
+    cdef int s = b.side[v]
+    cdef HeapEntry * heap
+    if b.hsize[s] == b.hcap[s]:
+        heap = <HeapEntry *> realloc(b.heap[s], 2 * b.hcap[s] * sizeof(HeapEntry))
+        if heap is NULL:
+            b.failed = True
+            return
+        b.heap[s] = heap
+        b.hcap[s] *= 2
+    cdef HeapEntry entry
+    entry.key = -(<long long> b.gain[v]) * 4294967296LL + v
+    entry.node = NULL
+    HeapPush(b.heap[s], &b.hsize[s], entry)
+
+cdef int BisectionTop(Bisection * b, int s) noexcept nogil:
+    """Return the unlocked vertex of side s with the largest gain, or -1."""
+    cdef long long key
+    cdef int v
+    while b.hsize[s] > 0:
+        key = b.heap[s][0].key
+        v = <int> (key & 0xffffffffLL)
+        if not b.locked[v] and b.side[v] == s and \
+           -(key - v) // 4294967296LL == b.gain[v]:
+            return v
+        HeapPop(b.heap[s], &b.hsize[s])
+    return -1
+
+cdef void BisectionMove(Bisection * b, int v) noexcept nogil:
+    cdef Hypergraph * h = b.h
+    cdef int s = b.side[v]
+    cdef int k, e
+    for k in range(h.vptr[v], h.vptr[v + 1]):
+        e = h.vedge[k]
+        b.cnt[2*e+s] -= 1
+        b.cnt[2*e+1-s] += 1
+    b.side[v] = 1 - s
+
+cdef int BisectionPass(Bisection * b, int * verts, int n, int * size) noexcept nogil:
+    """Run one Fiduccia-Mattheyses pass and return the cut reduction."""
+    cdef Hypergraph * h = b.h
+    cdef int lo = max(1, <int> (n * (1.0 - b.tolerance) / 2))
+    cdef int i, k, j, e, v, u, s, g, best_v
+    cdef int nmoves = 0, bestn = 0, cum = 0, best = 0
+    b.hsize[0] = b.hsize[1] = 0
+    for i in range(n):
+        v = verts[i]
+        b.gain[v] = BisectionGain(b, v)
+        BisectionPush(b, v)
+    while not b.failed:
+        best_v = -1
+        for s in range(2):
+            if size[s] - 1 < lo:
+                continue
+            v = BisectionTop(b, s)
+            if v >= 0 and (best_v < 0 or b.gain[v] > b.gain[best_v]):
+                best_v = v
+        if best_v < 0:
+            break
+        v = best_v
+        s = b.side[v]
+        cum += b.gain[v]
+        b.locked[v] = True
+        BisectionMove(b, v)
+        size[s] -= 1
+        size[1-s] += 1
+        b.moves[nmoves] = v
+        nmoves += 1
+        if cum > best:
+            best = cum
+            bestn = nmoves
+        for k in range(h.vptr[v], h.vptr[v + 1]):
+            e = h.vedge[k]
+            for j in range(h.eptr[e], h.eptr[e + 1]):
+                u = h.epin[j]
+                if b.side[u] < 0 or b.locked[u]:
+                    continue
+                g = BisectionGain(b, u)
+                if g != b.gain[u]:
+                    b.gain[u] = g
+                    BisectionPush(b, u)
+    # Undo the moves past the best prefix.
+    for i in range(nmoves - 1, bestn - 1, -1):
+        v = b.moves[i]
+        s = b.side[v]
+        BisectionMove(b, v)
+        size[s] -= 1
+        size[1-s] += 1
+    for i in range(n):
+        b.locked[verts[i]] = False
+    return best
+
+cdef void Bisect(Bisection * b, int * verts, int n) noexcept nogil:
+    """Order a set of vertices by recursive min-cut bisection."""
+    if n <= 2 or b.failed:
+        return
+    cdef Hypergraph * h = b.h
+    cdef int i, k, e, v
+    cdef int size[2]
+    cdef int half = n // 2
+    for i in range(n):
+        v = verts[i]
+        b.side[v] = 0 if i < half else 1
+        for k in range(h.vptr[v], h.vptr[v + 1]):
+            e = h.vedge[k]
+            b.cnt[2*e] = b.cnt[2*e+1] = 0
+    for i in range(n):
+        v = verts[i]
+        for k in range(h.vptr[v], h.vptr[v + 1]):
+            b.cnt[2*h.vedge[k]+b.side[v]] += 1
+    size[0] = half
+    size[1] = n - half
+    cdef int it
+    for it in range(b.passes):
+        if BisectionPass(b, verts, n, size) <= 0 or b.failed:
+            break
+    # Stable partition: the vertices of side 0 come first.
+    cdef int m = 0
+    for i in range(n):
+        if b.side[verts[i]] == 0:
+            b.buffer[m] = verts[i]
+            m += 1
+    for i in range(n):
+        if b.side[verts[i]] == 1:
+            b.buffer[m] = verts[i]
+            m += 1
+    for i in range(n):
+        verts[i] = b.buffer[i]
+        b.side[verts[i]] = -1
+    Bisect(b, verts, size[0])
+    Bisect(b, verts + size[0], size[1])
+
+cdef int MinceOrder(Hypergraph * h, int * order, double tolerance,
+                    int passes) noexcept nogil:
+    """Reorder the vertices by recursive bisection.  Return 1 on success."""
+    cdef Bisection b
+    memset(&b, 0, sizeof(Bisection))
+    b.h = h
+    b.tolerance = tolerance
+    b.passes = passes
+    b.side = <signed char *> malloc(h.nv + 1)
+    b.locked = <char *> malloc(h.nv + 1)
+    b.cnt = <int *> malloc((2 * h.ne + 1) * sizeof(int))
+    b.gain = <int *> malloc((h.nv + 1) * sizeof(int))
+    b.moves = <int *> malloc((h.nv + 1) * sizeof(int))
+    b.buffer = <int *> malloc((h.nv + 1) * sizeof(int))
+    b.hcap[0] = b.hcap[1] = h.nv + 16
+    b.heap[0] = <HeapEntry *> malloc(b.hcap[0] * sizeof(HeapEntry))
+    b.heap[1] = <HeapEntry *> malloc(b.hcap[1] * sizeof(HeapEntry))
+    b.failed = b.side is NULL or b.locked is NULL or b.cnt is NULL or \
+        b.gain is NULL or b.moves is NULL or b.buffer is NULL or \
+        b.heap[0] is NULL or b.heap[1] is NULL
+    if not b.failed:
+        memset(b.side, -1, h.nv + 1)
+        memset(b.locked, 0, h.nv + 1)
+        Bisect(&b, order, h.nv)
+    free(b.side)
+    free(b.locked)
+    free(b.cnt)
+    free(b.gain)
+    free(b.moves)
+    free(b.buffer)
+    free(b.heap[0])
+    free(b.heap[1])
+    return not b.failed
+
+cdef int BltOrder(Hypergraph * h, int * rperm, int * cperm) noexcept nogil:
+    """Order the edges and vertices towards block lower-triangular form.
+
+    Edges are the rows and vertices the columns of the dependence
+    matrix.  Return 1 on success and 0 otherwise.
+    """
+    cdef char * ractive = <char *> malloc(h.ne + 1)
+    cdef char * cactive = <char *> malloc(h.nv + 1)
+    cdef int * rcount = <int *> malloc((h.ne + 1) * sizeof(int))
+    cdef int * ccount = <int *> malloc((h.nv + 1) * sizeof(int))
+    cdef int * tally = <int *> malloc((h.nv + 1) * sizeof(int))
+    cdef int * minrows = <int *> malloc((h.ne + 1) * sizeof(int))
+    if ractive is NULL or cactive is NULL or rcount is NULL or \
+       ccount is NULL or tally is NULL or minrows is NULL:
+        free(ractive)
+        free(cactive)
+        free(rcount)
+        free(ccount)
+        free(tally)
+        free(minrows)
+        return 0
+    cdef int nr = 0, nc = 0
+    cdef int i, j, k, lmin, nmin, maxint, maxcol
+    memset(ractive, 1, h.ne + 1)
+    memset(cactive, 1, h.nv + 1)
+    memset(tally, 0, (h.nv + 1) * sizeof(int))
+    for i in range(h.ne):
+        rcount[i] = h.eptr[i + 1] - h.eptr[i]
+    for j in range(h.nv):
+        ccount[j] = h.vptr[j + 1] - h.vptr[j]
+    # Singleton rows go to the top and their columns to the left.
+    for i in range(h.ne):
+        if h.eptr[i + 1] - h.eptr[i] == 1:
+            BltRow(h, i, ractive, ccount, rperm, &nr)
+            j = h.epin[h.eptr[i]]
+            if cactive[j]:
+                BltColumn(h, j, cactive, ractive, rcount, cperm, &nc)
+    # Columns without active rows and rows without active columns.
+    for j in range(h.nv):
+        if cactive[j] and ccount[j] == 0:
+            BltColumn(h, j, cactive, ractive, rcount, cperm, &nc)
+    for i in range(h.ne):
+        if ractive[i] and rcount[i] == 0:
+            BltRow(h, i, ractive, ccount, rperm, &nr)
+    while nr < h.ne and nc < h.nv:
+        # Shortest active rows.
+        lmin = h.nv + 1
+        nmin = 0
+        for i in range(h.ne):
+            if not ractive[i] or rcount[i] > lmin:
+                continue
+            if rcount[i] < lmin:
+                lmin = rcount[i]
+                nmin = 0
+            minrows[nmin] = i
+            nmin += 1
+        # Column with the most intersections with the shortest rows.
+        for k in range(nmin):
+            i = minrows[k]
+            for j in range(h.eptr[i], h.eptr[i + 1]):
+                tally[h.epin[j]] += 1
+        maxint = -1
+        maxcol = -1
+        for j in range(h.nv):
+            if cactive[j] and tally[j] > maxint:
+                maxint = tally[j]
+                maxcol = j
+        for k in range(nmin):
+            i = minrows[k]
+            for j in range(h.eptr[i], h.eptr[i + 1]):
+                tally[h.epin[j]] = 0
+        BltColumn(h, maxcol, cactive, ractive, rcount, cperm, &nc)
+        if lmin == 1:
+            for k in range(nmin):
+                if rcount[minrows[k]] == 0:
+                    BltRow(h, minrows[k], ractive, ccount, rperm, &nr)
+    # Endgame.
+    for i in range(h.ne):
+        if ractive[i]:
+            rperm[nr] = i
+            nr += 1
+    for j in range(h.nv):
+        if cactive[j]:
+            cperm[nc] = j
+            nc += 1
+    free(ractive)
+    free(cactive)
+    free(rcount)
+    free(ccount)
+    free(tally)
+    free(minrows)
+    return 1
+
+cdef void BltRow(Hypergraph * h, int i, char * ractive, int * ccount,
+                 int * rperm, int * nr) noexcept nogil:
+    cdef int k
+    ractive[i] = False
+    rperm[nr[0]] = i
+    nr[0] += 1
+    for k in range(h.eptr[i], h.eptr[i + 1]):
+        ccount[h.epin[k]] -= 1
+
+cdef void BltColumn(Hypergraph * h, int j, char * cactive, char * ractive,
+                    int * rcount, int * cperm, int * nc) noexcept nogil:
+    cdef int k
+    cactive[j] = False
+    cperm[nc[0]] = j
+    nc[0] += 1
+    for k in range(h.vptr[j], h.vptr[j + 1]):
+        if ractive[h.vedge[k]]:
+            rcount[h.vedge[k]] -= 1
+
+def force_order(edges, int iterations=100):
+    """Return a static variable order computed with the FORCE heuristic.
+
+    The edges are iterables of variables, for instance the clauses of
+    a CNF or the supports of the nodes of a netlist; literals are
+    replaced by their variables.  The result lists the variables in
+    order, starting from their order of appearance.  It can be passed
+    to Cudd.from_dimacs or turned into a permutation for
+    Cudd.shuffleHeap before the BDDs are built.
+    """
+    cdef Hypergraph h
+    memset(&h, 0, sizeof(Hypergraph))
+    cdef int * order = NULL
+    cdef int ret
+    try:
+        items = ReadHypergraph(&h, edges)
+        order = <int *> malloc((h.nv + 1) * sizeof(int))
+        if order is NULL:
+            raise MemoryError("memory allocation failed")
+        for i in range(h.nv):
+            order[i] = i
+        with nogil:
+            ret = ForceOrder(&h, order, iterations)
+        if not ret:
+            raise MemoryError("memory allocation failed")
+        result = [items[order[i]] for i in range(h.nv)]
+    finally:
+        free(order)
+        HypergraphFree(&h)
+    return result
+
+def mince_order(edges, double tolerance=0.1, int passes=4):
+    """Return a static variable order computed by recursive bisection.
+
+    Following MINCE, the hypergraph of the edges is split in two halves
+    with few edges across them, and each half is ordered recursively.
+    Each bisection is refined with Fiduccia-Mattheyses passes that keep
+    the halves within the given relative tolerance of each other.  The
+    edges are as in force_order, and so is the result.
+    """
+    if not 0.0 <= tolerance < 1.0:
+        raise ValueError("tolerance should be between 0 and 1")
+    cdef Hypergraph h
+    memset(&h, 0, sizeof(Hypergraph))
+    cdef int * order = NULL
+    cdef int ret
+    try:
+        items = ReadHypergraph(&h, edges)
+        order = <int *> malloc((h.nv + 1) * sizeof(int))
+        if order is NULL:
+            raise MemoryError("memory allocation failed")
+        for i in range(h.nv):
+            order[i] = i
+        with nogil:
+            ret = MinceOrder(&h, order, tolerance, passes)
+        if not ret:
+            raise MemoryError("memory allocation failed")
+        result = [items[order[i]] for i in range(h.nv)]
+    finally:
+        free(order)
+        HypergraphFree(&h)
+    return result
+
+def blt_order(edges):
+    """Return edge and variable orders for block lower-triangular form.
+
+    The edges are the rows and the variables the columns of a Boolean
+    dependence matrix.  The result is a pair: the indices of the edges
+    in the order in which they should be conjoined, and the variables
+    in order, as in force_order.
+    """
+    cdef Hypergraph h
+    memset(&h, 0, sizeof(Hypergraph))
+    cdef int * rperm = NULL
+    cdef int * cperm = NULL
+    cdef int ret
+    try:
+        items = ReadHypergraph(&h, edges)
+        rperm = <int *> malloc((h.ne + 1) * sizeof(int))
+        cperm = <int *> malloc((h.nv + 1) * sizeof(int))
+        if rperm is NULL or cperm is NULL:
+            raise MemoryError("memory allocation failed")
+        with nogil:
+            ret = BltOrder(&h, rperm, cperm)
+        if not ret:
+            raise MemoryError("memory allocation failed")
+        result = ([rperm[i] for i in range(h.ne)],
+                  [items[cperm[j]] for j in range(h.nv)])
+    finally:
+        free(rperm)
+        free(cperm)
+        HypergraphFree(&h)
+    return result
+
+cdef BDD IndicesCube(Cudd mgr, indices):
+    """Return the cube of the BDD variables with the given indices."""
+    cdef int n = len(indices)
+    cdef int * array = <int *> malloc((n+1) * sizeof(int))
+    if array is NULL:
+        raise MemoryError("memory allocation failed")
+    for i, index in enumerate(indices):
+        array[i] = index
+    cdef ccudd.DdNode * res
+    AcquireManager(mgr)
+    try:
+        res = ccudd.Cudd_IndicesToCube(mgr._manager, array, n)
+        free(array)
+        if res is NULL:
+            raise ManagerError(mgr)
+        return MakeBDD(mgr, res)
+    finally:
+        ReleaseManager(mgr)
+
+
+cdef list VariableIndices(list variables):
+    """Return the indices of a list of BDD variables."""
+    for i, v in enumerate(variables):
+        if not isinstance(v, BDD) or not v.isVar():
+            raise TypeError("Found a non-variable at position {0}".format(i))
+    return [v.index() for v in variables]
+
+
+cdef list OrderPartitions(list parts, set quantifiable, set introduced):
+    """Order conjuncts for early quantification (IWLS95 heuristic).
+
+    At each step pick the conjunct with the highest ratio of variables
+    that can be quantified right after it to quantifiable variables in
+    its support, penalized by the fraction of new variables that it
+    introduces.  Ties go to the smallest BDD.
+    """
+    cdef list remaining = [(f, set(f.supportIndices())) for f in parts]
+    cdef list order = []
+    cdef set seen = set()
+    while remaining:
+        occurrences = {}
+        for f, support in remaining:
+            for v in support & quantifiable:
+                occurrences[v] = occurrences.get(v, 0) + 1
+        best = None
+        for position, (f, support) in enumerate(remaining):
+            q = support & quantifiable
+            alone = sum(1 for v in q if occurrences[v] == 1)
+            new = len((support & introduced) - seen)
+            score = ((alone + 1.0) / (len(q) + 1.0) -
+                     new / (len(introduced) + 1.0))
+            key = (score, -f.size())
+            if best is None or key > best[0]:
+                best = (key, position)
+        f, support = remaining.pop(best[1])
+        seen |= support & introduced
+        order.append(f)
+    return order
+
+
+cdef class TransitionRelation:
+    """Conjunctively partitioned transition relation.
+
+    The conjuncts are ordered for early quantification, clustered while
+    the clusters stay below a size threshold, and scheduled so that
+    each variable is quantified right after the last cluster that
+    depends on it.  Present and next state variables are exchanged by
+    a VariableMap.
+
+    >>> T = TransitionRelation(mgr, [t0, t1, t2], x, y)
+    >>> successors = T.image(states)
+    """
+
+    cdef Cudd _mgr
+    cdef list _clusters
+    cdef list _imageSchedule
+    cdef BDD _imageCube
+    cdef list _preimageSchedule
+    cdef BDD _preimageCube
+    cdef VariableMap _map
+
+    def __init__(self, Cudd mgr, list parts, list present, list next,
+                 list inputs=None, threshold=5000):
+        """Build a transition relation from a list of conjuncts.
+
+        present and next are corresponding lists of present and next
+        state variables; the variables in inputs are quantified by both
+        image and preimage.
+        """
+        if len(present) != len(next):
+            raise ValueError("The two lists of variables should have the same length")
+        for i, f in enumerate(parts):
+            if not isinstance(f, BDD) or (<BDD>f)._mgr is not mgr:
+                raise TypeError("Found a non-BDD at position {0}".format(i))
+        cdef list x = VariableIndices(present)
+        cdef list y = VariableIndices(next)
+        cdef list w = VariableIndices(inputs) if inputs else []
+        self._mgr = mgr
+        if not parts:
+            parts = [mgr.bddOne()]
+        forward = set(x) | set(w)
+        backward = set(y) | set(w)
+        self._clusters = []
+        cluster = None
+        for f in OrderPartitions(parts, forward, set(y)):
+            if cluster is None:
+                cluster = f
+                continue
+            conj = cluster & f
+            if conj.size() <= threshold:
+                cluster = conj
+            else:
+                self._clusters.append(cluster)
+                cluster = f
+        self._clusters.append(cluster)
+        self._imageSchedule, self._imageCube = self._schedule(
+            self._clusters, forward)
+        self._preimageSchedule, self._preimageCube = self._schedule(
+            OrderPartitions(self._clusters, backward, set(x)), backward)
+        self._map = VariableMap(mgr, present, next)
+
+    cdef tuple _schedule(self, list clusters, set quantifiable):
+        """Return the quantification schedule for a list of clusters.
+
+        The schedule is a list of (cluster, cube) pairs, and the cube of
+        the variables that no cluster depends on.
+        """
+        last = {}
+        for i, cluster in enumerate(clusters):
+            for v in set(cluster.supportIndices()) & quantifiable:
+                last[v] = i
+        cubes = [[] for cluster in clusters]
+        for v, i in last.items():
+            cubes[i].append(v)
+        schedule = [(cluster, IndicesCube(self._mgr, cube))
+                    for cluster, cube in zip(clusters, cubes)]
+        early = [v for v in quantifiable if v not in last]
+        return schedule, IndicesCube(self._mgr, early)
+
+    def clusters(self):
+        """Return the list of clusters of this transition relation."""
+        return list(self._clusters)
+
+    def image(self, BDD states):
+        """Return the successors of a set of present states."""
+        cdef BDD result = states.existAbstract(self._imageCube)
+        for cluster, cube in self._imageSchedule:
+            result = result.andAbstract(cluster, cube)
+        return self._map.apply(result, MAP_PERMUTE)
+
+    def preimage(self, BDD states):
+        """Return the predecessors of a set of present states."""
+        cdef BDD result = self._map.apply(states, MAP_PERMUTE).existAbstract(
+            self._preimageCube)
+        for cluster, cube in self._preimageSchedule:
+            result = result.andAbstract(cluster, cube)
+        return result
+
+
+cdef BDD Fixpoint(BDD start, TransitionRelation TR, bint forward, simplify,
+                  callback, maxNodes, timeout):
+    """Compute the states reachable forward or backward from start."""
+    if simplify not in (None, 'restrict', 'licompaction', 'squeeze'):
+        raise ValueError("unknown frontier simplification {0}".format(simplify))
+    cdef ccudd.DdManager * dd = start._mgr._manager
+    cdef BDD reached = start
+    cdef BDD frontier = start
+    cdef BDD image
+    cdef int iterations = 0
+    cdef unsigned long limit
+    cdef unsigned long oldLimit
+    AcquireManager(start._mgr)
+    try:
+        oldLimit = ccudd.Cudd_ReadTimeLimit(dd)
+        if timeout is not None:
+            # CUDD's own (CPU time) limit interrupts a long image computation.
+            deadline = time.time() + timeout
+            limit = ccudd.Cudd_ReadElapsedTime(dd) + <unsigned long>(timeout * 1000)
+            if limit < oldLimit:
+                ccudd.Cudd_SetTimeLimit(dd, limit)
+        try:
+            while frontier:
+                if timeout is not None and time.time() > deadline:
+                    raise FixpointAborted('timeout', reached, iterations)
+                # The states reached before the frontier are don't cares.
+                if simplify == 'restrict':
+                    frontier = frontier.restrict(~reached | frontier)
+                elif simplify == 'licompaction':
+                    frontier = frontier.LIcompaction(~reached | frontier)
+                elif simplify == 'squeeze':
+                    frontier = frontier.squeeze(reached)
+                image = TR.image(frontier) if forward else TR.preimage(frontier)
+                frontier = image & ~reached
+                reached = reached | frontier
+                iterations += 1
+                if maxNodes is not None and (reached.size() > maxNodes or
+                                             image.size() > maxNodes):
+                    raise FixpointAborted('nodes', reached, iterations)
+                if callback is not None and callback(iterations, reached, frontier):
+                    break
+        except TimeoutError:
+            raise FixpointAborted('timeout', reached, iterations)
+        finally:
+            ccudd.Cudd_SetTimeLimit(dd, oldLimit)
+        return reached
+    finally:
+        ReleaseManager(start._mgr)
+
+
+def reachable(BDD init, TransitionRelation TR, simplify='restrict',
+              callback=None, maxNodes=None, timeout=None):
+    """Return the states reachable from init according to TR.
+
+    Each iteration computes the image of the frontier simplified with
+    the previously reached states as don't cares; simplify is one of
+    'restrict', 'licompaction', 'squeeze', or None.  If callback is
+    given, it is called as callback(iteration, reached, frontier) after
+    each iteration and stops the computation by returning True.
+    FixpointAborted is raised if a BDD grows beyond maxNodes or if the
+    computation takes more than timeout seconds.
+    """
+    return Fixpoint(init, TR, True, simplify, callback, maxNodes, timeout)
+
+
+def backward_reachable(BDD target, TransitionRelation TR, simplify='restrict',
+                       callback=None, maxNodes=None, timeout=None):
+    """Return the states from which target is reachable according to TR.
+
+    The arguments are as for reachable.
+    """
+    return Fixpoint(target, TR, False, simplify, callback, maxNodes, timeout)
+
+
+cdef ccudd.BnetNode * NetworkNode(ccudd.BnetNetwork * net, char * name):
+    """Return the node of a network that drives a signal."""
+    cdef ccudd.BnetNode * node = NULL
+    ccudd.st_lookup(net.hash, name, <void **> &node)
+    return node
+
+
+cdef BDD NetworkVariable(Cudd mgr, ccudd.BnetNetwork * net, char * name):
+    """Return the variable of a network input, naming it if needed."""
+    cdef ccudd.BnetNode * node = NetworkNode(net, name)
+    if node.var not in mgr._varnames:
+        mgr._varnames[node.var] = name.decode('utf-8')
+        mgr._cnames.invalidate(node.var)
+    return MakeBDD(mgr, node.dd)
+
+
+cdef int BuildNetwork(ccudd.DdManager * dd, ccudd.BnetNetwork * net,
+                      bint dfs) noexcept nogil:
+    """Build the global BDDs of the outputs and next states of a network.
+
+    All intermediate BDDs are kept, as with the nodrop option of
+    nanotrav.  Return 1 on success and 0 otherwise.
+    """
+    cdef ccudd.BnetNode * node
+    cdef int i
+    cdef int ret
+    # Inputs first, so that unused inputs also get variables.
+    if dfs:
+        if not ccudd.Bnet_DfsVariableOrder(dd, net):
+            return 0
+    for i in range(net.npis + net.nlatches):
+        if i < net.npis:
+            ret = ccudd.st_lookup(net.hash, net.inputs[i], <void **> &node)
+        else:
+            ret = ccudd.st_lookup(net.hash, net.latches[i-net.npis][1],
+                                  <void **> &node)
+        if not ret or not ccudd.Bnet_BuildNodeBDD(dd, node, net.hash,
+                                                  ccudd.BNET_GLOBAL_DD, 1):
+            return 0
+    for i in range(net.npos + net.nlatches):
+        if i < net.npos:
+            ret = ccudd.st_lookup(net.hash, net.outputs[i], <void **> &node)
+        else:
+            ret = ccudd.st_lookup(net.hash, net.latches[i-net.npos][0],
+                                  <void **> &node)
+        if not ret or not ccudd.Bnet_BuildNodeBDD(dd, node, net.hash,
+                                                  ccudd.BNET_GLOBAL_DD, 1):
+            return 0
+    return 1
+
+
+def read_blif(file_path, Cudd mgr, order='dfs'):
+    """Read a circuit in BLIF format and return its BDDs as a Netlist.
+
+    This uses the network reader of nanotrav.  With order 'dfs', the
+    variables of the primary inputs and present states are created in
+    the depth-first order of the circuit from its outputs; with order
+    'file', in the order of the .inputs and .latch directives.  New
+    variables are named after their signals.
+    """
+    if order not in ('dfs', 'file'):
+        raise ValueError("unknown variable order ({0})".format(order))
+    cdef bint dfs = order == 'dfs'
+    utfpath = file_path.encode('utf-8')
+    cdef FILE * fp = fopen(utfpath, b'r')
+    if fp is NULL:
+        raise IOError("cannot open {0}".format(file_path))
+    cdef ccudd.BnetNetwork * net
+    with nogil:
+        net = ccudd.Bnet_ReadNetwork(<ccudd.FILE *> fp, 0)
+    fclose(fp)
+    if net is NULL:
+        raise ValueError("cannot read BLIF network from {0}".format(file_path))
+    if net.npis == 0 and net.npos == 0 and net.nlatches == 0:
+        # The reader skips whatever it does not recognize.
+        ccudd.Bnet_FreeNetwork(net)
+        raise ValueError("no BLIF network in {0}".format(file_path))
+    cdef ccudd.DdManager * dd = mgr._manager
+    cdef ccudd.BnetNode * node
+    cdef int ret
+    AcquireManager(mgr)
+    try:
+        with nogil:
+            ret = BuildNetwork(dd, net, dfs)
+        if not ret:
+            raise ManagerError(mgr)
+
+        inputs = {}
+        for i in range(net.npis):
+            inputs[net.inputs[i].decode('utf-8')] = NetworkVariable(
+                mgr, net, net.inputs[i])
+        present = {}
+        nexts = {}
+        latches = []
+        for i in range(net.nlatches):
+            ps = net.latches[i][1].decode('utf-8')
+            ns = net.latches[i][0].decode('utf-8')
+            present[ps] = NetworkVariable(mgr, net, net.latches[i][1])
+            nexts[ns] = MakeBDD(mgr, NetworkNode(net, net.latches[i][0]).dd)
+            latches.append((ps, ns, net.latches[i][2].decode('utf-8')))
+        outputs = {}
+        for i in range(net.npos):
+            outputs[net.outputs[i].decode('utf-8')] = MakeBDD(
+                mgr, NetworkNode(net, net.outputs[i]).dd)
+        name = net.name.decode('utf-8') if net.name is not NULL else None
+    finally:
+        # The wrappers hold their own references to the results.
+        node = net.nodes
+        while node is not NULL:
+            if node.dd is not NULL:
+                ccudd.Cudd_RecursiveDeref(dd, node.dd)
+                node.dd = NULL
+            node = node.next
+        ccudd.Bnet_FreeNetwork(net)
+        ReleaseManager(mgr)
+    return Netlist(name, inputs, present, outputs, nexts, latches)
+
+
+cdef ccudd.st_retval DerefEntry(void * key, void * value,
+                                void * arg) noexcept nogil:
+    """Dereference the result recorded in a transfer table entry."""
+    ccudd.Cudd_RecursiveDeref(<ccudd.DdManager *>arg, <ccudd.DdNode *>value)
+    return ccudd.ST_CONTINUE
+
+cdef ccudd.DdNode * TransferRecur(ccudd.DdManager * dd, ccudd.DdManager * dest,
+                                  ccudd.DdNode * f,
+                                  ccudd.st_table * table) noexcept nogil:
+    """Return the copy of f in dest; the table holds its reference."""
+    cdef ccudd.DdNode * node = ccudd.Cudd_Regular(f)
+    cdef int compl = ccudd.Cudd_IsComplement(f)
+    cdef ccudd.DdNode * t
+    cdef ccudd.DdNode * e
+    cdef ccudd.DdNode * var
+    cdef ccudd.DdNode * res
+    cdef void * found
+    if ccudd.Cudd_IsConstant(node):
+        return ccudd.Cudd_NotCond(ccudd.Cudd_ReadOne(dest), compl)
+    if ccudd.st_lookup(table, node, &found):
+        return ccudd.Cudd_NotCond(<ccudd.DdNode *>found, compl)
+    t = TransferRecur(dd, dest, ccudd.Cudd_T(node), table)
+    if t is NULL:
+        return NULL
+    e = TransferRecur(dd, dest, ccudd.Cudd_E(node), table)
+    if e is NULL:
+        return NULL
+    # The children are referenced by the table; the variable is a
+    # projection function, which the manager keeps alive.
+    var = ccudd.Cudd_bddIthVar(dest, ccudd.Cudd_NodeReadIndex(node))
+    if var is NULL:
+        return NULL
+    res = ccudd.Cudd_bddIte(dest, var, t, e)
+    if res is NULL:
+        return NULL
+    ccudd.Cudd_Ref(res)
+    if ccudd.st_insert(table, node, res) == ccudd.ST_OUT_OF_MEM:
+        ccudd.Cudd_RecursiveDeref(dest, res)
+        return NULL
+    return ccudd.Cudd_NotCond(res, compl)
+
+cdef bint TransferMany(ccudd.DdManager * dd, ccudd.DdManager * dest,
+                       ccudd.DdNode * * nodes, int n) noexcept nogil:
+    """Replace nodes of dd with referenced copies in dest.
+
+    One table maps the translated nodes of dd to their copies, so that
+    the nodes shared by several roots are translated once.  On failure
+    no reference is left in dest.
+    """
+    cdef ccudd.st_table * table = ccudd.st_init_table(ccudd.st_ptrcmp,
+                                                      ccudd.st_ptrhash)
+    cdef ccudd.DdNode * res
+    cdef int i
+    cdef int done = 0
+    if table is NULL:
+        return 0
+    while done < n:
+        res = TransferRecur(dd, dest, nodes[done], table)
+        if res is NULL:
+            break
+        ccudd.Cudd_Ref(res)
+        nodes[done] = res
+        done += 1
+    if done < n:
+        for i in range(done):
+            ccudd.Cudd_RecursiveDeref(dest, nodes[i])
+    ccudd.st_foreach(table, DerefEntry, dest)
+    ccudd.st_free_table(table)
+    return done == n
+
+
+cdef Cudd POOL_MANAGER = None
+
+class _PoolPickler(pickle.Pickler):
+    """Pickler that writes its manager as a reference.
+
+    The decision diagrams are pickled as node tables by variable index,
+    so the reader rebuilds them in the manager of its own process.
+    """
+
+    def __init__(self, file, mgr):
+        pickle.Pickler.__init__(self, file, pickle.HIGHEST_PROTOCOL)
+        self._mgr = mgr
+
+    def persistent_id(self, obj):
+        """Return the reference of the manager."""
+        if isinstance(obj, Cudd):
+            if obj is not self._mgr:
+                raise ValueError("decision diagram of another manager "
+                                 "passed to a manager pool")
+            return 'manager'
+        return None
+
+class _PoolUnpickler(pickle.Unpickler):
+    """Unpickler that reads the manager reference as its manager."""
+
+    def __init__(self, file, mgr):
+        pickle.Unpickler.__init__(self, file)
+        self._mgr = mgr
+
+    def persistent_load(self, pid):
+        """Return the manager for its reference."""
+        if pid != 'manager':
+            raise pickle.UnpicklingError("unknown persistent id")
+        return self._mgr
+
+cdef bytes PoolDumps(Cudd mgr, obj):
+    """Pickle obj with decision diagrams of mgr."""
+    buf = io.BytesIO()
+    _PoolPickler(buf, mgr).dump(obj)
+    return buf.getvalue()
+
+cdef PoolLoads(Cudd mgr, bytes data):
+    """Unpickle an object, rebuilding its decision diagrams in mgr."""
+    return _PoolUnpickler(io.BytesIO(data), mgr).load()
+
+def _poolInit(bytes data):
+    """Create the worker manager of a ManagerPool process."""
+    global POOL_MANAGER
+    POOL_MANAGER = pickle.loads(data)
+
+def _poolWorker(bytes data):
+    """Run a chunk of ManagerPool tasks on the worker manager."""
+    func, items = PoolLoads(POOL_MANAGER, data)
+    return PoolDumps(POOL_MANAGER, [func(POOL_MANAGER, item) for item in items])
+
+def _countWorker(Cudd mgr, tuple task):
+    """Count the minterms of a cofactor for BDD.count_parallel."""
+    f, cube, nvars = task
+    return f.cofactor(cube).count(nvars)
+
+
+cdef class ManagerPool:
+    """Pool of processes, each with a manager, that run user functions.
+
+    Each worker manager starts as a copy of the manager of the pool, with
+    its variables, their order and names.  Arguments and results travel
+    as node tables, in which the nodes shared by the decision diagrams of
+    a chunk of tasks are written once; the decision diagrams of the
+    results are rebuilt in the manager of the pool.  Functions must be
+    picklable, that is, defined at module level.
+    """
+
+    cdef Cudd _mgr
+    cdef object _pool
+    cdef int _processes
+
+    def __init__(self, Cudd mgr, processes=None):
+        """Start processes (by default one per CPU) for manager mgr."""
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        self._mgr = mgr
+        self._processes = processes
+        self._pool = multiprocessing.Pool(
+            processes, _poolInit,
+            (pickle.dumps(mgr, pickle.HIGHEST_PROTOCOL),))
+
+    def __enter__(self):
+        """Return the pool."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the processes."""
+        self.terminate()
+
+    def map(self, func, iterable, chunksize=None):
+        """Return the list of func(worker_manager, item) for the items.
+
+        The items are sent in chunks of chunksize; by default there are
+        about four chunks per process.
+        """
+        items = list(iterable)
+        if chunksize is None:
+            chunksize, extra = divmod(len(items), 4 * self._processes)
+            if extra or not chunksize:
+                chunksize += 1
+        chunks = [PoolDumps(self._mgr, (func, items[i:i+chunksize]))
+                  for i in range(0, len(items), chunksize)]
+        results = []
+        for data in self._pool.map(_poolWorker, chunks, 1):
+            results.extend(PoolLoads(self._mgr, data))
+        return results
+
+    def close(self):
+        """Stop accepting tasks; the processes exit when done."""
+        self._pool.close()
+
+    def terminate(self):
+        """Stop the processes at once."""
+        self._pool.terminate()
+        self._pool.join()
+
+    def join(self):
+        """Wait for the processes to exit after close."""
+        self._pool.join()
+
+
+cdef void WeightedDagFree(WeightedDag * g) noexcept nogil:
+    """Free the arrays of a linearized BDD."""
+    free(g.variables)
+    free(g.levels)
+    free(g.thens)
+    free(g.elses)
+    free(g.invperm)
+    memset(g, 0, sizeof(WeightedDag))
+
+cdef int DagEdge(ccudd.st_table * table, ccudd.DdNode * f) noexcept nogil:
+    """Return the edge to f in a linearized BDD."""
+    cdef ccudd.DdNode * node = ccudd.Cudd_Regular(f)
+    cdef void * pos = NULL
+    if not ccudd.Cudd_IsConstant(node):
+        ccudd.st_lookup(table, node, &pos)
+    return (<int><intptr_t>pos << 1) | ccudd.Cudd_IsComplement(f)
+
+cdef int FillDag(ccudd.DdManager * dd, ccudd.DdNode * f, WeightedDag * g,
+                 ccudd.st_table * table,
+                 ccudd.DdNode * * * found) noexcept nogil:
+    """Collect the nodes of f in found and lay them out in g by level."""
+    cdef int nvars = ccudd.Cudd_ReadSize(dd)
+    cdef int cap = 64
+    cdef int count = 0
+    cdef int i
+    cdef int j
+    cdef int k
+    cdef int level
+    cdef int pos
+    cdef int * start
+    cdef ccudd.DdNode * node
+    cdef ccudd.DdNode * child
+    cdef ccudd.DdNode * * grown
+    cdef ccudd.DdNode * * nodes = <ccudd.DdNode * *> malloc(
+        cap * sizeof(ccudd.DdNode *))
+    found[0] = nodes
+    if nodes is NULL:
+        return 0
+    node = ccudd.Cudd_Regular(f)
+    if not ccudd.Cudd_IsConstant(node):
+        if ccudd.st_insert(table, node, NULL) == ccudd.ST_OUT_OF_MEM:
+            return 0
+        nodes[0] = node
+        count = 1
+    # Breadth-first search: nodes[i:count] are yet to be expanded.
+    i = 0
+    while i < count:
+        for j in range(2):
+            if j == 0:
+                child = ccudd.Cudd_Regular(ccudd.Cudd_T(nodes[i]))
+            else:
+                child = ccudd.Cudd_Regular(ccudd.Cudd_E(nodes[i]))
+            if ccudd.Cudd_IsConstant(child) or ccudd.st_lookup(table, child, NULL):
+                continue
+            if count == cap:
+                cap *= 2
+                grown = <ccudd.DdNode * *> realloc(nodes, cap * sizeof(ccudd.DdNode *))
+                if grown is NULL:
+                    return 0
+                nodes = grown
+                found[0] = nodes
+            if ccudd.st_insert(table, child, NULL) == ccudd.ST_OUT_OF_MEM:
+                return 0
+            nodes[count] = child
+            count += 1
+        i += 1
+    g.n = count + 1
+    g.nvars = nvars
+    g.variables = <int *> malloc(g.n * sizeof(int))
+    g.levels = <int *> malloc(g.n * sizeof(int))
+    g.thens = <int *> malloc(g.n * sizeof(int))
+    g.elses = <int *> malloc(g.n * sizeof(int))
+    g.invperm = <int *> malloc((nvars+1) * sizeof(int))
+    start = <int *> malloc((nvars+1) * sizeof(int))
+    if (g.variables is NULL or g.levels is NULL or g.thens is NULL or
+            g.elses is NULL or g.invperm is NULL or start is NULL):
+        free(start)
+        return 0
+    for k in range(nvars):
+        g.invperm[k] = ccudd.Cudd_ReadInvPerm(dd, k)
+    # Counting sort by decreasing level, after the constant.
+    memset(start, 0, (nvars+1) * sizeof(int))
+    for i in range(count):
+        start[ccudd.Cudd_ReadPerm(dd, ccudd.Cudd_NodeReadIndex(nodes[i]))] += 1
+    pos = 1
+    for level in range(nvars-1, -1, -1):
+        k = start[level]
+        start[level] = pos
+        pos += k
+    for i in range(count):
+        node = nodes[i]
+        level = ccudd.Cudd_ReadPerm(dd, ccudd.Cudd_NodeReadIndex(node))
+        pos = start[level]
+        start[level] += 1
+        # The key is already in the table, so this does not allocate.
+        ccudd.st_insert(table, node, <void *><intptr_t>pos)
+        g.variables[pos] = ccudd.Cudd_NodeReadIndex(node)
+        g.levels[pos] = level
+    free(start)
+    g.variables[0] = -1
+    g.levels[0] = nvars
+    g.thens[0] = 0
+    g.elses[0] = 0
+    for i in range(count):
+        node = nodes[i]
+        pos = DagEdge(table, node) >> 1
+        g.thens[pos] = DagEdge(table, ccudd.Cudd_T(node))
+        g.elses[pos] = DagEdge(table, ccudd.Cudd_E(node))
+    g.root = DagEdge(table, f)
+    return 1
+
+cdef int LinearizeDag(ccudd.DdManager * dd, ccudd.DdNode * f,
+                      WeightedDag * g) noexcept nogil:
+    """Linearize BDD f into g; return 0 if memory runs out."""
+    cdef ccudd.st_table * table = ccudd.st_init_table(ccudd.st_ptrcmp,
+                                                      ccudd.st_ptrhash)
+    cdef ccudd.DdNode * * nodes = NULL
+    cdef int res = 0
+    memset(g, 0, sizeof(WeightedDag))
+    if table is not NULL:
+        res = FillDag(dd, f, g, table, &nodes)
+        ccudd.st_free_table(table)
+    free(nodes)
+    if not res:
+        WeightedDagFree(g)
+    return res
+
+cdef double DagEdgeValue(WeightedDag * g, int edge, int lo,
+                         const double * slevel, const double * suffix,
+                         const double * values) noexcept nogil:
+    """Return the weighted count of an edge over the levels from lo."""
+    cdef int c = edge >> 1
+    cdef int hi = g.levels[c]
+    cdef double value = values[c]
+    cdef int k
+    if edge & 1:
+        value = suffix[hi] - value
+    if c == 0:
+        return suffix[lo] * value
+    # The variables at the levels skipped by the edge are free.
+    for k in range(lo, hi):
+        value *= slevel[k]
+    return value
+
+cdef double EvalDagRow(WeightedDag * g, const double * pos, const double * neg,
+                       double * work) noexcept nogil:
+    """Return the weighted count of a linearized BDD for one weight vector.
+
+    work has room for 2 * nvars + 1 + n doubles.
+    """
+    cdef double * slevel = work
+    cdef double * suffix = work + g.nvars
+    cdef double * values = suffix + g.nvars + 1
+    cdef int i
+    cdef int k
+    cdef int v
+    # suffix[k] is the weighted count of the constant one over the
+    # levels from k; values[i] is that of node i over the levels from
+    # its own.
+    suffix[g.nvars] = 1.0
+    for k in range(g.nvars-1, -1, -1):
+        v = g.invperm[k]
+        slevel[k] = pos[v] + neg[v]
+        suffix[k] = suffix[k+1] * slevel[k]
+    values[0] = 1.0
+    for i in range(1, g.n):
+        v = g.variables[i]
+        values[i] = (pos[v] * DagEdgeValue(g, g.thens[i], g.levels[i] + 1,
+                                           slevel, suffix, values) +
+                     neg[v] * DagEdgeValue(g, g.elses[i], g.levels[i] + 1,
+                                           slevel, suffix, values))
+    return DagEdgeValue(g, g.root, 0, slevel, suffix, values)
+
+cdef WeightedCount(BDD f, pos_weights, neg_weights):
+    """Return the weighted count of f for one weight vector."""
+    cdef ccudd.DdManager * dd = f._mgr._manager
+    cdef int nvars = ccudd.Cudd_ReadSize(dd)
+    pos = [float(w) for w in pos_weights]
+    neg = [float(w) for w in neg_weights]
+    if len(pos) != nvars or len(neg) != nvars:
+        raise TypeError("{0} and {1} weights instead of {2}".format(
+            len(pos), len(neg), nvars))
+    cdef double * weights = <double *> malloc((2*nvars+1) * sizeof(double))
+    if weights is NULL:
+        raise MemoryError("memory allocation failed")
+    cdef int i
+    for i in range(nvars):
+        weights[i] = pos[i]
+        weights[nvars+i] = neg[i]
+    cdef WeightedDag g
+    cdef double * work = NULL
+    cdef double count = 0.0
+    cdef int res
+    with nogil:
+        res = LinearizeDag(dd, f._node, &g)
+    if res:
+        work = <double *> malloc((2*nvars + 1 + g.n) * sizeof(double))
+        if work is not NULL:
+            with nogil:
+                count = EvalDagRow(&g, weights, weights + nvars, work)
+        else:
+            res = 0
+    free(work)
+    free(weights)
+    WeightedDagFree(&g)
+    if not res:
+        raise MemoryError("memory allocation failed")
+    return count
+
+
+cdef class CompiledBDD:
+    """BDD linearized into arrays for repeated weighted counting.
+
+    The nodes are in topological order, so that a weighted count takes
+    one pass over the arrays, without the manager.  Weight vectors have
+    one entry per variable of the manager at compilation time.
+    """
+
+    cdef WeightedDag _dag
+
+    def __cinit__(self):
+        """Create an empty compiled BDD."""
+        memset(&self._dag, 0, sizeof(WeightedDag))
+
+    def __dealloc__(self):
+        """Free the arrays."""
+        WeightedDagFree(&self._dag)
+
+    def __len__(self):
+        """Return the number of nodes, including the constant."""
+        return self._dag.n
+
+    def arrays(self):
+        """Return the variables, levels, then and else edges of the nodes
+        and the root edge.
+
+        Edges are (position << 1) | complement; position 0 holds the
+        constant one, and the children of a node precede it.
+        """
+        cdef int i
+        cdef int n = self._dag.n
+        return (array('i', [self._dag.variables[i] for i in range(n)]),
+                array('i', [self._dag.levels[i] for i in range(n)]),
+                array('i', [self._dag.thens[i] for i in range(n)]),
+                array('i', [self._dag.elses[i] for i in range(n)]),
+                self._dag.root)
+
+    def evaluate(self, pos_weights, neg_weights):
+        """Return the weighted counts for the rows of two weight matrices.
+
+        Row r of pos_weights and neg_weights holds the weights of the
+        positive and negative literals of each variable.  Returns a numpy
+        array of float64 with one count per row.
+        """
+        import numpy
+        cdef int nvars = self._dag.nvars
+        pos = numpy.ascontiguousarray(pos_weights, dtype=numpy.float64)
+        neg = numpy.ascontiguousarray(neg_weights, dtype=numpy.float64)
+        if pos.ndim != 2 or pos.shape != neg.shape or pos.shape[1] != nvars:
+            raise TypeError("weights of shapes {0} and {1} instead of "
+                            "(rows, {2})".format(pos.shape, neg.shape, nvars))
+        cdef const double[:, ::1] pv = pos
+        cdef const double[:, ::1] nv = neg
+        cdef const double * pbase = &pv[0, 0] if pos.size > 0 else NULL
+        cdef const double * nbase = &nv[0, 0] if neg.size > 0 else NULL
+        result = numpy.empty(pv.shape[0], dtype=numpy.float64)
+        cdef double[::1] resv = result
+        cdef WeightedDag * g = &self._dag
+        cdef Py_ssize_t i
+        cdef double * work = <double *> malloc(
+            (2*nvars + 1 + g.n) * sizeof(double))
+        if work is NULL:
+            raise MemoryError("memory allocation failed")
+        with nogil:
+            for i in range(pv.shape[0]):
+                resv[i] = EvalDagRow(g, pbase + i * nvars, nbase + i * nvars, work)
+        free(work)
+        return result
+
+    def probability(self, prob):
+        """Return the probabilities for the rows of a matrix of variable
+        probabilities."""
+        import numpy
+        p = numpy.asarray(prob, dtype=numpy.float64)
+        return self.evaluate(p, 1.0 - p)
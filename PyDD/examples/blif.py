@@ -0,0 +1,36 @@
+"""Test reading circuits in BLIF format."""
+
+from __future__ import print_function
+import os
+
+from cudd import Cudd, read_blif
+
+nanotrav = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        '..', '..', 'cudd', 'nanotrav')
+
+# Combinational circuit: outputs are functions of the primary inputs.
+mgr = Cudd()
+c17 = read_blif(os.path.join(nanotrav, 'C17.blif'), mgr)
+print(c17.name, sorted(c17.inputs))
+for name in sorted(c17.outputs):
+    print(name, '=', c17.outputs[name])
+
+# Sequential circuit with variables created in file order.
+mgr = Cudd()
+s27 = read_blif(os.path.join(nanotrav, 's27.blif'), mgr, order='file')
+print(s27.name, mgr.bddOrder())
+for ps, ns, init in s27.latches:
+    print(ps, '<-', ns, '=', s27.next_states[ns], 'init', init)
+for name in sorted(s27.outputs):
+    print(name, '=', s27.outputs[name])
+
+# The default order follows a depth-first visit from the outputs.
+mgr = Cudd()
+s27 = read_blif(os.path.join(nanotrav, 's27.blif'), mgr)
+print(mgr.bddOrder())
+
+# Files that are not BLIF are rejected.
+try:
+    read_blif(os.path.join(nanotrav, 'README'), Cudd())
+except ValueError:
+    print('not a BLIF file')
@@ -0,0 +1,63 @@
+"""Test cancellation of long operations."""
+
+from __future__ import print_function
+import threading
+
+from cudd import Cudd, CancellationToken, Cancelled, REORDER_SIFT
+
+N = 400
+mgr = Cudd()
+x = [mgr.bddVar(i) for i in range(N)]
+token = CancellationToken()
+mgr.setCancellationToken(token)
+
+def build():
+    # Interleaved equalities have an exponential BDD in this order.
+    f = mgr.bddOne()
+    for i in range(N//2):
+        f &= ~(x[i] ^ x[i+N//2])
+    return f
+
+# Cancel from another thread.
+timer = threading.Timer(0.2, token.cancel)
+timer.start()
+try:
+    build()
+    print('not cancelled')
+except Cancelled as e:
+    print('exception:', e)
+timer.join()
+print('cancelled:', token.cancelled, 'error code:', mgr.readErrorCode())
+
+# Operations keep failing until the token is reset.
+try:
+    build()
+except Cancelled:
+    print('still cancelled')
+token.reset()
+
+# The manager is still consistent.
+f = mgr.bddOne()
+for i in range(10):
+    f &= ~(x[i] ^ x[i+N//2])
+mgr.reduceHeap(REORDER_SIFT)
+print('after reset:', f.size())
+
+# Reordering stops early, with a valid order, and raises Cancelled.
+token.cancel()
+try:
+    mgr.reduceHeap(REORDER_SIFT)
+except Cancelled as e:
+    print('reordering:', e)
+token.reset()
+print('after cancelled reordering:', f.size())
+
+# Time limits raise TimeoutError.
+mgr.setTimeLimit(mgr.readElapsedTime() + 100)
+try:
+    build()
+except TimeoutError as e:
+    print('exception:', e)
+mgr.unsetTimeLimit()
+mgr.setCancellationToken(None)
+print('token:', mgr.readCancellationToken())
@@ -0,0 +1,39 @@
+"""Test storing BDDs in CNF and loading them back."""
+
+from __future__ import print_function
+import os
+import tempfile
+
+from cudd import Cudd
+
+mgr = Cudd()
+x = [mgr.bddVar(i, 'x' + str(i)) for i in range(6)]
+f = (x[0] & x[1]) | (x[2] ^ x[3]) | (x[4] & ~x[5] & x[0])
+print(f)
+
+tmpdir = tempfile.mkdtemp()
+for mode in ('node', 'maxterm', 'best'):
+    cnffile = os.path.join(tmpdir, mode + '.cnf')
+    clauses, added = f.to_cnf(cnffile, mode=mode)
+    print(mode, "clauses:", clauses, "added variables:", added)
+
+    # Load into a fresh manager with the same variables.
+    m2 = Cudd()
+    for i in range(6):
+        m2.bddVar(i, 'x' + str(i))
+    g, = m2.load_cnf(cnffile)
+    print("  loaded function agrees:", g.transfer(mgr) == f)
+    h, = m2.load_cnf(cnffile, quantify=False)
+    print("  without quantification:", h.size(), "nodes over",
+          len(h.supportIndices()), "variables")
+    os.remove(cnffile)
+
+# The constants are written without variables.
+cnffile = os.path.join(tmpdir, 'constant.cnf')
+for c in (mgr.bddOne(), mgr.bddZero()):
+    clauses, added = c.to_cnf(cnffile)
+    g, = Cudd().load_cnf(cnffile)
+    print("constant clauses:", clauses, "loaded:", g)
+os.remove(cnffile)
+
+os.rmdir(tmpdir)
@@ -0,0 +1,39 @@
+"""Test n-ary conjunction and disjunction with different strategies."""
+
+from __future__ import print_function
+from functools import reduce
+
+from cudd import Cudd, REORDER_SIFT
+
+mgr = Cudd()
+
+# Pigeonhole-free CNF: a chain of implications and a few extra clauses.
+n = 12
+x = [mgr.bddVar(i, 'x' + str(i)) for i in range(n)]
+clauses = [~x[i] | x[i+1] for i in range(n-1)]
+clauses += [x[0] | x[n-1], ~x[3] | ~x[7] | x[5]]
+expected = reduce(lambda a, b: a & b, clauses)
+
+for strategy in ('balanced', 'smallest_first', 'support_affinity'):
+    f = mgr.conjoin_all(clauses, strategy=strategy)
+    g = mgr.disjoin_all((~c for c in clauses), strategy=strategy)
+    print(strategy, f == expected, g == ~expected)
+
+print("with reordering:",
+      mgr.conjoin_all(clauses, reorder=REORDER_SIFT) == expected)
+print("empty conjunction is one:", mgr.conjoin_all([]) == mgr.bddOne())
+print("empty disjunction is zero:", mgr.disjoin_all([]) == mgr.bddZero())
+print("contradiction:", mgr.conjoin_all(clauses + [~x[n-1]]) == mgr.bddZero())
+try:
+    mgr.conjoin_all(clauses, strategy='random')
+except ValueError as e:
+    print(e)
+
+# A limit on new nodes makes large conjunctions fail.
+m2 = Cudd()
+a = [m2.bddVar(i) for i in range(20)]
+b = [m2.bddVar(20+i) for i in range(20)]
+try:
+    m2.conjoin_all([~(p ^ q) for p, q in zip(a, b)], limit=10)
+except MemoryError as e:
+    print("limit exceeded:", e)
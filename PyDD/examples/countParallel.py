@@ -0,0 +1,34 @@
+"""Test extended precision and parallel minterm counts."""
+
+from __future__ import print_function
+from cudd import Cudd
+
+mgr = Cudd()
+n = 100
+x = [mgr.bddVar(i) for i in range(2*n)]
+f = mgr.bddZero()
+for i in range(n):
+    f |= x[2*i] & x[2*i+1]
+g = x[0] & ~x[5]
+
+exact = f.count()
+print('exact:', exact)
+print('epd error below 2^-52:', abs(f.count_as_epd() - exact) < exact >> 52)
+print('long double error below 2^-62:',
+      abs(f.count_as_long_double() - exact) < exact >> 62)
+print('small counts are exact:', g.count(), g.count_as_epd(),
+      g.count_as_long_double())
+print('zero:', mgr.bddZero().count_as_epd(), mgr.bddZero().count_as_long_double())
+
+# Beyond the range of a double.
+huge = f.count(5000)
+print('epd close:', abs(f.count_as_epd(5000) - huge) < huge >> 52)
+try:
+    f.count_as_long_double(20000)
+except OverflowError as e:
+    print('error:', e)
+
+print('parallel:', f.count_parallel(split_vars=3, workers=2) == exact)
+print('parallel with numVars:', f.count_parallel(2, 2, numVars=5000) == huge)
+print('split beyond support:', g.count_parallel(split_vars=8, workers=1))
+print('constant:', mgr.bddOne().count_parallel() == 2**(2*n))
@@ -0,0 +1,31 @@
+"""Test enumeration of cubes into NumPy arrays."""
+
+from __future__ import print_function
+import numpy
+
+from cudd import Cudd
+
+mgr = Cudd()
+x = [mgr.bddVar(i, 'x' + str(i)) for i in range(6)]
+f = (x[0] & x[3]) | ~(x[5] ^ x[1]) | (x[2] & ~x[4])
+
+cubes = list(f.generate_cubes())
+chunks = list(f.cubes_array(chunk=5))
+print("chunk shapes:", [c.shape for c in chunks])
+print("same cubes:", bool((numpy.concatenate(chunks) == cubes).all()))
+
+# At most 7 cubes, restricted to x5 and x0.
+for chunk in f.cubes_array(chunk=4, max_cubes=7, vars=[5, 0]):
+    print(chunk)
+
+primes = numpy.concatenate(list(f.primes_array()))
+print("same primes:", bool((primes == list(f.generate_primes())).all()))
+
+g = f.toADD() + x[2].toADD()
+for cubes, values in g.cubes_array(chunk=4, max_cubes=4):
+    print(cubes)
+    print(values)
+
+z = f.toZDD()
+paths = numpy.concatenate(list(z.paths_array()))
+print("same paths:", bool((paths == list(z.generate_paths())).all()))
@@ -0,0 +1,52 @@
+"""Test storing and loading decision diagrams in DDDMP format."""
+
+from __future__ import print_function
+import os
+import tempfile
+
+from cudd import Cudd
+
+m1 = Cudd()
+x,y,z = (m1.bddVar(i, chr(ord('x') + i)) for i in range(3))
+
+f = (~x & ~y & ~z) | (x & y)
+g = f & z
+print(f)
+print(g)
+
+tmpdir = tempfile.mkdtemp()
+bddfile = os.path.join(tmpdir, 'fg.bdd')
+m1.store([f, g], bddfile, names=['f', 'g'])
+
+# Load by index into the same manager.
+f1, g1 = m1.load(bddfile)
+print("f and f1 are identical:", f == f1)
+print("g and g1 are identical:", g == g1)
+
+# Load by name into a manager with a different variable order.
+m2 = Cudd()
+c,b,a = (m2.bddVar(i, chr(ord('z') - i)) for i in range(3))
+f2, g2 = m2.load(bddfile, var_match='names')
+print(f2)
+print(g2)
+
+# ADDs are stored in text mode.
+h = f.toADD() + m1.addConst(2.0)
+addfile = os.path.join(tmpdir, 'h.add')
+m1.store([h], addfile)
+h1, = m1.load(addfile)
+print("h and h1 are identical:", h == h1)
+
+# Without variable names, the file can only be matched by index.
+m3 = Cudd(bddVars=3)
+m3.store([m3.bddVar(0) & ~m3.bddVar(2)], bddfile)
+k, = Cudd().load(bddfile)
+print(k)
+try:
+    Cudd().load(bddfile, var_match='names')
+except ValueError:
+    print("no variable names stored")
+
+os.remove(bddfile)
+os.remove(addfile)
+os.rmdir(tmpdir)
@@ -0,0 +1,50 @@
+"""Test building BDDs from CNF formulae in DIMACS format."""
+
+from __future__ import print_function
+import io
+import os
+import tempfile
+
+from cudd import Cudd
+
+cnf = """c A small satisfiable formula.
+p cnf 4 4
+1 -2 0 2 3 0
+-1 -3 0
+-4
+ 3 0
+%
+0
+"""
+
+tmpdir = tempfile.mkdtemp()
+cnffile = os.path.join(tmpdir, 'small.cnf')
+with open(cnffile, 'w') as f:
+    f.write(cnf)
+
+mgr = Cudd()
+f = mgr.from_dimacs(cnffile)
+print(f)
+print("variables:", [mgr.getVariableName(i) for i in range(mgr.size())])
+print("solutions:", f.count(mgr.size()))
+
+# All strategies build the same function.
+for strategy in ('linear', 'balanced', 'smallest_first', 'support_affinity'):
+    g = mgr.from_dimacs(io.StringIO(cnf), strategy=strategy, window=2)
+    print(strategy, g == f)
+
+# Order of appearance and explicit order.
+m2 = Cudd()
+g = m2.from_dimacs(cnffile, order=[4, 3, 2, 1])
+print(g)
+print("order:", m2.bddOrder())
+
+# Unsatisfiable input and syntax errors.
+print(mgr.from_dimacs(io.BytesIO(b"1 2 0 -1 0 -2 0")))
+try:
+    mgr.from_dimacs(io.BytesIO(b"1 2 0\n3 x 0\n"))
+except ValueError as e:
+    print(e)
+
+os.remove(cnffile)
+os.rmdir(tmpdir)
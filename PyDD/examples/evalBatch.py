@@ -0,0 +1,27 @@
+"""Test evaluation of BDDs and ADDs over many assignments."""
+
+from __future__ import print_function
+import itertools
+import numpy
+
+from cudd import Cudd
+
+mgr = Cudd()
+x = [mgr.bddVar(i, 'x' + str(i)) for i in range(10)]
+f = (x[0] & x[3]) | ~(x[9] ^ x[5]) | (x[1] & ~x[7])
+print(f)
+
+# All 1024 assignments, one value per variable.
+rows = numpy.array(list(itertools.product([0, 1], repeat=10)),
+                   dtype=numpy.uint8)
+values = f.eval_batch(rows)
+expected = numpy.array([f.eval(list(r)).isOne() for r in rows])
+print("agrees with eval:", bool((values == expected).all()))
+print("number of ones:", int(values.sum()), f.count(10))
+
+# The same assignments packed eight variables to a byte.
+packed = numpy.packbits(rows, axis=1)
+print("packed agrees:", bool((f.eval_batch(packed, packed=True) == values).all()))
+
+g = f.toADD() * mgr.addConst(3.0) + x[2].toADD()
+print(g.eval_batch(rows[:8]))
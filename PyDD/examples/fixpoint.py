@@ -0,0 +1,48 @@
+"""Test forward and backward reachability with frontier simplification."""
+
+from __future__ import print_function
+from functools import reduce
+
+from cudd import Cudd, TransitionRelation, FixpointAborted
+from cudd import reachable, backward_reachable
+
+mgr = Cudd()
+
+# A ring of n processes passing a token: process i passes it to i+1.
+n = 6
+x = [mgr.bddVar(2*i,   'x' + str(i)) for i in range(n)]
+y = [mgr.bddVar(2*i+1, 'y' + str(i)) for i in range(n)]
+pick = [mgr.bddVar(2*n+i, 'p' + str(i)) for i in range(n)]
+parts = []
+for i in range(n):
+    # Process i holds the token next if it receives it or keeps it.
+    receive = x[i-1] & pick[i-1]
+    keep = x[i] & ~pick[i]
+    parts.append(~(y[i] ^ (receive | keep)))
+one_pick = reduce(lambda a, b: a | b,
+                  [pick[i] & ~reduce(lambda a, b: a | b,
+                                     [pick[j] for j in range(n) if j != i])
+                   for i in range(n)])
+parts.append(one_pick)
+T = TransitionRelation(mgr, parts, x, y, inputs=pick)
+
+init = x[0] & ~reduce(lambda a, b: a | b, x[1:])
+for simplify in (None, 'restrict', 'licompaction', 'squeeze'):
+    R = reachable(init, T, simplify=simplify)
+    print(simplify, R.count(n))
+print(R)
+
+def report(iteration, reached, frontier):
+    print("iteration", iteration, "reached", reached.count(n))
+    return iteration == 3
+
+reachable(init, T, callback=report)
+
+B = backward_reachable(x[n-1] & ~reduce(lambda a, b: a | b, x[:-1]), T)
+print("states that can pass the token to the last process:", B.count(n))
+print("all reachable states can:", R <= B)
+
+try:
+    reachable(init, T, maxNodes=3)
+except FixpointAborted as e:
+    print(e.reason, e.iterations, e.reached.count(n))
@@ -4,7 +4,6 @@ from __future__ import print_function
 import argparse
 import re
 import matplotlib.pyplot as plt
-import numpy as np
 
 def readDIMACS(filename):
     """ Read a file in DIMACS format and return an array of clauses.
@@ -62,22 +61,7 @@ def linear(clauses, perm):
 
 def gradual(clauses):
 
-    if len(clauses) == 0:
-        return mgr.bddOne()
-
-    fncs = [clauseBDD(cl) for cl in clauses]
-    nfncs = []
-    while len(fncs) > 1:
-        f1 = fncs.pop() & fncs.pop()
-        nfncs.append(f1)
-        if len(fncs) == 1:
-            nfncs.append(fncs.pop())
-        if len(fncs) == 0:
-            fncs = nfncs
-            nfncs = []
-            if args.verbose > 0:
-                print('completed one pass,', len(fncs), 'functions left')
-    return fncs[0]
+    return mgr.conjoin_all(clauseBDD(cl) for cl in clauses)
 
 def plotCNF(clauses, rperm, cperm):
     xp = []
@@ -101,129 +85,27 @@ def plotCNF(clauses, rperm, cperm):
     plt.show()
 
 def depMat(clauses):
-    # Create Boolean dependence matrix.  Literals and clauses start at 0.
+    # Compute block lower-triangular form of the Boolean dependence
+    # matrix.  Literals and clauses start at 0.
+    from cudd import blt_order
     max_l = max(abs(lit) for row in clauses for lit in row)
-    mat = np.zeros((len(clauses), max_l), dtype=bool)
-    print(len(clauses), max_l, mat.dtype)
-    for i in range(len(clauses)):
-        for lit in clauses[i]:
-            mat[i,abs(lit)-1] = True
-    print('shape = ', mat.shape[0], mat.shape[1])
-    # Count true elements in each row and column.
-    clength = np.sum(mat,axis=0)
-    rlength = np.sum(mat,axis=1)
-    print('clength size', clength.size, 'rlength size', rlength.size)
-    print('literals =', np.sum(mat,axis=(0,1)))
-    print('min row length', min(rlength))
-    # Initialize auxiliary structures.
-    rperm = []
-    cperm = []
-    ractive = np.ones((mat.shape[0]), dtype=bool)
-    cactive = np.ones((mat.shape[1]), dtype=bool)
-    print('ractive', ractive.size, 'cactive', cactive.size)
-    rpassive = 0
-    cpassive = 0
-    # Permute singleton rows to the top and their column to the left.
-    for i in range(mat.shape[0]):
-        if rlength[i] == 1:
-            rperm.append(i)
-            rpassive += 1
-            ractive[i] = False
-            colnum = np.nonzero(mat[i,:])[0][0]
-            cperm.append(colnum)
-            cpassive += 1
-            cactive[colnum] = False
-    if args.verbose > 0:
-        print('After extraction of singleton rows:')
-        print('rpassive', rpassive, 'cpassive', cpassive)
-        if args.verbose > 1:
-            print('rperm', rperm)
-            print('cperm', cperm)
-            print('ractive', ractive)
-            print('cactive', cactive)
-    # Deactivate empty columns.
-    for j in range(mat.shape[1]):
-        if not cactive[j]: continue
-        found = False
-        for i in range(mat.shape[0]):
-            if ractive[i] and mat[i,j]:
-                found = True
-                break
-        if not found:
-            cactive[j] = False
-            cpassive += 1
-            cperm.append(j)
-            print('deactivated column', j)
-    # Deactivate rows that only contain inactive columns.
-    for i in range(mat.shape[0]):
-        if not ractive[i]: continue
-        found = False
-        for j in range(mat.shape[1]):
-            if cactive[j] and mat[i,j]:
-                found = True
-                break
-        if not found:
-            ractive[i] = False
-            rpassive += 1
-            rperm.append(i)
-            print('deactivated row', i)
-    print('rpassive', rpassive, 'cpassive', cpassive)
-    while rpassive < mat.shape[0] and cpassive < mat.shape[1]:
-        # Find minimum row count.
-        lmin = mat.shape[1] + 1
-        minrows = set()
-        for i in range(mat.shape[0]):
-            if not ractive[i]: continue
-            lrow = 0
-            for j in range(mat.shape[1]):
-                if cactive[j] and mat[i,j]:
-                    lrow += 1
-            if lrow <= lmin:
-                if lrow < lmin:
-                    lmin = lrow
-                    minrows = set()
-                minrows.add(i)
-        if lmin == 0:
-            print('lmin', lmin, 'type', type(lmin), 'minrows', minrows)
-        # Find column with the most intersections with shortest rows.
-        maxint = -1
-        maxcol = -1
-        for j in range(mat.shape[1]):
-            if not cactive[j]: continue
-            lcol = 0
-            for i in range(mat.shape[0]):
-                if i in minrows and mat[i,j]:
-                    lcol += 1
-            if lcol > maxint:
-                maxint = lcol
-                maxcol = j
-        print('maxcol', maxcol)
-        cperm.append(maxcol)
-        cpassive += 1
-        cactive[maxcol] = False
-        if lmin == 1:
-            for i in minrows:
-                if mat[i,maxcol]:
-                    rperm.append(i)
-                    rpassive += 1
-                    ractive[i] = False
-    # Endgame.
-    print('rpassive', rpassive, 'cpassive', cpassive)
-    print('ractive', [i for i in range(mat.shape[0]) if ractive[i]])
-    for i in range(mat.shape[0]):
-        if ractive[i]:
-            rperm.append(i)
+    rperm, order = blt_order(clauses)
+    order.extend(sorted(set(range(1, max_l+1)) - set(order)))
     if args.verbose > 1:
         print('rperm', rperm)
-        print('cperm', cperm)
-        print('ractive', ractive)
-        print('cactive', cactive)
-        print(mat)
-    icperm = [0] * len(cperm)
-    for j in range(len(cperm)):
-        icperm[cperm[j]] = j
+        print('order', order)
+    icperm = [0] * max_l
+    for j in range(max_l):
+        icperm[order[j]-1] = j
     return (rperm, icperm)
 
+def staticOrder(clauses, heuristic):
+    # Return the DIMACS variables in the order computed by a heuristic.
+    import cudd
+    if heuristic == 'blt':
+        return cudd.blt_order(clauses)[1]
+    return getattr(cudd, heuristic + '_order')(clauses)
+
 
 if __name__ == "__main__":
 
@@ -243,16 +125,22 @@ if __name__ == "__main__":
                         action='count', default=0)
     parser.add_argument('-g', '--gradual', help='gradually build BDD',
                         action='store_true')
+    parser.add_argument('-n', '--native',
+                        help='read and build BDD with Cudd.from_dimacs',
+                        action='store_true')
     parser.add_argument('-b', '--blt',
                         help='compute block lower-triangular form',
                         action='store_true')
+    parser.add_argument('-o', '--order',
+                        help='static variable order heuristic',
+                        choices=['force', 'mince', 'blt'])
     parser.add_argument('-p', '--plot', help='plot CNF', action='store_true')
     parser.add_argument('-s', '--stats', help='print BDD stats',
                         action='store_true')
     args = parser.parse_args()
 
     # Read DIMACS file.
-    clauselist = readDIMACS(args.filename)
+    clauselist = [] if args.native and not args.order else readDIMACS(args.filename)
     #clauselist.sort(key=len)
     if args.verbose > 1:
         print('\n'.join([' '.join(['{:3}'.format(item) for item in row])
@@ -279,8 +167,17 @@ if __name__ == "__main__":
 
         # Initialize function.
         variables = {}
-
-        if args.gradual:
+        order = 'appearance'
+        if args.order:
+            order = staticOrder(clauselist, args.order)
+            if not args.native:
+                for index in order:
+                    variables[index] = mgr.bddVar(None, str(index))
+
+        if args.native:
+            f = mgr.from_dimacs(args.filename, order=order)
+            variables = mgr.bddVariables()
+        elif args.gradual:
             f = gradual(clauselist)
         else:
             f = linear(clauselist, rperm)
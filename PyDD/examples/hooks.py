@@ -0,0 +1,78 @@
+"""Test Python hooks for reordering and garbage collection."""
+
+from __future__ import print_function
+from cudd import Cudd, ReorderingVetoed, REORDER_SIFT, REORDER_WINDOW2, \
+    PRE_REORDERING_HOOK, POST_REORDERING_HOOK, PRE_GC_HOOK, POST_GC_HOOK
+
+mgr = Cudd()
+n = 10
+x = [mgr.bddVar(i, 'x%i' % i) for i in range(2*n)]
+f = mgr.bddZero()
+for i in range(n):
+    f |= x[i] & x[n+i]
+
+log = []
+def record(info):
+    log.append(info)
+
+mgr.add_hook(PRE_REORDERING_HOOK, record)
+mgr.add_hook(POST_REORDERING_HOOK, record)
+mgr.reduceHeap(REORDER_SIFT)
+pre, post = log
+print(pre.dd, pre.method == REORDER_SIFT, pre.nodes_before == pre.nodes)
+print(post.method == REORDER_SIFT, post.nodes_before, '->', post.nodes,
+      post.elapsed >= 0.0)
+
+# A pre hook may veto reordering.
+mgr.add_hook(PRE_REORDERING_HOOK, lambda info: info.method != REORDER_WINDOW2)
+try:
+    mgr.reduceHeap(REORDER_WINDOW2)
+except ReorderingVetoed as e:
+    print(e)
+print(f.size())
+
+# A vetoed dynamic reordering makes the operation that triggered it fail.
+mgr = Cudd()
+x = [mgr.bddVar(i) for i in range(2*n)]
+mgr.add_hook(PRE_REORDERING_HOOK, lambda info: False)
+mgr.autodynEnable(REORDER_SIFT)
+mgr.nextReordering(20)
+f = mgr.bddZero()
+try:
+    for i in range(n):
+        f |= x[i] & x[n+i]
+except ReorderingVetoed as e:
+    print(e)
+mgr.autodynDisable()
+for i in range(n):
+    f |= x[i] & x[n+i]
+print(f.size())
+
+# Stop dynamic reordering once it no longer pays off.
+mgr = Cudd()
+x = [mgr.bddVar(i) for i in range(2*n)]
+def diminishing(info):
+    if info.nodes > 0.9 * info.nodes_before:
+        mgr.autodynDisable()
+mgr.add_hook(POST_REORDERING_HOOK, diminishing)
+mgr.autodynEnable(REORDER_SIFT)
+mgr.nextReordering(20)
+f = mgr.bddZero()
+for i in range(n):
+    f |= x[i] & x[n+i]
+print('reorderings', mgr.readReorderings(), 'size', f.size(),
+      'autodyn', mgr.reorderingStatus()[0])
+
+# Garbage collection.
+gcs = []
+mgr.add_hook(PRE_GC_HOOK, gcs.append)
+mgr.add_hook(POST_GC_HOOK, gcs.append)
+del f
+mgr.reduceHeap(REORDER_SIFT)
+print([info.kind for info in gcs[:2]] == [PRE_GC_HOOK, POST_GC_HOOK],
+      gcs[1].nodes <= gcs[1].nodes_before)
+mgr.remove_hook(PRE_GC_HOOK, gcs.append)
+try:
+    mgr.remove_hook(PRE_GC_HOOK, gcs.append)
+except ValueError as e:
+    print(e)
@@ -0,0 +1,30 @@
+"""Test linear (pseudo-Boolean) constraints."""
+
+from __future__ import print_function
+from cudd import Cudd
+
+mgr = Cudd()
+n = 6
+x = [mgr.bddVar(i, 'x%i' % i) for i in range(n)]
+
+# Weights of any sign, complemented variables, one or two bounds.
+f = mgr.linear_constraint([x[0], x[1], ~x[2], x[3]], [2, -3, 4, 1], 1, 4)
+print(f)
+g = mgr.linear_constraint(x, [5, 4, 3, 3, 2, 1], upper=7)
+print('knapsack:', g.count(n), 'solutions,', g.size(), 'nodes')
+print('at most 2:', mgr.at_most_k(x, 2).count(n))
+print('at least 5:', mgr.at_least_k(x, 5).count(n))
+print('exactly 3:', mgr.exactly_k(x, 3).count(n))
+print('same as cardinality:', mgr.exactly_k(x, 3) == mgr.cardinality(x, 3))
+print('unsatisfiable:', mgr.linear_constraint(x, [1] * n, 7, 9) == mgr.bddZero())
+print('tautology:', mgr.linear_constraint(x, [1] * n, -1) == mgr.bddOne())
+
+# Large constraints build in time proportional to their BDDs.
+mgr = Cudd()
+y = [mgr.bddVar(i) for i in range(1000)]
+h = mgr.linear_constraint(y, [1 + i % 7 for i in range(1000)], 1500, 2000)
+print('1000 variables:', h.size(), 'nodes')
+try:
+    mgr.linear_constraint(y[:2], [1])
+except TypeError as e:
+    print(e)
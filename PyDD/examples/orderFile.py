@@ -0,0 +1,72 @@
+"""Test saving and loading variable orders with their group trees."""
+
+from __future__ import print_function, unicode_literals, division
+import os
+import tempfile
+
+from cudd import Cudd, MTR_DEFAULT, REORDER_GROUP_SIFT
+
+n = 8
+mgr = Cudd()
+X = [mgr.bddVar(i, 'x%i' % i) for i in range(n)]
+Z = [mgr.zddVar(i, 'z%i' % i) for i in range(4)]
+f = (X[0] & X[5]) | (X[1] & X[4]) | (X[2] & X[7]) | (X[3] & X[6])
+mgr.makeTreeNode(0, 2, MTR_DEFAULT)
+mgr.makeTreeNode(4, 2, MTR_DEFAULT)
+mgr.reduceHeap(REORDER_GROUP_SIFT)
+mgr.zddShuffleHeap([3, 1, 2, 0])
+print('saved order')
+mgr.printBddOrder()
+print(mgr.zddOrder(), 'size', f.size())
+
+orderfile = os.path.join(tempfile.mkdtemp(), 'f.order')
+mgr.save_order(orderfile)
+
+# Variables created in a different order are matched by name.
+mgr2 = Cudd()
+Y = {name: mgr2.bddVar(None, name) for name in
+     ['x%i' % i for i in reversed(range(n))] + ['extra']}
+W = [mgr2.zddVar(i, 'z%i' % i) for i in range(4)]
+g = (Y['x0'] & Y['x5']) | (Y['x1'] & Y['x4']) | \
+    (Y['x2'] & Y['x7']) | (Y['x3'] & Y['x6'])
+print('size before loading', g.size())
+mgr2.load_order(orderfile)
+print('loaded by name')
+mgr2.printBddOrder()
+print(mgr2.zddOrder(), 'size', g.size())
+
+# By index, into a manager without names.
+mgr3 = Cudd(bddVars=n)
+mgr3.load_order(orderfile, match='index')
+print('loaded by index')
+mgr3.printBddOrder()
+
+# The groups are honored by later reorderings.
+mgr2.reduceHeap(REORDER_GROUP_SIFT)
+print('after reordering')
+mgr2.printBddOrder()
+
+try:
+    mgr.load_order(orderfile, match='position')
+except ValueError as e:
+    print(e)
+
+# Variables saved without names are matched by index.
+mgr3.shuffleHeap(list(reversed(range(n))))
+mgr3.save_order(orderfile)
+mgr4 = Cudd(bddVars=n)
+mgr4.load_order(orderfile)
+print('unnamed variables loaded by index:', mgr4.bddOrder() == mgr3.bddOrder())
+
+# Names that match nothing are an error.
+mgr5 = Cudd()
+for i in range(n):
+    mgr5.bddVar(i, 'y%i' % i)
+mgr.save_order(orderfile)
+try:
+    mgr5.load_order(orderfile)
+except ValueError:
+    print('no variable matches')
+
+os.remove(orderfile)
+os.rmdir(os.path.dirname(orderfile))
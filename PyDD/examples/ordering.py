@@ -0,0 +1,44 @@
+"""Test static variable ordering heuristics."""
+
+from __future__ import print_function
+import random
+from functools import reduce
+
+from cudd import Cudd, force_order, mince_order, blt_order
+
+# A chain of clauses over scrambled variables, listed in random order.
+random.seed(5)
+n = 60
+names = list(range(1, n+1))
+random.shuffle(names)
+clauses = []
+for i in range(n-2):
+    a, b, c = names[i:i+3]
+    clauses += [[a, -b, c], [-a, b]]
+random.shuffle(clauses)
+
+def span(order):
+    """Sum over the clauses of the distance of their extreme variables."""
+    pos = {v: i for i, v in enumerate(order)}
+    return sum(max(pos[abs(l)] for l in c) - min(pos[abs(l)] for l in c)
+               for c in clauses)
+
+def build(order):
+    """Apply the order before conjoining the clauses and return the size."""
+    mgr = Cudd()
+    x = [mgr.bddVar(i) for i in range(n)]
+    mgr.shuffleHeap([v-1 for v in order])
+    lits = lambda c: (x[abs(l)-1] if l > 0 else ~x[abs(l)-1] for l in c)
+    f = mgr.conjoin_all(reduce(lambda p, q: p | q, lits(c)) for c in clauses)
+    return f.size()
+
+print('DIMACS order: span', span(range(1, n+1)), 'size', build(range(1, n+1)))
+for name, order in (('FORCE', force_order(clauses)),
+                    ('MINCE', mince_order(clauses)),
+                    ('BLT', blt_order(clauses)[1])):
+    assert sorted(order) == list(range(1, n+1))
+    print(name, 'span', span(order), 'size', build(order))
+
+rows, cols = blt_order([[1, -2], [2], [2, 3, -4], [3]])
+print('BLT rows', rows, 'columns', cols)
+print(force_order([]), mince_order([[7]]))
@@ -0,0 +1,45 @@
+"""Test pickling of BDDs, ADDs, and ZDDs."""
+
+from __future__ import print_function
+import pickle
+
+from cudd import Cudd
+
+mgr = Cudd()
+x,y,z,w = (mgr.bddVar(i, n) for i, n in enumerate('xyzw'))
+mgr.shuffleHeap([3,1,0,2])
+
+f = (x & y) | (~z & w)
+g = f ^ x
+h = ~f & (y | z)
+print(f)
+print(g)
+print(h)
+
+# Diagrams pickled together share their nodes.
+together = pickle.dumps([f, g, h])
+separate = sum(len(pickle.dumps(d)) for d in (f, g, h))
+print("shared pickle is smaller:", len(together) < separate)
+
+# The manager is pickled with the diagrams, including order and names.
+mgr1, f1, g1, h1 = pickle.loads(pickle.dumps([mgr, f, g, h]))
+print(f1)
+print(g1)
+print(h1)
+print("order preserved:", mgr1.bddOrder() == mgr.bddOrder())
+print("g1 and f1 ^ x are identical:", g1 == f1 ^ mgr1.bddVar(0))
+
+# ADDs keep their terminal values.
+a = f.toADD() + mgr.addConst(2.5)
+a1 = pickle.loads(pickle.dumps(a))
+a1.display()
+
+# ZDDs.
+v0, v1, v2 = (mgr.zddVar(i) for i in range(3))
+s = v0 | (v1 & v2)
+s1 = pickle.loads(pickle.dumps(s))
+print(s.count_as_double(), s1.count_as_double())
+
+# Pickling in a separate call copies the diagram again.
+f2 = pickle.loads(pickle.dumps(f))
+print(f2)
@@ -0,0 +1,43 @@
+"""Test portfolio reordering in separate processes."""
+
+from __future__ import print_function
+from cudd import Cudd, MTR_DEFAULT, REORDER_SIFT, REORDER_WINDOW2, \
+    REORDER_GROUP_SIFT, REORDER_SIFT_CONVERGE, REORDER_EXACT
+
+mgr = Cudd()
+n = 12
+x = [mgr.bddVar(i, 'x%i' % i) for i in range(2*n)]
+f = mgr.bddZero()
+for i in range(n):
+    f |= x[i] & x[n+i]
+g = f ^ x[3]
+order = mgr.bddOrder()
+print('initial size:', mgr.sharingSize([f, g]))
+
+methods = [REORDER_WINDOW2, REORDER_SIFT, REORDER_SIFT_CONVERGE]
+method, size = mgr.portfolio_reorder([f, g], methods=methods, workers=2,
+                                     timeout=10)
+print('best method:', method == REORDER_SIFT, 'size:', size)
+print('size after reordering:', mgr.sharingSize([f, g]))
+print('order changed:', mgr.bddOrder() != order)
+
+# Nothing improves on the current order.
+method, size = mgr.portfolio_reorder([f, g], methods=[REORDER_WINDOW2])
+print('method:', method, 'size:', size)
+
+# Groups are honored by the workers.
+mgr = Cudd()
+x = [mgr.bddVar(i, 'x%i' % i) for i in range(2*n)]
+f = mgr.bddZero()
+for i in range(n):
+    f |= x[i] & x[n+i]
+mgr.makeTreeNode(0, n, MTR_DEFAULT)
+mgr.makeTreeNode(n, n, MTR_DEFAULT)
+method, size = mgr.portfolio_reorder([f], methods=[REORDER_GROUP_SIFT])
+print('with groups:', size, f.size())
+
+# Exact reordering may not finish; it needs a time limit.
+try:
+    mgr.portfolio_reorder([f], methods=[REORDER_EXACT])
+except ValueError as e:
+    print('error:', e)
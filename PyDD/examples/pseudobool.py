@@ -2,17 +2,11 @@
 from __future__ import print_function
 from cudd import Cudd
 
-def linearInequality(x, w, l, u):
-    """ Compute the characteristic function of l < w'x < c """
-    if not x:
-        return m.bddOne() if u > 0 and l < 0 else m.bddZero()
-    return x[0].ite(linearInequality(x[1:], w[1:], l - w[0], u - w[0]),
-                    linearInequality(x[1:], w[1:], l, u))
-
 m = Cudd()
 x = [m.bddVar(i, 'x_%s' % (i+1)) for i in range(10)]
 
-f = linearInequality(x, [3] * 4 + [2] * 6, 4, 13)
+# 4 < w'x < 13
+f = m.linear_constraint(x, [3] * 4 + [2] * 6, 5, 12)
 print('without incompatibility', end=''); f.summary()
 
 f &= ~x[4] | (~x[0] & ~x[1])
@@ -0,0 +1,21 @@
+"""Test the performance counters of the manager."""
+
+from __future__ import print_function
+
+from cudd import Cudd, REORDER_SIFT
+
+mgr = Cudd()
+start = mgr.stats()
+print(start._fields)
+
+x = [mgr.bddVar(i) for i in range(20)]
+f = mgr.bddZero()
+for i in range(10):
+    f |= x[i] & x[19-i]
+mgr.reduceHeap(REORDER_SIFT)
+
+delta = mgr.stats_delta(start)
+print("reorderings:", delta.reorderings)
+print("cache lookups:", delta.cache_lookups > 0)
+print("hit rate in [0,1]:", 0 <= delta.cache_hit_rate <= 1)
+print("live nodes:", mgr.stats().node_count, f.size())
@@ -0,0 +1,37 @@
+"""Test reordering of independent managers in separate threads."""
+
+from __future__ import print_function
+import threading
+
+from cudd import Cudd, REORDER_SIFT
+
+def build(mgr, n):
+    """Build a function whose size depends strongly on the order."""
+    x = [mgr.bddVar(i) for i in range(2*n)]
+    f = mgr.bddZero()
+    for i in range(n):
+        f |= x[i] & x[n+i]
+    return f
+
+def reorder(mgr, results):
+    """Sift the variables of a manager while the GIL is released."""
+    mgr.reduceHeap(REORDER_SIFT)
+    results.append(mgr.size())
+
+managers = [Cudd() for _ in range(2)]
+functions = [build(mgr, 10) for mgr in managers]
+print([f.size() for f in functions])
+
+results = []
+threads = [threading.Thread(target=reorder, args=(mgr, results))
+           for mgr in managers]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+print(results, [f.size() for f in functions])
+
+# Operations of several threads on one manager go under its lock.
+mgr = managers[0]
+with mgr.lock():
+    print(functions[0].count())
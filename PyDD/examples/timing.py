@@ -25,8 +25,8 @@ try:
         f &= x[i] | x[i+N//2]
     print("f", end="")
     f.summary()
-except MemoryError as e:
-    print("Exception:", m.readErrorCode())
+except TimeoutError as e:
+    print("Exception:", e)
     print("Elapsed time:", m.readElapsedTime(), "ms")
     print("Time limit was:", m.readTimeLimit(), "ms")
     m.clearErrorCode()
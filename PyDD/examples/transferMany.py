@@ -0,0 +1,61 @@
+"""Test transferring BDDs between managers and solving case splits in a
+pool of worker managers."""
+
+from __future__ import print_function
+import itertools
+
+from cudd import Cudd, ManagerPool
+
+m1 = Cudd()
+n = 8
+x = [m1.bddVar(i, 'x%i' % i) for i in range(2*n)]
+f = m1.bddZero()
+for i in range(n):
+    f |= x[i] & x[n+i]
+g = f ^ x[0]
+h = ~f & x[n-1]
+
+# The other manager has fewer variables and a different order.
+m2 = Cudd()
+for i in range(n):
+    m2.bddVar(i)
+m2.shuffleHeap(list(reversed(range(n))))
+f2, g2, h2 = m1.transfer_many([f, g, h], m2)
+print('variables created:', m2.size())
+print('same as transfer:', [a == b.transfer(m2) for a, b in zip([f2, g2, h2], [f, g, h])])
+print('shared size:', m1.sharingSize([f, g, h]), m2.sharingSize([f2, g2, h2]))
+print('back again:', m2.transfer_many([f2, g2, h2], m1) == [f, g, h])
+print('constants:', m1.transfer_many([m1.bddOne(), m1.bddZero()], m2)
+      == [m2.bddOne(), m2.bddZero()])
+try:
+    m1.transfer_many([f, f2], m2)
+except ValueError as e:
+    print('error:', e)
+
+
+def solve(mgr, task):
+    """Return the cofactor of a case and its number of minterms."""
+    f, cube = task
+    g = f.cofactor(cube)
+    return g, g.count(mgr.size())
+
+# Split on k variables and solve the 2^k cases in the pool.
+k = 3
+cases = []
+for values in itertools.product([False, True], repeat=k):
+    cube = m1.bddOne()
+    for i, value in enumerate(values):
+        cube &= x[i] if value else ~x[i]
+    cases.append((f, cube))
+with ManagerPool(m1, processes=2) as pool:
+    results = pool.map(solve, cases)
+print('cases:', len(results))
+print('cofactors:', all(g == f.cofactor(cube) for (g, c), (_, cube) in zip(results, cases)))
+print('minterms:', sum(c for g, c in results) / 2**k, f.count(2*n))
+with ManagerPool(m1, 1) as pool:
+    small = pool.map(solve, cases, chunksize=1)
+    print('small chunks:', [c for g, c in small] == [c for g, c in results])
+    try:
+        pool.map(solve, [(f2, m2.bddOne())])
+    except ValueError as e:
+        print('error:', e)
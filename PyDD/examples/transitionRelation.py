@@ -0,0 +1,40 @@
+"""Test image and preimage with a partitioned transition relation."""
+
+from __future__ import print_function
+from functools import reduce
+
+from cudd import Cudd, TransitionRelation
+
+mgr = Cudd()
+
+# An n-bit counter that increments when input en is true.
+n = 8
+x = [mgr.bddVar(2*i,   'x' + str(i)) for i in range(n)]
+y = [mgr.bddVar(2*i+1, 'y' + str(i)) for i in range(n)]
+en = mgr.bddVar(2*n, 'en')
+parts = []
+carry = en
+for i in range(n):
+    parts.append(~(y[i] ^ x[i] ^ carry))
+    carry &= x[i]
+
+T = TransitionRelation(mgr, parts, x, y, inputs=[en], threshold=20)
+print("cluster sizes:", [c.size() for c in T.clusters()])
+
+# Compare to the monolithic relation.
+TR = reduce(lambda a, b: a & b, parts)
+xcube = reduce(lambda a, b: a & b, x) & en
+ycube = reduce(lambda a, b: a & b, y) & en
+S = ~x[0] & x[2]
+print("image agrees:", T.image(S) == TR.andAbstract(S, xcube).swapVariables(x, y))
+print("preimage agrees:",
+      T.preimage(S) == TR.andAbstract(S.swapVariables(x, y), ycube))
+
+# Breadth-first reachability from 0.
+Reached = New = ~reduce(lambda a, b: a | b, x)
+steps = 0
+while New:
+    New = T.image(New) & ~Reached
+    Reached |= New
+    steps += 1
+print("steps:", steps, "reached states:", Reached.count(n))
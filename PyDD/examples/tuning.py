@@ -0,0 +1,29 @@
+"""Test sizing of the unique and computed tables."""
+
+from __future__ import print_function
+
+from cudd import Cudd
+
+# Small manager with explicit table sizes.
+mgr = Cudd(uniqueSlots=128, cacheSlots=4096, maxCacheHard=8192, minHit=50)
+print("cache slots:", mgr.readCacheSlots())
+print("max cache:", mgr.readMaxCacheHard())
+print("min hit:", mgr.readMinHit())
+mgr.setLooseUpTo(100000)
+print("loose up to:", mgr.readLooseUpTo())
+
+# Sizes derived from a memory budget of 1 GB.
+config = Cudd.autotune(2**30)
+print(sorted(config.items()))
+big = Cudd(**config)
+print("cache slots:", big.readCacheSlots())
+print("max cache:", big.readMaxCacheHard())
+
+# A small budget shrinks both tables.
+small = Cudd.autotune(2**20)
+print(sorted(small.items()))
+print("cache within budget:", small['cacheSlots'] * 32 <= 2**20 // 16)
+try:
+    Cudd.autotune(2**10)
+except ValueError as e:
+    print("error:", e)
@@ -0,0 +1,32 @@
+"""Test variable maps and the varmap cache."""
+
+from __future__ import print_function
+
+from cudd import Cudd, VariableMap
+
+mgr = Cudd()
+
+n = 4
+x = [mgr.bddVar(2*i,   'x' + str(i)) for i in range(n)]
+y = [mgr.bddVar(2*i+1, 'y' + str(i)) for i in range(n)]
+f = (x[0] & ~x[1]) | (x[2] & y[3]) | (~y[0] & x[3])
+g = f.swapVariables(x, y)
+print(f)
+print(g)
+
+vmap = VariableMap(mgr, x, y)
+print("pairs in map:", len(vmap))
+print("swapVariables agrees:", f.swapVariables(vmap) == g)
+print("permute agrees:", f.permute(vmap) == g)
+print("vectorCompose agrees:", f.vectorCompose(vmap) == g)
+
+# Variables created after the map are left alone.
+z = mgr.bddVar(2*n, 'z')
+h = f & z
+print("new variable kept:", h.permute(vmap) == g & z)
+
+mgr.setVarMap(x, y)
+print("varMap agrees:", f.varMap() == g)
+print("varMap is an involution:", f.varMap().varMap() == f)
+mgr.setVarMap(vmap)
+print("varMap from VariableMap agrees:", h.varMap() == g & z)
@@ -0,0 +1,55 @@
+"""Test weighted model counting and compiled evaluation of weight sweeps."""
+
+from __future__ import print_function
+import numpy
+from cudd import Cudd
+
+mgr = Cudd()
+N = 5
+x1,x2,x3,x4,x5 = [mgr.bddVar(i, 'x%s' % (i+1)) for i in range(N)]
+mgr.shuffleHeap([3, 4, 0, 1, 2])
+f = (x1 & x2 & x3) | (x2 & x3 & x4) | (x4 & x5)
+
+# With unit weights the weighted count is the number of minterms.
+print('count:', f.count(), f.weighted_count([1] * N, [1] * N))
+# With complementary weights it is the probability.
+p = [0.9, 0.8, 0.7, 0.6, 0.5]
+print('probability: %.6f %.6f' % (f.probability(p),
+                                  f.weighted_count(p, [1 - q for q in p])))
+# The weights of the two literals of a variable are independent.
+pos = [2.0, 0.5, 1.0, 3.0, -1.0]
+neg = [1.0, 1.0, 0.0, 0.5, 1.0]
+print('weighted: %.6f' % f.weighted_count(pos, neg))
+print('complement: %.6f' % (~f).weighted_count(pos, neg))
+print('constants:', mgr.bddOne().weighted_count(pos, neg),
+      mgr.bddZero().weighted_count(pos, neg))
+try:
+    f.weighted_count(pos, neg[:3])
+except TypeError as e:
+    print('error:', e)
+
+# Compile once, then sweep a matrix of weight vectors.
+c = f.compile()
+print('nodes:', len(c), f.size())
+variables, levels, thens, elses, root = c.arrays()
+print('variables:', list(variables))
+print('levels:', list(levels))
+print('root:', root)
+
+sweep = numpy.linspace(0.0, 1.0, 11)
+probs = numpy.repeat(sweep[:, numpy.newaxis], N, axis=1)
+reliability = c.probability(probs)
+for q, r in zip(sweep, reliability):
+    print('p = %.1f  Pr(f) = %.6f' % (q, r))
+print('matches probability:',
+      all(abs(r - f.probability([q] * N)) < 1e-12 for q, r in zip(sweep, reliability)))
+print('matches weighted_count:',
+      abs(c.evaluate([pos], [neg])[0] - f.weighted_count(pos, neg)) < 1e-12)
+
+# The compiled form is a snapshot of the order at compilation time.
+mgr.shuffleHeap([0, 1, 2, 3, 4])
+print('after reordering:', abs(c.probability([p])[0] - f.probability(p)) < 1e-12)
+try:
+    c.evaluate(probs[:, :3], probs[:, :3])
+except TypeError as e:
+    print('error:', e)
@@ -0,0 +1,38 @@
+"""Time the creation of BDD wrapper objects in small operations.
+
+A conjunction of two variables is found in the computed table, so its
+cost is mostly the method call and the creation of the result object.
+The loop over bddOne measures object creation alone, and the loop over
+isOne the cost of a method call that creates no object.
+"""
+
+from __future__ import print_function, division
+import argparse
+import time
+from cudd import Cudd
+
+parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+parser.add_argument('-n', '--iterations', type=int, default=200000,
+                    help='number of calls per measurement')
+args = parser.parse_args()
+
+mgr = Cudd()
+x, y, z = (mgr.bddVar(i) for i in range(3))
+f = x & y
+
+def measure(label, op):
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        op()
+    elapsed = (time.perf_counter() - start) / args.iterations * 1e9
+    print('{0:<28} {1:8.1f} ns'.format(label, elapsed))
+    return elapsed
+
+call = measure('method call (isOne)', x.isOne)
+make = measure('object creation (bddOne)', mgr.bddOne)
+conj = measure('cached conjunction (x & y)', lambda: x & y)
+ite = measure('cached ite(x, y, z)', lambda: x.ite(y, z))
+small = [x & y for _ in range(100)]
+queens = measure('reduction of 100 wrappers', lambda: [b & f for b in small])
+print('object creation beyond a call: {0:.0%} of a conjunction'.format(
+    max(make - call, 0) / conj))
@@ -9,7 +9,13 @@ setup(
     author = "Fabio Somenzi",
     author_email = "Fabio@Colorado.EDU",
     url = "http://vlsi.colorado.edu/~fabio",
+    # The BLIF reader of nanotrav and the group tree walk of save_order
+    # use the internal headers of CUDD (cuddInt.h, mtrInt.h), which
+    # include config.h, generated by configure in ../cudd.
     ext_modules = cythonize([
-        Extension("cudd", ["cudd.pyx"],
+        Extension("cudd", ["cudd.pyx", "../cudd/nanotrav/bnet.c"],
+                  include_dirs=["../cudd", "../cudd/cudd", "../cudd/st",
+                                "../cudd/util", "../cudd/mtr", "../cudd/epd",
+                                "../cudd/nanotrav"],
                   libraries=["cudd"])])
 )